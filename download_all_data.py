@@ -2,6 +2,8 @@ import soccerdata as sd
 import logging
 import time
 from pathlib import Path
+from src.data.cache_store import CacheStore
+from src.data.league_catalog import LeagueCatalog, season_key
 
 # --- CONFIGURATION ---
 # List of leagues to download
@@ -19,6 +21,14 @@ SEASONS = ["2021", "2122", "2223", "2324", "2425"]
 # Cache Directory (Same as your loader.py)
 DATA_DIR = Path.cwd() / "soccer_data_cache"
 
+# Compressed, deduplicated page store inside the cache directory.
+# soccerdata reads/writes plain files, so each segment is unpacked before
+# scraping and packed again afterwards.
+cache_store = CacheStore(DATA_DIR)
+
+# League/season catalog parsed from the cached leagues.html and seasons_* pages
+league_catalog = LeagueCatalog(cache_store)
+
 # Logging Setup
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("bulk_downloader")
@@ -29,6 +39,17 @@ def download_league_data(league, season):
     This triggers the download and caching process.
     """
     logger.info(f"⬇️ Starting download for {league} ({season})...")
+
+    # Restore already-packed pages so soccerdata treats them as cache hits
+    segment_pages = (
+        cache_store.names("leagues.html")
+        + cache_store.names(f"seasons_{league}.html")
+        + cache_store.names(f"*_{league}_{season}*.html")
+        + cache_store.names(f"matchlogs_*_{season}_*.html")
+    )
+    restored = cache_store.materialize(segment_pages)
+    if restored:
+        logger.info(f"   📦 Restored {restored} packed pages from cache store")
     
     try:
         # Initialize scraper (This creates the cache folder structure)
@@ -64,23 +85,41 @@ def download_league_data(league, season):
     except Exception as e:
         logger.error(f"❌ Critical failure for {league} {season}: {e}")
 
+    # Compress the segment's pages (new and restored) back into the store
+    try:
+        cache_store.pack("*.html", remove_originals=True)
+    except Exception as e:
+        logger.warning(f"   ⚠️ Cache packing issue: {e}")
+
 def main():
     logger.info("🚀 STARTING BULK DATA DOWNLOAD")
     logger.info(f"📂 Cache Directory: {DATA_DIR}")
     
-    total_tasks = len(LEAGUES) * len(SEASONS)
-    completed = 0
-    
+    # Skip league/seasons the cached catalog knows FBref does not have
+    # (unknown leagues or seasons without a cached seasons page are attempted)
+    segments = []
     for league in LEAGUES:
+        league = league_catalog.code(league) or league
         for season in SEASONS:
-            download_league_data(league, season)
-            completed += 1
-            logger.info(f"Progress: {completed}/{total_tasks} segments done.\n")
-            
-            # Sleep to be polite to the server and avoid rate limits
-            time.sleep(3)
+            season = season_key(season) or season
+            if league_catalog.has_season(league, season) is False:
+                logger.warning(f"⏭️ Skipping {league} ({season}): season not listed on FBref")
+                continue
+            segments.append((league, season))
+
+    total_tasks = len(segments)
+    completed = 0
+    
+    for league, season in segments:
+        download_league_data(league, season)
+        completed += 1
+        logger.info(f"Progress: {completed}/{total_tasks} segments done.\n")
+        
+        # Sleep to be polite to the server and avoid rate limits
+        time.sleep(3)
 
     logger.info("🏁 ALL DOWNLOADS COMPLETE.")
+    logger.info(f"📦 Cache store: {cache_store.stats()}")
     logger.info("You can now run your app offline using this cached data.")
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 import os
+import asyncio
 from dotenv import load_dotenv
 
 # 1. FORCE LOAD ENVIRONMENT VARIABLES
@@ -25,11 +26,27 @@ from pydantic import BaseModel
 from typing import Optional, Dict, Any
 
 # Custom Modules
-from src.data.loader import real_data_loader
+from src.data.loader import agent_data_packet, real_data_loader
+from src.models.season_sim import season_simulator
+from src.models.serving import baseline_service
 from w5_engine.debate import ConsensusEngine
+from w5_engine.providers import provider_pool
+from w5_engine.response_cache import response_cache
 
 app = FastAPI()
 
+# Prepare the baseline models and today's season projections in the
+# background so startup is not blocked
+baseline_service.warm_up()
+season_simulator.warm_up()
+
+# Release pooled LLM connections and the background workers on shutdown
+@app.on_event("shutdown")
+async def close_provider_pool():
+    await provider_pool.aclose()
+    baseline_service.shutdown()
+    season_simulator.shutdown()
+
 # 4. CORS SETUP
 app.add_middleware(
     CORSMiddleware,
@@ -45,7 +62,9 @@ def health_check():
     return {
         "status": "GhostEdge AI is Online", 
         "mode": "Event-Centric (RapidAPI)", 
-        "version": "3.4"
+        "version": "3.4",
+        "llm_cache": response_cache.stats(),
+        "baseline_batching": baseline_service.batcher.stats() if baseline_service.batcher else None
     }
 
 # 6. DATA MODEL
@@ -56,6 +75,7 @@ class MatchRequest(BaseModel):
     league_id: int
     home_team_name: str    
     away_team_name: str    
+    match_date: Optional[str] = None  # ISO kickoff date; defaults to latest cached form
 
 # 7. ANALYSIS ENDPOINT
 @app.post("/analyze/consensus")
@@ -64,27 +84,29 @@ async def run_consensus(match: MatchRequest):
         print(f"👻 GhostEdge Analyzing: {match.home_team_name} vs {match.away_team_name} (Event {match.event_id})...")
 
         # --- STEP A: FETCH REAL DATA ---
-        # Pass all required IDs for proper API enrichment
-        match_context = real_data_loader.fetch_full_match_context(
+        # Pass all required IDs for proper API enrichment (blocking I/O, run off the event loop)
+        match_context = await asyncio.to_thread(
+            real_data_loader.fetch_full_match_context,
             home_team=match.home_team_name,
             away_team=match.away_team_name,
             event_id=match.event_id,
             league_id=match.league_id,
             home_team_id=match.home_team_id,
-            away_team_id=match.away_team_id
+            away_team_id=match.away_team_id,
+            match_date=match.match_date
         )
 
         # --- STEP B: PREPARE DATA FOR AI AGENTS ---
-        agent_data_packet = {
-            "home_team": match.home_team_name,
-            "away_team": match.away_team_name,
-            "quantitative_features": match_context.get('quantitative_features', {}),
-            "qualitative_context": match_context.get('qualitative_context', {}) 
-        }
+        # (batch precompute builds the same packet, so its cached replies are hits here)
+        agent_data = agent_data_packet(match.home_team_name, match.away_team_name, match_context)
 
         # --- STEP C: RUN THE W-5 DEBATE ENGINE ---
+        # Baseline models act as a quantitative prior (None until warmed up)
+        baseline_prediction = await baseline_service.predict_async(
+            match.home_team_name, match.away_team_name, match.match_date
+        )
         engine = ConsensusEngine(debate_rounds=2, min_agents=3)
-        result = engine.run_consensus(agent_data_packet)
+        result = await engine.run_consensus_async(agent_data, baseline_prediction=baseline_prediction)
 
         # --- STEP D: RETURN RESULT TO FRONTEND ---
         return {
@@ -92,6 +114,7 @@ async def run_consensus(match: MatchRequest):
             "confidence": result['confidence'],
             "agreement_score": result.get('agreement_score', 0.5),
             "debate_summary": result['debate_summary'],
+            "baseline_prediction": baseline_prediction,
             "match_data_used": match_context
         }
 
@@ -0,0 +1,401 @@
+"""
+Content-addressed, compressed storage for the soccerdata page cache.
+
+soccerdata writes every scraped FBref page into ``soccer_data_cache`` as a
+plain HTML file. Most of each page is shared site boilerplate, so the raw
+directory grows by ~1.4 MB per league-season page.
+
+Packing moves those pages into ``<cache>/.store``:
+
+    .store/index.json            logical file name -> blob digest + codec
+    .store/objects/ab/<sha256>.<codec or dict>
+                                 compressed page bodies (deduplicated)
+    .store/dicts/<sha256>        shared zstd dictionaries trained on the pages
+
+Readers go through ``CacheStore.read_text(name)`` with the same file names
+the downloader produces (e.g. ``schedule_ENG-Premier League_2324.html``).
+A plain file on disk always wins over the packed copy, so freshly
+downloaded pages are visible immediately and can be packed later.
+
+Index updates (``pack``, ``write_bytes``, ``materialize``) hold an exclusive
+lock on ``.store/index.lock``, so the bulk downloader and server workers can
+share one store.
+"""
+
+import os
+import io
+import gzip
+import json
+import fnmatch
+import hashlib
+import logging
+import argparse
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Iterable, Optional
+
+try:
+    import zstandard as zstd
+except ImportError:  # optional dependency, fall back to gzip
+    zstd = None
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; only in-process locking there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+CACHE_DIR = Path(os.getenv(
+    "SOCCER_DATA_CACHE",
+    Path(__file__).resolve().parents[2] / "soccer_data_cache"
+))
+STORE_DIRNAME = ".store"
+INDEX_VERSION = 1
+ZSTD_LEVEL = 10
+DICT_SIZE = 112640  # 110 KB, zstd's recommended default
+DICT_MIN_SAMPLES = 8
+
+
+class CacheStore:
+    """
+    Deduplicating, compressed blob store behind the soccerdata cache directory.
+    """
+
+    def __init__(self, root: Path = CACHE_DIR, level: int = ZSTD_LEVEL):
+        """
+        Args:
+            root: Cache directory holding the raw pages (and ``.store``)
+            level: zstd compression level used when packing
+        """
+        self.root = Path(root)
+        self.store_dir = self.root / STORE_DIRNAME
+        self.index_path = self.store_dir / "index.json"
+        self.lock_path = self.store_dir / "index.lock"
+        self.level = level
+        self._lock = threading.RLock()
+        self._index: Optional[Dict[str, Any]] = None
+        self._index_mtime = None
+        self._decompressors: Dict[Optional[str], Any] = {}
+
+    # ============= INDEX =============
+
+    def _load_index(self) -> Dict[str, Any]:
+        """Load index.json, reloading if another process rewrote it."""
+        with self._lock:
+            try:
+                mtime = self.index_path.stat().st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+
+            if self._index is None or mtime != self._index_mtime:
+                if mtime is None:
+                    self._index = {"version": INDEX_VERSION, "files": {}}
+                else:
+                    with open(self.index_path, "r", encoding="utf-8") as f:
+                        self._index = json.load(f)
+                self._index_mtime = mtime
+            return self._index
+
+    @contextmanager
+    def _index_lock(self):
+        """Exclusive lock for a read-modify-write of the index, across threads and processes."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, "a+b") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    self._index = None  # another process may have rewritten it just now
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _save_index(self, index: Dict[str, Any]):
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self._atomic_write(self.index_path, json.dumps(index, indent=1, sort_keys=True).encode("utf-8"))
+        self._index = index
+        self._index_mtime = self.index_path.stat().st_mtime_ns
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _object_path(self, entry: Dict[str, Any]) -> Path:
+        # Entries written before objects were keyed by codec only have the content digest
+        name = entry.get("object", entry["digest"])
+        return self.store_dir / "objects" / name[:2] / name
+
+    @staticmethod
+    def _object_name(entry: Dict[str, Any]) -> str:
+        """Blob file name: content digest plus what it was compressed with."""
+        return f"{entry['digest']}.{entry['dict'][:16] if entry.get('dict') else entry['codec']}"
+
+    def _dict_path(self, digest: str) -> Path:
+        return self.store_dir / "dicts" / digest
+
+    # ============= READ PATH =============
+
+    def exists(self, name: str) -> bool:
+        """True if the page is available either as a plain file or packed."""
+        return (self.root / name).is_file() or name in self._load_index()["files"]
+
+    def names(self, pattern: str = "*") -> List[str]:
+        """List logical page names (plain and packed) matching a glob pattern."""
+        plain = {p.name for p in self.root.glob(pattern) if p.is_file()}
+        packed = {n for n in self._load_index()["files"] if fnmatch.fnmatchcase(n, pattern)}
+        return sorted(plain | packed)
+
+    def fingerprint(self, names: Iterable[str]) -> str:
+        """
+        Stable digest of the current contents of a set of pages.
+
+        Plain files are identified by size and mtime, packed pages by their
+        content digest, matching the precedence used by ``read_bytes``.
+        """
+        files = self._load_index()["files"]
+        h = hashlib.sha256()
+        for name in sorted(names):
+            plain = self.root / name
+            if plain.is_file():
+                st = plain.stat()
+                token = f"plain:{st.st_size}:{st.st_mtime_ns}"
+            elif name in files:
+                token = f"packed:{files[name]['digest']}"
+            else:
+                token = "missing"
+            h.update(f"{name}\0{token}\n".encode("utf-8"))
+        return h.hexdigest()
+
+    def read_bytes(self, name: str) -> bytes:
+        """Read a page by its cache file name, transparently decompressing packed pages."""
+        plain = self.root / name
+        if plain.is_file():
+            with open(plain, "rb") as f:
+                return f.read()
+
+        entry = self._load_index()["files"].get(name)
+        if entry is None:
+            raise FileNotFoundError(f"{name} not found in {self.root}")
+
+        with open(self._object_path(entry), "rb") as f:
+            payload = f.read()
+        return self._decompress(payload, entry)
+
+    def read_text(self, name: str, encoding: str = "utf-8") -> str:
+        return self.read_bytes(name).decode(encoding, errors="replace")
+
+    def open_text(self, name: str, encoding: str = "utf-8") -> io.StringIO:
+        """File-like view of a page, suitable for ``pd.read_html``."""
+        return io.StringIO(self.read_text(name, encoding))
+
+    def _decompress(self, payload: bytes, entry: Dict[str, Any]) -> bytes:
+        codec = entry.get("codec", "zstd")
+        if codec == "gzip":
+            return gzip.decompress(payload)
+        if codec != "zstd":
+            raise ValueError(f"Unknown codec '{codec}' for {entry.get('digest')}")
+        if zstd is None:
+            raise RuntimeError("Packed cache uses zstd; install 'zstandard' to read it")
+
+        dict_digest = entry.get("dict")
+        with self._lock:
+            dctx = self._decompressors.get(dict_digest)
+            if dctx is None:
+                if dict_digest:
+                    dict_data = zstd.ZstdCompressionDict(self._dict_path(dict_digest).read_bytes())
+                    dctx = zstd.ZstdDecompressor(dict_data=dict_data)
+                else:
+                    dctx = zstd.ZstdDecompressor()
+                self._decompressors[dict_digest] = dctx
+        return dctx.decompress(payload, max_output_size=entry.get("size", 0) or 0)
+
+    # ============= WRITE PATH =============
+
+    def _train_dictionary(self, samples: List[bytes]) -> Optional[str]:
+        """Train a shared zstd dictionary on page samples; returns its digest."""
+        if zstd is None or len(samples) < DICT_MIN_SAMPLES:
+            return None
+        try:
+            dict_data = zstd.train_dictionary(DICT_SIZE, samples).as_bytes()
+        except zstd.ZstdError as e:
+            logger.warning(f"⚠️  zstd dictionary training failed: {e}")
+            return None
+
+        digest = hashlib.sha256(dict_data).hexdigest()
+        path = self._dict_path(digest)
+        if not path.exists():
+            self._atomic_write(path, dict_data)
+        return digest
+
+    def _compressor(self, dict_digest: Optional[str]):
+        if zstd is None:
+            return None
+        if dict_digest:
+            dict_data = zstd.ZstdCompressionDict(self._dict_path(dict_digest).read_bytes())
+            return zstd.ZstdCompressor(level=self.level, dict_data=dict_data)
+        return zstd.ZstdCompressor(level=self.level)
+
+    def _put(self, data: bytes, cctx, dict_digest: Optional[str], objects: Dict[str, Dict]) -> Dict[str, Any]:
+        """
+        Store one blob (deduplicated by content digest) and return its index entry.
+
+        Object files are keyed by content digest and codec / dictionary, so an
+        existing file is only reused if it decompresses with this entry's
+        dictionary.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in objects:
+            return dict(objects[digest])
+
+        entry = {"digest": digest, "size": len(data)}
+        if cctx is not None:
+            entry.update(codec="zstd", dict=dict_digest)
+        else:
+            entry.update(codec="gzip", dict=None)
+        entry["object"] = self._object_name(entry)
+
+        path = self._object_path(entry)
+        if not path.exists():
+            payload = cctx.compress(data) if cctx is not None else gzip.compress(data, 9)
+            self._atomic_write(path, payload)
+        entry["stored"] = path.stat().st_size
+        objects[digest] = entry
+        return dict(entry)
+
+    def write_bytes(self, name: str, data: bytes) -> Dict[str, Any]:
+        """Store a page directly in packed form (no plain file is written)."""
+        with self._index_lock():
+            index = self._load_index()
+            files = dict(index["files"])
+            objects = {e["digest"]: e for e in files.values()}
+            dict_digest = index.get("active_dict")
+            entry = self._put(data, self._compressor(dict_digest), dict_digest, objects)
+            files[name] = entry
+            self._save_index({**index, "files": files})
+            return entry
+
+    def pack(self, pattern: str = "*.html", remove_originals: bool = True,
+             train_dict: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Move plain pages matching ``pattern`` into the compressed store.
+
+        Args:
+            pattern: Glob of cache files to pack
+            remove_originals: Delete the plain files once they are stored
+            train_dict: Train a shared zstd dictionary on the pages being packed
+                (default: only when the store has no dictionary yet)
+
+        Returns:
+            Dictionary of packing statistics
+        """
+        with self._index_lock():
+            index = self._load_index()
+            files = dict(index["files"])
+            objects = {e["digest"]: e for e in files.values()}
+            paths = sorted(p for p in self.root.glob(pattern) if p.is_file())
+            if not paths:
+                return self.stats()
+
+            pages = [(p, p.read_bytes()) for p in paths]
+            dict_digest = index.get("active_dict")
+            if train_dict is None:
+                train_dict = dict_digest is None
+            if train_dict and zstd is not None:
+                new_dict = self._train_dictionary([data for _, data in pages])
+                dict_digest = new_dict or dict_digest
+
+            cctx = self._compressor(dict_digest)
+            for path, data in pages:
+                files[path.name] = self._put(data, cctx, dict_digest, objects)
+
+            self._save_index({**index, "version": INDEX_VERSION, "files": files, "active_dict": dict_digest})
+
+            if remove_originals:
+                for path, _ in pages:
+                    path.unlink()
+
+            self._gc(files)
+            logger.info(f"📦 Packed {len(pages)} pages into {self.store_dir}")
+            return self.stats()
+
+    def materialize(self, names: Iterable[str]) -> int:
+        """
+        Write packed pages back out as plain files.
+
+        soccerdata only checks for plain files in its ``data_dir``; materializing
+        a segment before scraping lets it reuse the packed pages instead of
+        downloading them again.
+        """
+        count = 0
+        with self._index_lock():  # a concurrent pack must not sweep pages up mid-restore
+            for name in names:
+                path = self.root / name
+                if not path.exists() and name in self._load_index()["files"]:
+                    self._atomic_write(path, self.read_bytes(name))
+                    count += 1
+        return count
+
+    def _gc(self, files: Dict[str, Dict[str, Any]]):
+        """Remove blobs and dictionaries no longer referenced by the index."""
+        live_objects = {e.get("object", e["digest"]) for e in files.values()}
+        live_dicts = {e.get("dict") for e in files.values()}
+        index = self._load_index()
+        live_dicts.add(index.get("active_dict"))
+
+        for path in (self.store_dir / "objects").glob("*/*"):
+            if path.name not in live_objects:
+                path.unlink()
+        for path in (self.store_dir / "dicts").glob("*"):
+            if path.name not in live_dicts:
+                path.unlink()
+                self._decompressors.pop(path.name, None)
+
+    # ============= STATS =============
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarize logical vs stored size of the packed pages."""
+        files = self._load_index()["files"]
+        unique = {e.get("object", e["digest"]): e for e in files.values()}
+        logical = sum(e["size"] for e in files.values())
+        stored = sum(e.get("stored", 0) for e in unique.values())
+        dicts = sum(p.stat().st_size for p in (self.store_dir / "dicts").glob("*")) if self.store_dir.exists() else 0
+        plain = sum(p.stat().st_size for p in self.root.glob("*.html") if p.is_file())
+        return {
+            "packed_files": len(files),
+            "unique_blobs": len(unique),
+            "logical_bytes": logical,
+            "stored_bytes": stored + dicts,
+            "compression_ratio": round(logical / max(1, stored + dicts), 2),
+            "unpacked_bytes": plain,
+        }
+
+
+# --- INSTANTIATE ---
+cache_store = CacheStore()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the compressed soccerdata cache")
+    parser.add_argument("command", choices=["pack", "unpack", "stats"])
+    parser.add_argument("--pattern", default="*.html", help="Glob of cache files to pack/unpack")
+    parser.add_argument("--keep", action="store_true", help="Keep plain files after packing")
+    parser.add_argument("--dir", default=str(CACHE_DIR), help="Cache directory")
+    args = parser.parse_args()
+
+    store = CacheStore(Path(args.dir))
+    if args.command == "pack":
+        result = store.pack(args.pattern, remove_originals=not args.keep)
+    elif args.command == "unpack":
+        result = {"materialized": store.materialize(store.names(args.pattern))}
+    else:
+        result = store.stats()
+    print(json.dumps(result, indent=2))
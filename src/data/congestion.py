@@ -0,0 +1,152 @@
+"""
+Fixture-congestion and rest-day index built from the cached FBref pages.
+
+Each team's fixture dates (league schedules plus cup ties from the
+matchlogs) are stored once as a sorted int32 day array in a single
+CSR-style buffer. Rest and congestion features for any (team, date) are a
+couple of binary searches, and whole batches of fixtures are answered with
+vectorized ``np.searchsorted`` calls per team.
+"""
+
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.data.cache_store import CacheStore, cache_store
+from src.data.fbref_cache import TeamResolver, load_matchlogs, load_schedules
+
+WINDOWS = (14, 30)
+FEATURES = ["days_since_last_match", "matches_last_14d", "matches_last_30d", "days_to_next_match"]
+
+
+def _to_days(dates) -> np.ndarray:
+    """Dates -> int32 days since the Unix epoch."""
+    values = pd.to_datetime(pd.Series(dates)).to_numpy(dtype="datetime64[D]")
+    return values.astype(np.int64).astype(np.int32)
+
+
+class CongestionIndex:
+    """
+    Per-team sorted fixture-date arrays with as-of rest-day queries.
+    """
+
+    def __init__(self, store: CacheStore = cache_store):
+        self.store = store
+        self.days: Optional[np.ndarray] = None
+        self.offsets: Dict[str, tuple] = {}
+        self.resolver: Optional[TeamResolver] = None
+        self._lock = threading.Lock()
+
+    def build(self, schedules: Optional[pd.DataFrame] = None,
+              matchlogs: Optional[pd.DataFrame] = None) -> "CongestionIndex":
+        """Collect every known fixture date per team (played and upcoming)."""
+        if schedules is None:
+            schedules = load_schedules(self.store)
+        if matchlogs is None:
+            matchlogs = load_matchlogs(self.store)
+
+        fixtures = pd.concat([
+            pd.DataFrame({"team": schedules["home_team"].astype(str), "date": schedules["date"]}),
+            pd.DataFrame({"team": schedules["away_team"].astype(str), "date": schedules["date"]}),
+            pd.DataFrame({"team": matchlogs["team"].astype(str), "date": matchlogs["date"]}),
+        ], ignore_index=True).dropna()
+        fixtures["day"] = _to_days(fixtures["date"])
+        fixtures = fixtures.drop_duplicates(["team", "day"]).sort_values(["team", "day"], kind="stable")
+
+        teams = fixtures["team"].to_numpy()
+        bounds = np.flatnonzero(np.r_[True, teams[1:] != teams[:-1], True])
+        self.days = fixtures["day"].to_numpy(dtype=np.int32)
+        self.offsets = {teams[s]: (s, e) for s, e in zip(bounds[:-1], bounds[1:])}
+        self.resolver = TeamResolver(self.offsets)
+        return self
+
+    def _ensure_built(self):
+        if self.days is None:
+            with self._lock:
+                if self.days is None:
+                    self.build()
+
+    def _team_days(self, team: str) -> Optional[np.ndarray]:
+        name = self.resolver.resolve(team)
+        if name is None:
+            return None
+        start, end = self.offsets[name]
+        return self.days[start:end]
+
+    @staticmethod
+    def _query(team_days: np.ndarray, days: np.ndarray) -> np.ndarray:
+        """
+        Vectorized features for one team at many as-of days.
+
+        Returns a float32 array (len(days), len(FEATURES)); NaN where there is
+        no previous/next fixture.
+        """
+        before = np.searchsorted(team_days, days, side="left")   # fixtures strictly before
+        after = np.searchsorted(team_days, days, side="right")   # first fixture strictly after
+        out = np.full((len(days), len(FEATURES)), np.nan, dtype=np.float32)
+
+        has_prev = before > 0
+        out[has_prev, 0] = days[has_prev] - team_days[before[has_prev] - 1]
+        for col, window in enumerate(WINDOWS, start=1):
+            out[:, col] = before - np.searchsorted(team_days, days - window, side="left")
+        has_next = after < len(team_days)
+        out[has_next, 3] = team_days[after[has_next]] - days[has_next]
+        return out
+
+    def features(self, team: str, as_of=None) -> Optional[Dict[str, Any]]:
+        """
+        Rest and congestion features for a team on a match date.
+
+        Args:
+            team: Team name (FBref or common alias)
+            as_of: Match date; defaults to today
+
+        Returns:
+            Dictionary with ``FEATURES`` (None where undefined), or None if
+            the team is unknown
+        """
+        self._ensure_built()
+        team_days = self._team_days(team)
+        if team_days is None:
+            return None
+        # One date: skip the Series round trip of _to_days
+        day = np.array([np.datetime64(pd.Timestamp(as_of if as_of is not None else pd.Timestamp.now()), "D")])
+        day = day.astype(np.int64).astype(np.int32)
+        row = self._query(team_days, day)[0]
+        return {name: (None if np.isnan(v) else int(v)) for name, v in zip(FEATURES, row)}
+
+    def batch_features(self, teams: Sequence[str], dates: Sequence) -> np.ndarray:
+        """
+        Features for many (team, date) pairs, e.g. both sides of every fixture
+        in a batch request.
+
+        Returns:
+            float32 array of shape (len(teams), len(FEATURES)), NaN for unknown teams
+        """
+        self._ensure_built()
+        teams = pd.Series(list(teams), dtype=object)
+        days = _to_days(dates)
+        out = np.full((len(teams), len(FEATURES)), np.nan, dtype=np.float32)
+        for team, rows in teams.groupby(teams, sort=False).indices.items():
+            team_days = self._team_days(team)
+            if team_days is not None:
+                out[rows] = self._query(team_days, days[rows])
+        return out
+
+    def fixture_features(self, fixtures: pd.DataFrame) -> pd.DataFrame:
+        """
+        Home/away congestion columns for a frame with ``home_team``,
+        ``away_team`` and ``date`` columns (e.g. ``load_schedules()``).
+        """
+        frames = []
+        for side in ("home", "away"):
+            values = self.batch_features(fixtures[f"{side}_team"].astype(str), fixtures["date"])
+            frames.append(pd.DataFrame(values, index=fixtures.index,
+                                       columns=[f"{side}_{name}" for name in FEATURES]))
+        return pd.concat(frames, axis=1)
+
+
+# --- INSTANTIATE ---
+congestion_index = CongestionIndex()
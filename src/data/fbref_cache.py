@@ -0,0 +1,400 @@
+"""
+Parsers for the FBref pages cached by soccerdata in ``soccer_data_cache``.
+
+All reads go through the compressed ``CacheStore``, so they work on both
+plain and packed caches. Parsed tables are memoized on disk under
+``<cache>/.artifacts`` keyed by a fingerprint of the source pages, so the
+HTML is only parsed again when a page is re-downloaded.
+"""
+
+import re
+import unicodedata
+from io import StringIO
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Pattern, Union
+
+import numpy as np
+import pandas as pd
+
+from src.data.cache_store import CacheStore, cache_store
+
+# Bump when a parser below changes shape, to invalidate stored artifacts
+PARSER_VERSION = 1
+ARTIFACT_DIRNAME = ".artifacts"
+
+MATCHLOG_PATTERN = re.compile(r"^matchlogs_(?P<team>.+)_(?P<season>\d{4})_shooting\.html$")
+SCHEDULE_PATTERN = re.compile(r"^schedule_(?P<league>.+)_(?P<season>\d{4})\.html$")
+TEAMS_PATTERN = re.compile(r"^teams_(?P<league>.+)_(?P<season>\d{4})(?P<stats>_stats)?\.html$")
+
+# Common long/short names -> FBref squad names used in the cached pages
+TEAM_ALIASES = {
+    "man city": "Manchester City",
+    "man united": "Manchester Utd",
+    "man utd": "Manchester Utd",
+    "manchester united": "Manchester Utd",
+    "newcastle": "Newcastle Utd",
+    "newcastle united": "Newcastle Utd",
+    "nottingham": "Nott'ham Forest",
+    "nottingham forest": "Nott'ham Forest",
+    "tottenham hotspur": "Tottenham",
+    "spurs": "Tottenham",
+    "west ham united": "West Ham",
+    "wolverhampton": "Wolves",
+    "wolverhampton wanderers": "Wolves",
+    "brighton and hove albion": "Brighton",
+    "brighton hove albion": "Brighton",
+    "sheffield united": "Sheffield Utd",
+    "west bromwich albion": "West Brom",
+    "leeds": "Leeds United",
+    "leicester": "Leicester City",
+    "ipswich": "Ipswich Town",
+    "luton": "Luton Town",
+    "norwich": "Norwich City",
+    "atletico": "Atlético Madrid",
+    "atletico madrid": "Atlético Madrid",
+    "athletic bilbao": "Athletic Club",
+    "real betis": "Betis",
+    "celta": "Celta Vigo",
+    "rayo": "Rayo Vallecano",
+}
+
+_STRIP_TOKENS = {"fc", "cf", "afc", "sc", "cd", "ud", "rcd", "sd", "ca", "rc"}
+# Words shared by many clubs; a partial match on these alone identifies nobody
+_GENERIC_TOKENS = {"real", "united", "utd", "city", "town", "club", "athletic", "atletico", "sporting",
+                   "west", "de", "del", "la", "and"}
+
+
+def normalize_team_name(name: str) -> str:
+    """Lowercase, strip accents, punctuation and club suffixes (FC, CF, ...)."""
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii")
+    text = re.sub(r"[^a-z0-9 ]+", " ", text.lower().replace("&", " and "))
+    return " ".join(t for t in text.split() if t not in _STRIP_TOKENS)
+
+
+class TeamResolver:
+    """
+    Map free-form team names (API names, user input) onto a known set of
+    FBref squad names.
+    """
+
+    def __init__(self, candidates: Iterable[str]):
+        self.candidates = sorted(set(candidates))
+        self._by_norm = {normalize_team_name(c): c for c in self.candidates}
+        self._tokens = [(frozenset(n.split()), c) for n, c in self._by_norm.items() if n]
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def resolve(self, name: Optional[str]) -> Optional[str]:
+        """
+        Return the matching squad name, or None if nothing (or more than one
+        squad) matches.
+
+        Aliases and exact normalized names win; otherwise one name's words must
+        all appear in the other's ("Sociedad" -> "Real Sociedad"), the shared
+        words must not all be generic ("Real", "City"), and exactly one squad
+        may match.
+        """
+        if not name or not isinstance(name, str):
+            return None
+        if name in self._memo:
+            return self._memo[name]
+
+        norm = normalize_team_name(name)
+        match = None
+        alias = TEAM_ALIASES.get(norm)
+        if alias and alias in self.candidates:
+            match = alias
+        elif norm in self._by_norm:
+            match = self._by_norm[norm]
+        elif norm:
+            tokens = frozenset(norm.split())
+            hits = [c for words, c in self._tokens
+                    if (tokens <= words or words <= tokens) and (tokens & words) - _GENERIC_TOKENS]
+            if len(hits) == 1:
+                match = hits[0]
+
+        self._memo[name] = match
+        return match
+
+
+# ============= PAGE PARSING =============
+
+def _extract_table(html: str, table_id: Union[str, Pattern]) -> Optional[str]:
+    """Slice the ``<table id=...>`` fragment out of a page (exact id or regex)."""
+    if isinstance(table_id, str):
+        table_id = re.compile(re.escape(table_id) + "$")
+    for m in re.finditer(r'<table[^>]*\bid="([^"]+)"', html):
+        if table_id.match(m.group(1)):
+            end = html.find("</table>", m.end())
+            return html[m.start():end + len("</table>")] if end != -1 else None
+    return None
+
+
+def read_table(name: str, table_id: Optional[Union[str, Pattern]] = None,
+               store: CacheStore = cache_store) -> pd.DataFrame:
+    """
+    Parse one HTML table from a cached page.
+
+    FBref hides secondary tables inside HTML comments, so comment markers are
+    stripped before parsing. When ``table_id`` is given (exact id or compiled
+    regex), only that table's fragment is handed to the HTML parser.
+    """
+    html = store.read_text(name).replace("<!--", "").replace("-->", "")
+    if table_id is not None:
+        fragment = _extract_table(html, table_id)
+        if fragment is None:
+            raise ValueError(f"No table matching {table_id!r} in {name}")
+        html = fragment
+    return pd.read_html(StringIO(html))[0]
+
+
+def _flatten_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Join FBref's two-level headers ('Home', 'Pts') -> 'Home Pts', dropping 'Unnamed' groups."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = [
+            " ".join(p for p in col if not str(p).startswith("Unnamed")).strip()
+            for col in df.columns
+        ]
+    return df
+
+
+def season_for_date(when) -> str:
+    """FBref season key for a date, e.g. 2024-03-01 -> '2324' (seasons start in July)."""
+    ts = pd.Timestamp(when)
+    start = ts.year if ts.month >= 7 else ts.year - 1
+    return f"{start % 100:02d}{(start + 1) % 100:02d}"
+
+
+def _to_number(series: pd.Series) -> pd.Series:
+    """Numeric conversion tolerant of '1 (4)' shootout scores and blanks."""
+    text = series.astype("string").str.extract(r"^\s*(-?\d+(?:\.\d+)?)", expand=False)
+    return pd.to_numeric(text, errors="coerce")
+
+
+def _artifact_path(store: CacheStore, key: str, fingerprint: str) -> Path:
+    return store.root / ARTIFACT_DIRNAME / f"{key}-{fingerprint[:16]}.pkl"
+
+
+def read_cached_frame(key: str, sources: List[str], store: CacheStore = cache_store) -> Optional[pd.DataFrame]:
+    """
+    The artifact ``cached_frame`` would return, without building it.
+
+    Returns:
+        The DataFrame, or None if no valid artifact exists for ``sources``
+    """
+    path = _artifact_path(store, key, store.fingerprint(sources + [f"parser-v{PARSER_VERSION}"]))
+    if not path.exists():
+        return None
+    try:
+        return pd.read_pickle(path)
+    except Exception as e:
+        print(f"⚠️  Stale artifact {path.name}: {e}")
+        return None
+
+
+def cached_frame(key: str, sources: List[str], builder: Callable[[], pd.DataFrame],
+                 store: CacheStore = cache_store) -> pd.DataFrame:
+    """
+    Build a DataFrame from cached pages once and memoize it on disk.
+
+    Args:
+        key: Artifact name (e.g. 'matchlogs')
+        sources: Cache file names the frame is derived from
+        builder: Callable producing the frame when no valid artifact exists
+        store: Cache store holding the source pages
+
+    Returns:
+        The parsed DataFrame
+    """
+    df = read_cached_frame(key, sources, store)
+    if df is not None:
+        return df
+
+    path = _artifact_path(store, key, store.fingerprint(sources + [f"parser-v{PARSER_VERSION}"]))
+    df = builder()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for old in path.parent.glob(f"{key}-*.pkl"):
+            old.unlink()
+        tmp = path.with_suffix(".tmp")
+        df.to_pickle(tmp)
+        tmp.replace(path)
+    except OSError as e:
+        print(f"⚠️  Could not write artifact {path.name}: {e}")
+    return df
+
+
+# ============= MATCHLOGS =============
+
+MATCHLOG_COLUMNS = ["team", "season", "date", "comp", "venue", "result",
+                    "goals_for", "goals_against", "opponent", "shots", "shots_on_target", "xg"]
+
+
+def _parse_matchlog(name: str, store: CacheStore) -> Optional[pd.DataFrame]:
+    m = MATCHLOG_PATTERN.match(name)
+    if not m:
+        return None
+    try:
+        raw = read_table(name, "matchlogs_for", store)
+    except (ValueError, IndexError) as e:
+        print(f"⚠️  Could not parse {name}: {e}")
+        return None
+
+    raw.columns = [col[-1] if isinstance(col, tuple) else col for col in raw.columns]
+    raw = raw[raw["Date"].notna() & raw["Result"].isin(["W", "D", "L"])]
+    return pd.DataFrame({
+        "team": m.group("team"),
+        "season": m.group("season"),
+        "date": pd.to_datetime(raw["Date"], errors="coerce"),
+        "comp": raw["Comp"].astype("string"),
+        "venue": raw["Venue"].astype("string"),
+        "result": raw["Result"].astype("string"),
+        "goals_for": _to_number(raw["GF"]),
+        "goals_against": _to_number(raw["GA"]),
+        "opponent": raw["Opponent"].astype("string"),
+        "shots": _to_number(raw["Sh"]),
+        "shots_on_target": _to_number(raw["SoT"]),
+        "xg": _to_number(raw["xG"]),
+    })
+
+
+def load_matchlogs(store: CacheStore = cache_store) -> pd.DataFrame:
+    """
+    All cached team shooting matchlogs as one long frame.
+
+    One row per (team, match) across every competition in the cache, with
+    columns ``MATCHLOG_COLUMNS``, sorted by team and date.
+    """
+    sources = store.names("matchlogs_*_shooting.html")
+
+    def build() -> pd.DataFrame:
+        frames = [f for f in (_parse_matchlog(n, store) for n in sources) if f is not None and len(f)]
+        if not frames:
+            return pd.DataFrame({c: pd.Series(dtype=object) for c in MATCHLOG_COLUMNS})
+        df = pd.concat(frames, ignore_index=True).dropna(subset=["date"])
+        for col in ("team", "season", "comp", "venue", "result"):
+            df[col] = df[col].astype("category")
+        for col in ("goals_for", "goals_against", "shots", "shots_on_target", "xg"):
+            df[col] = df[col].astype(np.float32)
+        return df.sort_values(["team", "date"], kind="stable").reset_index(drop=True)
+
+    return cached_frame("matchlogs", sources, build, store)
+
+
+# ============= SCHEDULES =============
+
+SCHEDULE_COLUMNS = ["league", "season", "week", "date", "home_team", "away_team",
+                    "home_goals", "away_goals", "home_xg", "away_xg", "played"]
+
+
+def _parse_schedule(name: str, store: CacheStore) -> Optional[pd.DataFrame]:
+    m = SCHEDULE_PATTERN.match(name)
+    if not m:
+        return None
+    try:
+        raw = read_table(name, re.compile(r"sched_"), store)
+    except (ValueError, IndexError) as e:
+        print(f"⚠️  Could not parse {name}: {e}")
+        return None
+
+    raw = raw[raw["Home"].notna() & raw["Away"].notna() & (raw["Home"] != "Home")]
+    score = raw["Score"].astype("string").str.extract(r"(\d+)\s*[–-]\s*(\d+)")
+    home_goals = pd.to_numeric(score[0], errors="coerce")
+    return pd.DataFrame({
+        "league": m.group("league"),
+        "season": m.group("season"),
+        "week": _to_number(raw["Wk"]),
+        "date": pd.to_datetime(raw["Date"], errors="coerce"),
+        "home_team": raw["Home"].astype("string"),
+        "away_team": raw["Away"].astype("string"),
+        "home_goals": home_goals,
+        "away_goals": pd.to_numeric(score[1], errors="coerce"),
+        "home_xg": _to_number(raw["xG"]),
+        "away_xg": _to_number(raw["xG.1"]),
+        "played": home_goals.notna(),
+    })
+
+
+def load_schedules(store: CacheStore = cache_store) -> pd.DataFrame:
+    """
+    Every cached league fixture (played and upcoming) as one frame.
+
+    Columns are ``SCHEDULE_COLUMNS``; unplayed fixtures have NaN goals and
+    ``played == False``. Rows are sorted by date.
+    """
+    sources = store.names("schedule_*.html")
+
+    def build() -> pd.DataFrame:
+        frames = [f for f in (_parse_schedule(n, store) for n in sources) if f is not None and len(f)]
+        if not frames:
+            return pd.DataFrame({c: pd.Series(dtype=object) for c in SCHEDULE_COLUMNS})
+        df = pd.concat(frames, ignore_index=True).dropna(subset=["date"])
+        for col in ("league", "season", "home_team", "away_team"):
+            df[col] = df[col].astype("category")
+        for col in ("week", "home_goals", "away_goals", "home_xg", "away_xg"):
+            df[col] = df[col].astype(np.float32)
+        return df.sort_values(["date", "league", "home_team"], kind="stable").reset_index(drop=True)
+
+    return cached_frame("schedules", sources, build, store)
+
+
+# ============= TEAM SEASON TABLES =============
+
+def _team_season_sources(store: CacheStore) -> Dict[tuple, str]:
+    """One teams page per (league, season), preferring the ``_stats`` variant."""
+    pages = {}
+    for name in store.names("teams_*.html"):
+        m = TEAMS_PATTERN.match(name)
+        if m and (m.group("stats") or (m.group("league"), m.group("season")) not in pages):
+            pages[(m.group("league"), m.group("season"))] = name
+    return pages
+
+
+def _parse_team_season(league: str, season: str, name: str, store: CacheStore) -> Optional[pd.DataFrame]:
+    try:
+        overall = _flatten_columns(read_table(name, re.compile(r"results.*_overall"), store))
+        home_away = _flatten_columns(read_table(name, re.compile(r"results.*_home_away"), store))
+    except (ValueError, IndexError) as e:
+        print(f"⚠️  Could not parse {name}: {e}")
+        return None
+
+    df = overall[["Rk", "Squad", "MP", "W", "D", "L", "GF", "GA", "GD", "Pts"]
+                 + [c for c in ("xG", "xGA") if c in overall.columns]].copy()
+    df = df.merge(home_away[["Squad"] + [c for c in home_away.columns if c.startswith(("Home ", "Away "))]],
+                  on="Squad", how="left")
+
+    for table_id, prefix in (("stats_squads_shooting_for", ""), ("stats_squads_shooting_against", "Opp ")):
+        try:
+            shooting = _flatten_columns(read_table(name, table_id, store))
+        except (ValueError, IndexError):
+            continue
+        shooting = shooting.rename(columns=lambda c: c.replace("Standard ", "").replace("Expected ", ""))
+        shooting["Squad"] = shooting["Squad"].astype(str).str.replace(r"^vs ", "", regex=True)
+        cols = {"90s": f"{prefix}90s", "Sh": f"{prefix}Sh", "SoT": f"{prefix}SoT"}
+        df = df.merge(shooting[["Squad"] + [c for c in cols if c in shooting.columns]].rename(columns=cols),
+                      on="Squad", how="left")
+
+    df.insert(0, "season", season)
+    df.insert(0, "league", league)
+    return df.rename(columns={"Squad": "team"})
+
+
+def load_team_seasons(store: CacheStore = cache_store) -> pd.DataFrame:
+    """
+    League table and shooting totals per (league, season, team) from the
+    cached ``teams_*`` pages, with FBref column names flattened
+    (e.g. 'Home Pts', 'Opp Sh').
+    """
+    pages = _team_season_sources(store)
+    sources = sorted(pages.values())
+
+    def build() -> pd.DataFrame:
+        frames = [f for f in (_parse_team_season(lg, se, n, store) for (lg, se), n in sorted(pages.items()))
+                  if f is not None and len(f)]
+        if not frames:
+            return pd.DataFrame({c: pd.Series(dtype=object) for c in ("league", "season", "team")})
+        df = pd.concat(frames, ignore_index=True)
+        for col in df.columns.difference(["league", "season", "team"]):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        return df
+
+    return cached_frame("team_seasons", sources, build, store)
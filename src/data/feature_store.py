@@ -0,0 +1,414 @@
+"""
+Point-in-time training features for ``BaselinePredictor``.
+
+Every played league fixture in ``soccer_data_cache`` becomes one training row
+whose features only use information available before kickoff:
+
+    elo        pre-match ratings from one chronological pass over all results
+    form       last-N form as of the day before kickoff (``merge_asof``)
+    season     season-to-date points/goal difference from earlier fixtures,
+               plus the previous season's final aggregates from the cube
+    h2h        earlier meetings of the pair (grouped cumulative sums)
+    rest       days since last match and fixtures in the last 14 days
+
+All joins are vectorized, including the ELO pass (``EloEngine`` replays the
+match table layer by layer). The matrix is memoized under ``<cache>/.artifacts``
+keyed by the source pages and a hash of the feature definition, next to an
+``EloHistory`` that serves as-of-date ratings to online features.
+"""
+
+import hashlib
+import shutil
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.cache_store import CacheStore, cache_store
+from src.data.congestion import CongestionIndex, congestion_index
+from src.data.fbref_cache import (ARTIFACT_DIRNAME, PARSER_VERSION, TeamResolver, cached_frame, load_matchlogs,
+                                  load_schedules, season_for_date)
+from src.data.form import DEFAULT_WINDOW, compute_rolling_form, form_engine
+from src.data.h2h_index import h2h_index
+from src.data.season_cube import SeasonCube, season_cube
+from src.models.elo import HISTORY_FORMAT_VERSION, EloEngine, EloHistory
+
+FEATURE_STORE_VERSION = 1
+
+ELO_INITIAL = 1500.0
+ELO_K_FACTOR = 32.0
+ELO_HOME_ADVANTAGE = 100.0
+
+META_COLUMNS = ["league", "season", "date", "home_team", "away_team", "home_goals", "away_goals", "target"]
+
+FORM_FEATURES = {
+    "points": "form_points",
+    "goals_for_per_match": "form_gf",
+    "goals_against_per_match": "form_ga",
+    "xg_per_match": "form_xg",
+}
+PREV_SEASON_FEATURES = {
+    "points_per_match": "prev_ppm",
+    "rank": "prev_rank",
+    "xg_per90": "prev_xg90",
+    "xga_per90": "prev_xga90",
+}
+REST_FEATURES = {"days_since_last_match": "rest_days", "matches_last_14d": "matches_14d"}
+
+FEATURE_COLUMNS = (
+    ["home_elo", "away_elo", "elo_diff"]
+    + [f"{side}_{name}" for side in ("home", "away") for name in FORM_FEATURES.values()]
+    + [f"{side}_{name}" for side in ("home", "away") for name in ("season_ppm", "season_gd", "season_played")]
+    + [f"{side}_{name}" for side in ("home", "away") for name in PREV_SEASON_FEATURES.values()]
+    + ["h2h_games", "h2h_home_win_rate", "h2h_draw_rate", "h2h_away_win_rate", "h2h_goal_diff"]
+    + [f"{side}_{name}" for side in ("home", "away") for name in REST_FEATURES.values()]
+)
+
+
+def feature_version() -> str:
+    """Hash of everything that changes the meaning of the feature matrix."""
+    spec = "|".join([str(FEATURE_STORE_VERSION), ",".join(FEATURE_COLUMNS), str(DEFAULT_WINDOW),
+                     f"{ELO_INITIAL}:{ELO_K_FACTOR}:{ELO_HOME_ADVANTAGE}"])
+    return hashlib.sha256(spec.encode("utf-8")).hexdigest()[:12]
+
+
+def previous_season(season: str) -> str:
+    """'2324' -> '2223'."""
+    start = int(season[:2])
+    return f"{(start - 1) % 100:02d}{start:02d}"
+
+
+def _elo_engine() -> EloEngine:
+    return EloEngine(k_factor=ELO_K_FACTOR, home_advantage=ELO_HOME_ADVANTAGE, initial_rating=ELO_INITIAL)
+
+
+def _form_features(matches: pd.DataFrame, form: pd.DataFrame, side: str) -> pd.DataFrame:
+    """Last-N form per side, strictly before kickoff."""
+    resolver = TeamResolver(form["team"].astype(str).unique())
+    left = pd.DataFrame({
+        "row": matches.index,
+        "team": matches[f"{side}_team"].astype(str).map(lambda t: resolver.resolve(t) or t),
+        "date": matches["date"].astype("datetime64[ns]"),
+    }).sort_values("date", kind="stable")
+    right = form[["team", "date"] + list(FORM_FEATURES)].copy()
+    right["team"] = right["team"].astype(str)
+    right["date"] = right["date"].astype("datetime64[ns]")
+    joined = pd.merge_asof(left, right.sort_values("date", kind="stable"), on="date", by="team",
+                           allow_exact_matches=False)
+    joined = joined.set_index("row").reindex(matches.index)
+    return joined[list(FORM_FEATURES)].rename(columns={k: f"{side}_{v}" for k, v in FORM_FEATURES.items()})
+
+
+def _season_to_date(matches: pd.DataFrame) -> pd.DataFrame:
+    """Points and goal difference per match from earlier fixtures of the same season."""
+    hg, ag = matches["home_goals"].to_numpy(), matches["away_goals"].to_numpy()
+    long = pd.DataFrame({
+        "row": np.r_[matches.index, matches.index],
+        "side": ["home"] * len(matches) + ["away"] * len(matches),
+        "key": np.r_[(matches["league"].astype(str) + "|" + matches["season"].astype(str)
+                      + "|" + matches["home_team"].astype(str)).to_numpy(),
+                     (matches["league"].astype(str) + "|" + matches["season"].astype(str)
+                      + "|" + matches["away_team"].astype(str)).to_numpy()],
+        "points": np.r_[np.select([hg > ag, hg == ag], [3, 1], 0), np.select([ag > hg, ag == hg], [3, 1], 0)],
+        "gd": np.r_[hg - ag, ag - hg],
+    })
+    # Rows are chronological within each side block; order both sides together by match position
+    long = long.sort_values("row", kind="stable")
+    grouped = long.groupby("key", sort=False)
+    played = grouped.cumcount()
+    points = grouped["points"].cumsum() - long["points"]
+    gd = grouped["gd"].cumsum() - long["gd"]
+    long["season_played"] = played
+    long["season_ppm"] = points / played.replace(0, np.nan)
+    long["season_gd"] = gd / played.replace(0, np.nan)
+
+    out = {}
+    for side in ("home", "away"):
+        part = long[long["side"] == side].set_index("row")
+        for col in ("season_ppm", "season_gd", "season_played"):
+            out[f"{side}_{col}"] = part[col].reindex(matches.index)
+    return pd.DataFrame(out, index=matches.index)
+
+
+def _previous_season_features(matches: pd.DataFrame, cube: pd.DataFrame) -> pd.DataFrame:
+    """Final aggregates of each team's previous season (any league in the cube)."""
+    prior = cube[["season", "team"] + list(PREV_SEASON_FEATURES)].drop_duplicates(["season", "team"])
+    prev_season = matches["season"].astype(str).map(previous_season)
+    out = []
+    for side in ("home", "away"):
+        left = pd.DataFrame({"season": prev_season, "team": matches[f"{side}_team"].astype(str)})
+        joined = left.merge(prior, on=["season", "team"], how="left")
+        joined.index = matches.index
+        out.append(joined[list(PREV_SEASON_FEATURES)].rename(
+            columns={k: f"{side}_{v}" for k, v in PREV_SEASON_FEATURES.items()}))
+    return pd.concat(out, axis=1)
+
+
+def _h2h_features(matches: pd.DataFrame) -> pd.DataFrame:
+    """Earlier meetings of each pair, from the home side's point of view."""
+    home, away = matches["home_team"].astype(str), matches["away_team"].astype(str)
+    home_is_a = (home <= away).to_numpy()
+    pair = np.where(home_is_a, home + "|" + away, away + "|" + home)
+    hg, ag = matches["home_goals"].to_numpy(), matches["away_goals"].to_numpy()
+    sign = np.where(home_is_a, 1, -1)
+
+    frame = pd.DataFrame({
+        "pair": pair,
+        "a_win": np.where(home_is_a, hg > ag, ag > hg).astype(np.int32),
+        "b_win": np.where(home_is_a, ag > hg, hg > ag).astype(np.int32),
+        "draw": (hg == ag).astype(np.int32),
+        "a_gd": (hg - ag) * sign,
+    }, index=matches.index)
+    grouped = frame.groupby("pair", sort=False)
+    games = grouped.cumcount().to_numpy()
+    prior = grouped[["a_win", "b_win", "draw", "a_gd"]].cumsum() - frame[["a_win", "b_win", "draw", "a_gd"]]
+
+    home_wins = np.where(home_is_a, prior["a_win"], prior["b_win"])
+    away_wins = np.where(home_is_a, prior["b_win"], prior["a_win"])
+    denom = np.where(games > 0, games, np.nan)
+    return pd.DataFrame({
+        "h2h_games": games,
+        "h2h_home_win_rate": home_wins / denom,
+        "h2h_draw_rate": prior["draw"].to_numpy() / denom,
+        "h2h_away_win_rate": away_wins / denom,
+        "h2h_goal_diff": prior["a_gd"].to_numpy() * sign / denom,
+    }, index=matches.index)
+
+
+def build_feature_frame(schedules: pd.DataFrame, matchlogs: pd.DataFrame,
+                        cube: pd.DataFrame, congestion: CongestionIndex) -> pd.DataFrame:
+    """
+    Assemble the point-in-time training frame.
+
+    Args:
+        schedules: Frame from ``load_schedules``
+        matchlogs: Frame from ``load_matchlogs``
+        cube: Season cube rows (``SeasonCube.to_frame``)
+        congestion: Built congestion index for the rest-day features
+
+    Returns:
+        One row per played fixture, chronological, with ``META_COLUMNS`` and
+        ``FEATURE_COLUMNS``
+    """
+    matches = schedules[schedules["played"]].copy()
+    matches["league"] = matches["league"].astype(str)
+    matches["season"] = matches["season"].astype(str)
+    matches = matches.sort_values(["date", "league", "home_team"], kind="stable").reset_index(drop=True)
+    hg, ag = matches["home_goals"], matches["away_goals"]
+    matches["target"] = np.select([hg > ag, hg == ag], [0, 1], 2).astype(np.int8)
+
+    home_elo, away_elo = _elo_engine().replay(matches["home_team"], matches["away_team"], matches["target"])
+    elo = pd.DataFrame({"home_elo": home_elo, "away_elo": away_elo, "elo_diff": home_elo - away_elo},
+                       index=matches.index)
+
+    form = compute_rolling_form(matchlogs)
+    rest = congestion.fixture_features(matches)
+    rest = rest[[f"{side}_{k}" for side in ("home", "away") for k in REST_FEATURES]].rename(
+        columns={f"{side}_{k}": f"{side}_{v}" for side in ("home", "away") for k, v in REST_FEATURES.items()})
+
+    frame = pd.concat([
+        matches[META_COLUMNS], elo,
+        _form_features(matches, form, "home"), _form_features(matches, form, "away"),
+        _season_to_date(matches), _previous_season_features(matches, cube),
+        _h2h_features(matches), rest,
+    ], axis=1)
+    frame[FEATURE_COLUMNS] = frame[FEATURE_COLUMNS].astype(np.float32)
+    return frame[META_COLUMNS + FEATURE_COLUMNS]
+
+
+class FeatureStore:
+    """
+    Disk-memoized point-in-time training matrix for the baseline models.
+    """
+
+    def __init__(self, store: CacheStore = cache_store):
+        self.store = store
+        self._frame: Optional[pd.DataFrame] = None
+        self._online: Optional[Dict[str, Any]] = None
+        self._elo_history: Optional[EloHistory] = None
+        self._positions = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+        self._lock = threading.RLock()
+
+    def _sources(self):
+        return (self.store.names("schedule_*.html") + self.store.names("matchlogs_*_shooting.html")
+                + self.store.names("teams_*.html") + [f"features-{feature_version()}"])
+
+    def _build(self) -> pd.DataFrame:
+        schedules = load_schedules(self.store)
+        matchlogs = load_matchlogs(self.store)
+        cube = SeasonCube(self.store).load().to_frame()
+        congestion = CongestionIndex(self.store).build(schedules, matchlogs)
+        return build_feature_frame(schedules, matchlogs, cube, congestion)
+
+    def training_frame(self) -> pd.DataFrame:
+        """Meta columns, target and features for every played fixture."""
+        if self._frame is None:
+            with self._lock:
+                if self._frame is None:
+                    self._frame = cached_frame("feature_store", self._sources(), self._build, self.store)
+        return self._frame
+
+    def training_matrix(self, leagues=None, seasons=None) -> Tuple[pd.DataFrame, np.ndarray]:
+        """
+        ``(X, y)`` ready for ``BaselinePredictor.train``.
+
+        Args:
+            leagues: Optional league codes to keep
+            seasons: Optional season keys to keep
+
+        Returns:
+            Feature frame (``FEATURE_COLUMNS``) and targets (0 home, 1 draw, 2 away)
+        """
+        frame = self.training_frame()
+        mask = np.ones(len(frame), dtype=bool)
+        if leagues is not None:
+            mask &= frame["league"].isin(list(leagues)).to_numpy()
+        if seasons is not None:
+            mask &= frame["season"].isin([str(s) for s in seasons]).to_numpy()
+        subset = frame[mask]
+        return subset[FEATURE_COLUMNS].reset_index(drop=True), subset["target"].to_numpy(dtype=np.int64)
+
+    def elo_history(self) -> EloHistory:
+        """
+        As-of-date ELO ratings over every played fixture.
+
+        Stored as memory-mapped arrays under ``<cache>/.artifacts``, keyed
+        like the training frame, so it is rebuilt only when results change.
+        """
+        if self._elo_history is None:
+            with self._lock:
+                if self._elo_history is None:
+                    self._elo_history = self._load_elo_history()
+        return self._elo_history
+
+    def _load_elo_history(self) -> EloHistory:
+        fingerprint = self.store.fingerprint(self._sources() + [f"parser-v{PARSER_VERSION}",
+                                                                f"elo-history-v{HISTORY_FORMAT_VERSION}"])
+        path = self.store.root / ARTIFACT_DIRNAME / f"elo_history-{fingerprint[:16]}"
+        history = EloHistory.load(path)
+        if history is not None:
+            return history
+
+        frame = self.training_frame()
+        history = _elo_engine().replay_history(frame["date"], frame["home_team"], frame["away_team"],
+                                               frame["target"])
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            for old in path.parent.glob("elo_history-*"):
+                shutil.rmtree(old, ignore_errors=True)
+            history.save(path)
+            return EloHistory.load(path) or history
+        except OSError as e:
+            print(f"⚠️  Could not write artifact {path.name}: {e}")
+            return history
+
+    # ============= ONLINE FEATURES =============
+
+    def _build_online(self) -> Dict[str, Any]:
+        """ELO history and season-to-date running totals from the training frame."""
+        frame = self.training_frame()
+        elo = self.elo_history()
+
+        hg, ag = frame["home_goals"].to_numpy(), frame["away_goals"].to_numpy()
+        long = pd.DataFrame({
+            "team": np.r_[frame["home_team"].astype(str), frame["away_team"].astype(str)],
+            "season": np.r_[frame["season"], frame["season"]],
+            "date": np.r_[frame["date"].to_numpy(dtype="datetime64[ns]"),
+                          frame["date"].to_numpy(dtype="datetime64[ns]")],
+            "points": np.r_[np.select([hg > ag, hg == ag], [3, 1], 0), np.select([ag > hg, ag == hg], [3, 1], 0)],
+            "gd": np.r_[hg - ag, ag - hg],
+        }).sort_values(["team", "season", "date"], kind="stable")
+        season_totals = {}
+        for key, group in long.groupby(["team", "season"], sort=False):
+            season_totals[key] = (group["date"].to_numpy(), np.cumsum(group["points"].to_numpy()),
+                                  np.cumsum(group["gd"].to_numpy()))
+
+        return {
+            "elo": elo,
+            "season_totals": season_totals,
+            "resolver": TeamResolver(elo.teams),
+        }
+
+    def prepare_online(self) -> Dict[str, Any]:
+        """Build (once) the indexes ``match_features`` reads from."""
+        if self._online is None:
+            with self._lock:
+                if self._online is None:
+                    self._online = self._build_online()
+        return self._online
+
+    def match_features(self, home_team: str, away_team: str, as_of=None,
+                       out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        ``FEATURE_COLUMNS`` for one upcoming fixture, from the in-memory indexes.
+
+        Uses the same definitions as the training frame: form, H2H and rest
+        days and ELO as of kickoff.
+
+        Args:
+            home_team: Home team name (FBref or common alias)
+            away_team: Away team name
+            as_of: Kickoff date; defaults to now
+            out: Optional preallocated float32 array to fill
+
+        Returns:
+            float32 array ordered like ``FEATURE_COLUMNS`` (NaN where unknown)
+        """
+        online = self.prepare_online()
+        when = pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.now().normalize()
+        season = season_for_date(when)
+        pos = self._positions
+        if out is None:
+            out = np.empty(len(FEATURE_COLUMNS), dtype=np.float32)
+        out.fill(np.nan)
+
+        names = {}
+        for side, team in (("home", home_team), ("away", away_team)):
+            name = names[side] = online["resolver"].resolve(team)
+            rating = online["elo"].rating(name, when) if name else None
+            out[pos[f"{side}_elo"]] = ELO_INITIAL if rating is None else rating
+
+            form = form_engine.lookup(team, when)
+            if form:
+                for src, dst in FORM_FEATURES.items():
+                    if src in form:
+                        out[pos[f"{side}_{dst}"]] = form[src]
+
+            totals = online["season_totals"].get((name, season))
+            played = 0
+            if totals is not None:
+                dates, points, gd = totals
+                played = int(np.searchsorted(dates, np.datetime64(when, "ns"), side="left"))
+                if played:
+                    out[pos[f"{side}_season_ppm"]] = points[played - 1] / played
+                    out[pos[f"{side}_season_gd"]] = gd[played - 1] / played
+            out[pos[f"{side}_season_played"]] = played
+
+            prev = season_cube.resolver.resolve(team) if season_cube.load().resolver else None
+            for src, dst in PREV_SEASON_FEATURES.items():
+                value = season_cube.get(prev, previous_season(season), src) if prev else None
+                if value is not None:
+                    out[pos[f"{side}_{dst}"]] = value
+
+            rest = congestion_index.features(team, when)
+            if rest:
+                for src, dst in REST_FEATURES.items():
+                    if rest.get(src) is not None:
+                        out[pos[f"{side}_{dst}"]] = rest[src]
+
+        out[pos["elo_diff"]] = out[pos["home_elo"]] - out[pos["away_elo"]]
+
+        h2h = h2h_index.stats(home_team, away_team, as_of=when)
+        out[pos["h2h_games"]] = h2h["overall_games"] if h2h else 0
+        if h2h:
+            games = h2h["overall_games"]
+            out[pos["h2h_home_win_rate"]] = h2h["team1_wins"] / games
+            out[pos["h2h_draw_rate"]] = h2h["draws"] / games
+            out[pos["h2h_away_win_rate"]] = h2h["team2_wins"] / games
+            out[pos["h2h_goal_diff"]] = (h2h["team1_goals"] - h2h["team2_goals"]) / games
+        return out
+
+
+# --- INSTANTIATE ---
+feature_store = FeatureStore()
@@ -0,0 +1,174 @@
+"""
+Rolling recent-form features computed from the cached FBref matchlogs.
+
+The whole history is processed in one vectorized pass: matchlogs are sorted
+by (team, date) and grouped rolling windows produce last-N totals for every
+team-match row. The result is a lookup table keyed by (team, date) where each
+row describes a team's form *after* that match, so an as-of query for a
+kickoff date only ever sees matches played strictly before it.
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.data.cache_store import CacheStore, cache_store
+from src.data.fbref_cache import TeamResolver, load_matchlogs
+
+DEFAULT_WINDOW = 5
+FORM_STATS = ["goals_for", "goals_against", "shots", "shots_on_target", "xg"]
+RESULT_POINTS = {"W": 3, "D": 1, "L": 0}
+COUNT_COLUMNS = ["matches", "wins", "draws", "losses", "points"]
+PER_MATCH_COLUMNS = [f"{col}_per_match" for col in FORM_STATS]
+
+
+def compute_rolling_form(matchlogs: pd.DataFrame, window: int = DEFAULT_WINDOW) -> pd.DataFrame:
+    """
+    Compute last-N form for every (team, match) row in one pass.
+
+    Args:
+        matchlogs: Frame from ``load_matchlogs`` (team, date, result, stats)
+        window: Number of most recent matches in the form window
+
+    Returns:
+        Frame indexed like ``matchlogs`` with rolling totals, per-match
+        averages and a result string (oldest -> newest, e.g. 'WDWLW')
+    """
+    df = matchlogs[["team", "date", "result"] + FORM_STATS].sort_values(["team", "date"], kind="stable")
+    result = df["result"].astype(str)
+
+    values = pd.DataFrame({
+        "team": df["team"],
+        "matches": 1.0,
+        "wins": (result == "W").astype(np.float32),
+        "draws": (result == "D").astype(np.float32),
+        "losses": (result == "L").astype(np.float32),
+        "points": result.map(RESULT_POINTS).astype(np.float32),
+        **{col: df[col].astype(np.float32) for col in FORM_STATS},
+    }, index=df.index)
+
+    grouped = values.groupby("team", observed=True, sort=False)
+    totals = grouped.rolling(window, min_periods=1).sum().reset_index(level=0, drop=True)
+    # xG and shots are missing for some cup ties; average over the matches that have them
+    counts = grouped[FORM_STATS].rolling(window, min_periods=1).count().reset_index(level=0, drop=True)
+
+    out = pd.DataFrame({"team": df["team"], "date": df["date"]}, index=df.index)
+    out["matches"] = totals["matches"].astype(np.int16)
+    for col in ["wins", "draws", "losses", "points"]:
+        out[col] = totals[col].astype(np.int16)
+    for col in FORM_STATS:
+        out[col] = totals[col].astype(np.float32)
+        out[f"{col}_per_match"] = (totals[col] / counts[col].replace(0, np.nan)).astype(np.float32)
+
+    # Result string: shift within team and concatenate, newest character last
+    letters = result.str[0]
+    by_team = letters.groupby(df["team"], observed=True)
+    form = letters.copy()
+    for lag in range(1, window):
+        form = by_team.shift(lag).fillna("") + form
+    out["form"] = form.astype("string")
+    return out
+
+
+class FormEngine:
+    """
+    As-of lookups of rolling team form from the cached matchlogs.
+
+    The table is built lazily on first use and kept in memory; lookups are a
+    binary search over one team's sorted match dates, reading the row from
+    plain NumPy columns (a row of the mixed-dtype frame costs milliseconds).
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW, store: CacheStore = cache_store):
+        """
+        Args:
+            window: Number of most recent matches in the form window
+            store: Cache store holding the matchlog pages
+        """
+        self.window = window
+        self.store = store
+        self.table: Optional[pd.DataFrame] = None
+        self.resolver: Optional[TeamResolver] = None
+        self._offsets: Dict[str, tuple] = {}
+        self._dates: Optional[np.ndarray] = None
+        self._counts: Optional[np.ndarray] = None
+        self._stats: Optional[np.ndarray] = None
+        self._forms: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def build(self, matchlogs: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Materialize the (team, date) form table from the matchlogs."""
+        if matchlogs is None:
+            matchlogs = load_matchlogs(self.store)
+
+        table = compute_rolling_form(matchlogs, self.window).reset_index(drop=True)
+        teams = table["team"].astype(str).to_numpy()
+        boundaries = np.flatnonzero(np.r_[True, teams[1:] != teams[:-1], True])
+
+        self._offsets = {teams[start]: (start, end) for start, end in zip(boundaries[:-1], boundaries[1:])}
+        self._dates = table["date"].to_numpy(dtype="datetime64[ns]")
+        self._counts = table[COUNT_COLUMNS].to_numpy(dtype=np.int64)
+        self._stats = table[FORM_STATS + PER_MATCH_COLUMNS].to_numpy(dtype=np.float64)
+        self._forms = table["form"].astype(str).to_numpy(dtype=object)
+        self.resolver = TeamResolver(self._offsets)
+        self.table = table
+        return table
+
+    def _ensure_built(self):
+        if self.table is None:
+            with self._lock:
+                if self.table is None:
+                    self.build()
+
+    @property
+    def teams(self) -> List[str]:
+        self._ensure_built()
+        return list(self._offsets)
+
+    def lookup(self, team: str, as_of: Optional[Union[str, datetime, pd.Timestamp]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Form for a team going into a match on ``as_of``.
+
+        Args:
+            team: Team name (FBref or common alias)
+            as_of: Kickoff date; defaults to now (latest cached form)
+
+        Returns:
+            Dictionary of form features, or None if the team has no history
+        """
+        self._ensure_built()
+        name = self.resolver.resolve(team)
+        if name is None:
+            return None
+
+        start, end = self._offsets[name]
+        when = np.datetime64(pd.Timestamp(as_of if as_of is not None else datetime.now()), "ns")
+        pos = start + np.searchsorted(self._dates[start:end], when, side="left") - 1
+        if pos < start:
+            return None
+
+        stats = self._stats[pos].tolist()
+        totals, per_match = stats[:len(FORM_STATS)], stats[len(FORM_STATS):]
+        return {
+            "team": name,
+            "last_match": str(self._dates[pos].astype("datetime64[D]")),
+            "form": self._forms[pos],
+            **dict(zip(COUNT_COLUMNS, self._counts[pos].tolist())),
+            **{col: round(value, 2) for col, value in zip(FORM_STATS, totals)},
+            **{col: round(value, 2) for col, value in zip(PER_MATCH_COLUMNS, per_match) if value == value},
+        }
+
+    def summary(self, team: str, as_of=None) -> Optional[str]:
+        """Short human-readable form line, e.g. 'WWDLW (10 pts, GF 9 GA 4, xG 8.1)'."""
+        form = self.lookup(team, as_of)
+        if not form:
+            return None
+        return (f"{form['form']} ({form['points']} pts, GF {form['goals_for']:.0f} "
+                f"GA {form['goals_against']:.0f}, xG {form['xg']:.1f})")
+
+
+# --- INSTANTIATE ---
+form_engine = FormEngine()
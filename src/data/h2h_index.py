@@ -0,0 +1,237 @@
+"""
+Local head-to-head index built from the cached FBref schedules.
+
+Every played league fixture in ``soccer_data_cache`` is folded into a record
+keyed by the unordered team pair. Each record keeps running totals (overall
+and per venue) plus the compact match history, so lookups are served from
+memory and new results can be added incrementally without a rebuild.
+"""
+
+import math
+import threading
+from bisect import bisect_left
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from src.data.cache_store import CacheStore, cache_store
+from src.data.fbref_cache import TeamResolver, load_schedules
+
+DateLike = Union[str, date, datetime, pd.Timestamp]
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _ordinal(when: DateLike) -> int:
+    return pd.Timestamp(when).date().toordinal()
+
+
+class PairRecord:
+    """
+    Results between two teams, stored from the point of view of ``team_a``
+    (the alphabetically first team of the pair).
+    """
+
+    __slots__ = ("team_a", "team_b", "days", "a_home", "goals_a", "goals_b", "totals")
+
+    FIELDS = ("games", "a_wins", "b_wins", "draws",
+              "a_home_games", "a_home_wins", "a_home_losses",
+              "b_home_games", "b_home_wins", "b_home_losses",
+              "goals_a", "goals_b")
+
+    def __init__(self, team_a: str, team_b: str):
+        self.team_a = team_a
+        self.team_b = team_b
+        self.days: List[int] = []
+        self.a_home: List[bool] = []
+        self.goals_a: List[int] = []
+        self.goals_b: List[int] = []
+        self.totals = dict.fromkeys(self.FIELDS, 0)
+
+    def add(self, day: int, a_home: bool, goals_a: int, goals_b: int):
+        """Insert one result (kept sorted by date) and update the running totals."""
+        pos = bisect_left(self.days, day)
+        self.days.insert(pos, day)
+        self.a_home.insert(pos, a_home)
+        self.goals_a.insert(pos, goals_a)
+        self.goals_b.insert(pos, goals_b)
+        self._accumulate(self.totals, a_home, goals_a, goals_b, 1)
+
+    @staticmethod
+    def _accumulate(totals: Dict[str, float], a_home: bool, goals_a: int, goals_b: int, weight: float):
+        totals["games"] += weight
+        totals["goals_a"] += goals_a * weight
+        totals["goals_b"] += goals_b * weight
+        a_won, b_won = goals_a > goals_b, goals_b > goals_a
+        if a_won:
+            totals["a_wins"] += weight
+        elif b_won:
+            totals["b_wins"] += weight
+        else:
+            totals["draws"] += weight
+
+        if a_home:
+            totals["a_home_games"] += weight
+            totals["a_home_wins"] += weight * a_won
+            totals["a_home_losses"] += weight * b_won
+        else:
+            totals["b_home_games"] += weight
+            totals["b_home_wins"] += weight * b_won
+            totals["b_home_losses"] += weight * a_won
+
+    def aggregate(self, before: Optional[int] = None, half_life_days: Optional[float] = None,
+                  last_n: Optional[int] = None) -> Dict[str, float]:
+        """
+        Totals over the stored matches, optionally as of a date, limited to the
+        last N meetings and/or weighted by exponential recency decay.
+        """
+        if before is None and half_life_days is None and last_n is None:
+            return self.totals
+
+        end = bisect_left(self.days, before) if before is not None else len(self.days)
+        start = max(0, end - last_n) if last_n else 0
+        ref_day = before if before is not None else date.today().toordinal()
+        decay = math.log(2) / half_life_days if half_life_days else 0.0
+
+        totals = dict.fromkeys(self.FIELDS, 0.0 if decay else 0)
+        for i in range(start, end):
+            weight = math.exp(-decay * (ref_day - self.days[i])) if decay else 1
+            self._accumulate(totals, self.a_home[i], self.goals_a[i], self.goals_b[i], weight)
+        return totals
+
+
+class H2HIndex:
+    """
+    In-memory head-to-head lookups keyed by unordered team pair.
+    """
+
+    def __init__(self, store: CacheStore = cache_store):
+        self.store = store
+        self.pairs: Dict[Tuple[str, str], PairRecord] = {}
+        self.resolver: Optional[TeamResolver] = None
+        self._teams: set = set()
+        self._built = False
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(team1: str, team2: str) -> Tuple[str, str]:
+        return (team1, team2) if team1 <= team2 else (team2, team1)
+
+    # ============= BUILD / UPDATE =============
+
+    def build(self, schedules: Optional[pd.DataFrame] = None) -> "H2HIndex":
+        """(Re)build the index from every played fixture in the cached schedules."""
+        if schedules is None:
+            schedules = load_schedules(self.store)
+        played = schedules[schedules["played"]].sort_values("date", kind="stable")
+
+        with self._lock:
+            self.pairs = {}
+            self._teams = set()
+            days = played["date"].to_numpy(dtype="datetime64[D]").astype("int64") + EPOCH_ORDINAL
+            for day, home, away, hg, ag in zip(days, played["home_team"].astype(str),
+                                               played["away_team"].astype(str),
+                                               played["home_goals"].to_numpy(),
+                                               played["away_goals"].to_numpy()):
+                self._add(int(day), home, away, int(hg), int(ag))
+            self.resolver = TeamResolver(self._teams)
+            self._built = True
+        return self
+
+    def _ensure_built(self):
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self.build()
+
+    def _add(self, day: int, home: str, away: str, home_goals: int, away_goals: int):
+        key = self._key(home, away)
+        record = self.pairs.get(key)
+        if record is None:
+            record = self.pairs[key] = PairRecord(*key)
+            self._teams.update(key)
+        if record.team_a == home:
+            record.add(day, True, home_goals, away_goals)
+        else:
+            record.add(day, False, away_goals, home_goals)
+
+    def add_result(self, home_team: str, away_team: str, home_goals: int, away_goals: int,
+                   match_date: DateLike):
+        """
+        Fold a new result into the index without rebuilding.
+
+        Team names are resolved against the known teams; unknown teams (e.g. a
+        newly promoted side) are added as-is.
+        """
+        self._ensure_built()
+        with self._lock:
+            home = self.resolver.resolve(home_team) or home_team
+            away = self.resolver.resolve(away_team) or away_team
+            new_teams = {home, away} - self._teams
+            self._add(_ordinal(match_date), home, away, int(home_goals), int(away_goals))
+            if new_teams:
+                self.resolver = TeamResolver(self._teams)
+
+    # ============= LOOKUPS =============
+
+    def record(self, team1: str, team2: str) -> Optional[PairRecord]:
+        """Raw pair record for two team names (any order), or None."""
+        self._ensure_built()
+        name1, name2 = self.resolver.resolve(team1), self.resolver.resolve(team2)
+        if not name1 or not name2 or name1 == name2:
+            return None
+        return self.pairs.get(self._key(name1, name2))
+
+    def stats(self, team1: str, team2: str, as_of: Optional[DateLike] = None,
+              half_life_days: Optional[float] = None, last_n: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Head-to-head summary with the same fields as
+        ``SoccerdataClient.extract_h2h_stats`` (team1 = first argument).
+
+        Args:
+            team1: First team (usually the home side)
+            team2: Second team
+            as_of: Only count meetings strictly before this date
+            half_life_days: Weight meetings by exponential recency decay
+            last_n: Only count the most recent N meetings
+
+        Returns:
+            Dictionary of H2H stats, or None if the teams never met
+        """
+        record = self.record(team1, team2)
+        if record is None:
+            return None
+
+        before = _ordinal(as_of) if as_of is not None else None
+        totals = record.aggregate(before, half_life_days, last_n)
+        if not totals["games"]:
+            return None
+
+        end = bisect_left(record.days, before) if before is not None else len(record.days)
+        flipped = record.team_a != self.resolver.resolve(team1)
+        one, two = ("b", "a") if flipped else ("a", "b")
+        num = (lambda v: round(v, 3)) if half_life_days else (lambda v: v)
+        games = totals["games"]
+        return {
+            "team1_name": record.team_b if flipped else record.team_a,
+            "team2_name": record.team_a if flipped else record.team_b,
+            "overall_games": num(games),
+            "team1_wins": num(totals[f"{one}_wins"]),
+            "team2_wins": num(totals[f"{two}_wins"]),
+            "draws": num(totals["draws"]),
+            "team1_home_wins": num(totals[f"{one}_home_wins"]),
+            "team1_home_losses": num(totals[f"{one}_home_losses"]),
+            "team2_home_wins": num(totals[f"{two}_home_wins"]),
+            "team2_home_losses": num(totals[f"{two}_home_losses"]),
+            "team1_home_games": num(totals[f"{one}_home_games"]),
+            "team2_home_games": num(totals[f"{two}_home_games"]),
+            "team1_goals": num(totals[f"goals_{one}"]),
+            "team2_goals": num(totals[f"goals_{two}"]),
+            "team1_win_percentage": round(totals[f"{one}_wins"] / games * 100, 2),
+            "team2_win_percentage": round(totals[f"{two}_wins"] / games * 100, 2),
+            "last_meeting": date.fromordinal(record.days[end - 1]).isoformat(),
+        }
+
+
+# --- INSTANTIATE ---
+h2h_index = H2HIndex()
@@ -0,0 +1,282 @@
+"""
+League and season catalog built from the cached FBref ``leagues.html`` and
+``seasons_*`` pages.
+
+League identifiers show up in three dialects across the codebase:
+
+    soccerdata / FBref codes   "ENG-Premier League"  (download_all_data.py)
+    FBref competition ids      9                     (fbref.com/en/comps/9/...)
+    upstream API league ids    39 (RapidAPI / frontend), 228 (Soccerdata API)
+
+The catalog parses the cached pages once, stores a small JSON artifact and
+maps any of those identifiers (plus season spellings like "2023-2024",
+"2023-24", 2023 or "2324") onto one record with dict lookups. Numeric ids
+are looked up in a single namespace, the frontend's api_league_id unless
+another is named.
+"""
+
+import json
+import re
+import threading
+from io import StringIO
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+
+from src.data.cache_store import CacheStore, cache_store
+from src.data.fbref_cache import ARTIFACT_DIRNAME, PARSER_VERSION, _extract_table
+
+CATALOG_VERSION = 1
+
+# soccerdata codes whose name differs from FBref's competition name
+SOCCERDATA_CODES = {
+    "Premier League": "ENG-Premier League",
+    "La Liga": "ESP-La Liga",
+    "Serie A": "ITA-Serie A",
+    "Fußball-Bundesliga": "GER-Bundesliga",
+    "Ligue 1": "FRA-Ligue 1",
+    "Big 5 European Leagues Combined": "Big 5 European Leagues Combined",
+}
+
+# Upstream API ids that are not on any cached page
+EXTERNAL_LEAGUE_IDS = {
+    "ENG-Premier League": {"api_league_id": 39, "soccerdata_api_id": 228},
+    "ESP-La Liga": {"api_league_id": 140},
+    "ITA-Serie A": {"api_league_id": 135},
+    "GER-Bundesliga": {"api_league_id": 78},
+    "FRA-Ligue 1": {"api_league_id": 61},
+}
+
+# Short names used by team_id_database and common user input
+LEAGUE_ALIASES = {
+    "ENG-Premier League": ["Premier League", "EPL", "English Premier League"],
+    "ESP-La Liga": ["La Liga", "LaLiga", "Primera Division"],
+    "ITA-Serie A": ["Serie A"],
+    "GER-Bundesliga": ["Bundesliga", "Fußball-Bundesliga"],
+    "FRA-Ligue 1": ["Ligue 1"],
+}
+
+# Namespaces of numeric league ids (frontend ids are api_league_id)
+ID_TYPES = ("api_league_id", "soccerdata_api_id", "fbref_id")
+
+COMP_ID_PATTERN = re.compile(r"/comps/(\d+)/")
+
+
+def season_key(season: Union[str, int, None]) -> Optional[str]:
+    """
+    Normalize a season spelling to the soccerdata key.
+
+    '2023-2024', '2023-24', '2023/24', 2023 and '2324' all map to '2324'.
+    Four-digit strings made of two consecutive years ('2324', '2021', '9900')
+    are already keys; other four-digit values and ints are start years.
+    """
+    if season is None:
+        return None
+    text = str(season).strip()
+    m = re.fullmatch(r"(\d{4})\s*[-/]\s*(\d{2}|\d{4})", text)
+    if m:
+        start = int(m.group(1))
+        return f"{start % 100:02d}{(start + 1) % 100:02d}"
+    if re.fullmatch(r"\d{4}", text):
+        if isinstance(season, str) and (int(text[:2]) + 1) % 100 == int(text[2:]):
+            return text
+        start = int(text)
+        return f"{start % 100:02d}{(start + 1) % 100:02d}"
+    return None
+
+
+def season_label(key: str) -> str:
+    """'2324' -> '2023-2024' (years before 2000 only for keys starting >= 50)."""
+    start = int(key[:2])
+    century = 1900 if start >= 50 else 2000
+    return f"{century + start}-{century + start + 1}"
+
+
+def _cell(value) -> tuple:
+    """(text, href) cell from ``read_html(extract_links='body')``."""
+    return value if isinstance(value, tuple) else (value, None)
+
+
+def _parse_leagues(html: str) -> List[Dict[str, Any]]:
+    html = html.replace("<!--", "").replace("-->", "")
+    leagues = []
+    for table_id in re.findall(r'<table[^>]*\bid="(comps_(?:club|[\w]*club_league[\w]*))"', html):
+        df = pd.read_html(StringIO(_extract_table(html, table_id)), extract_links="body")[0]
+        for _, row in df.iterrows():
+            name, href = _cell(row["Competition Name"])
+            country = _cell(row.get("Country"))[0]
+            if not isinstance(name, str):
+                continue
+            comp = COMP_ID_PATTERN.search(href or "")
+            country_code = country.split()[-1] if isinstance(country, str) and country.strip() else None
+            code = SOCCERDATA_CODES.get(name) or (f"{country_code}-{name}" if country_code else name)
+            leagues.append({
+                "code": code,
+                "fbref_name": name,
+                "fbref_id": int(comp.group(1)) if comp else None,
+                "country": country_code,
+                "gender": _cell(row.get("Gender"))[0],
+                "tier": _cell(row["Tier"])[0] if "Tier" in row else None,
+                "first_season": season_key(_cell(row.get("First Season"))[0]),
+                "last_season": season_key(_cell(row.get("Last Season"))[0]),
+            })
+    return leagues
+
+
+def _parse_seasons(html: str) -> List[Dict[str, Any]]:
+    html = html.replace("<!--", "").replace("-->", "")
+    fragment = _extract_table(html, "seasons")
+    if fragment is None:
+        return []
+    df = pd.read_html(StringIO(fragment))[0]
+    seasons = []
+    for _, row in df.iterrows():
+        key = season_key(row.get("Season"))
+        if key:
+            champion = row.get("Champion")
+            seasons.append({
+                "key": key,
+                "label": str(row.get("Season")),
+                "champion": champion if isinstance(champion, str) else None,
+            })
+    return seasons
+
+
+class LeagueCatalog:
+    """
+    O(1) translation between league codes, FBref ids, upstream API ids and
+    season keys.
+    """
+
+    def __init__(self, store: CacheStore = cache_store):
+        self.store = store
+        self.leagues: Dict[str, Dict[str, Any]] = {}
+        self._by_id: Dict[tuple, str] = {}
+        self._by_name: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    # ============= BUILD / PERSIST =============
+
+    def _sources(self) -> List[str]:
+        return self.store.names("leagues.html") + self.store.names("seasons_*.html")
+
+    def _build(self) -> Dict[str, Dict[str, Any]]:
+        leagues: Dict[str, Dict[str, Any]] = {}
+        if self.store.exists("leagues.html"):
+            for record in _parse_leagues(self.store.read_text("leagues.html")):
+                leagues.setdefault(record["code"], record)
+
+        for name in self.store.names("seasons_*.html"):
+            code = name[len("seasons_"):-len(".html")]
+            record = leagues.setdefault(code, {"code": code, "fbref_name": code.split("-", 1)[-1]})
+            record["seasons"] = _parse_seasons(self.store.read_text(name))
+
+        for code, ids in EXTERNAL_LEAGUE_IDS.items():
+            if code in leagues:
+                leagues[code].update(ids)
+        return leagues
+
+    def load(self) -> "LeagueCatalog":
+        """Load the catalog artifact, rebuilding it if the cached pages changed."""
+        if self._loaded:
+            return self
+        with self._lock:
+            if self._loaded:
+                return self
+            fingerprint = self.store.fingerprint(
+                self._sources() + [f"parser-v{PARSER_VERSION}", f"catalog-v{CATALOG_VERSION}"]
+            )
+            path = self.store.root / ARTIFACT_DIRNAME / f"league_catalog-{fingerprint[:16]}.json"
+            if path.exists():
+                with open(path, "r", encoding="utf-8") as f:
+                    leagues = json.load(f)
+            else:
+                leagues = self._build()
+                try:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    for old in path.parent.glob("league_catalog-*.json"):
+                        old.unlink()
+                    with open(path, "w", encoding="utf-8") as f:
+                        json.dump(leagues, f, ensure_ascii=False, separators=(",", ":"))
+                except OSError as e:
+                    print(f"⚠️  Could not write league catalog artifact: {e}")
+            self._index(leagues)
+            self._loaded = True
+        return self
+
+    def _index(self, leagues: Dict[str, Dict[str, Any]]):
+        self.leagues = leagues
+        self._by_id, self._by_name = {}, {}
+        for code, record in leagues.items():
+            for field in ID_TYPES:
+                if record.get(field) is not None:
+                    self._by_id.setdefault((field, int(record[field])), code)
+            names = [code, record.get("fbref_name")] + LEAGUE_ALIASES.get(code, [])
+            for name in names:
+                if name:
+                    self._by_name.setdefault(name.casefold(), code)
+
+    # ============= LOOKUPS =============
+
+    def resolve(self, league: Union[str, int, None], id_type: str = "api_league_id") -> Optional[Dict[str, Any]]:
+        """
+        Find a league record from any identifier.
+
+        Numeric ids are only looked up in one namespace: the ids of the three
+        sources overlap, so a frontend id must not fall through to an
+        unrelated FBref competition.
+
+        Args:
+            league: Code ('ENG-Premier League'), name ('La Liga') or numeric id
+            id_type: Namespace of numeric ids ('api_league_id' as sent by the
+                frontend, 'soccerdata_api_id' or 'fbref_id')
+
+        Returns:
+            League record dict, or None if unknown
+        """
+        if id_type not in ID_TYPES:
+            raise ValueError(f"Unknown league id type '{id_type}'")
+        self.load()
+        if league is None:
+            return None
+        if isinstance(league, str) and not league.strip().isdigit():
+            code = self._by_name.get(league.strip().casefold())
+            return self.leagues.get(code) if code else None
+
+        code = self._by_id.get((id_type, int(league)))
+        return self.leagues[code] if code else None
+
+    def code(self, league: Union[str, int, None], id_type: str = "api_league_id") -> Optional[str]:
+        """soccerdata/FBref league code for any identifier."""
+        record = self.resolve(league, id_type)
+        return record["code"] if record else None
+
+    def display_name(self, league: Union[str, int, None], id_type: str = "api_league_id") -> Optional[str]:
+        """Short league name ('Premier League', 'Bundesliga') for any identifier."""
+        record = self.resolve(league, id_type)
+        if not record:
+            return None
+        aliases = LEAGUE_ALIASES.get(record["code"])
+        return aliases[0] if aliases else record.get("fbref_name")
+
+    def seasons(self, league: Union[str, int, None], id_type: str = "api_league_id") -> List[str]:
+        """Season keys known for a league, newest first."""
+        record = self.resolve(league, id_type)
+        return [s["key"] for s in record.get("seasons", [])] if record else []
+
+    def has_season(self, league: Union[str, int, None], season: Union[str, int],
+                   id_type: str = "api_league_id") -> Optional[bool]:
+        """True/False if the league's season list is cached, None if unknown."""
+        keys = self.seasons(league, id_type)
+        if not keys:
+            return None
+        return season_key(season) in keys
+
+    def codes(self) -> List[str]:
+        self.load()
+        return list(self.leagues)
+
+
+# --- INSTANTIATE ---
+league_catalog = LeagueCatalog()
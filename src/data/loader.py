@@ -9,6 +9,13 @@ from w5_engine.cached_team_data import (
     get_cached_h2h_data,
     get_cached_league_data
 )
+from src.data.form import form_engine
+from src.data.season_cube import season_cube
+from src.data.h2h_index import h2h_index
+from src.data.congestion import congestion_index
+from src.data.fbref_cache import season_for_date
+from src.data.league_catalog import league_catalog
+from src.models.season_sim import season_simulator
 
 # --- CONFIGURATION ---
 RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
@@ -26,6 +33,12 @@ class SoccerDataLoader:
         if not RAPIDAPI_KEY:
             print("❌ WARNING: RAPIDAPI_KEY not found in environment.")
 
+        # Season aggregates are served from the local cube; load it once at startup
+        try:
+            season_cube.load()
+        except Exception as e:
+            print(f"⚠️  Season cube unavailable: {e}")
+
     def _get(self, endpoint: str, params: Dict) -> Dict:
         """Helper to make API calls safely."""
         try:
@@ -72,7 +85,7 @@ class SoccerDataLoader:
         # Try local database first (instant, no API call)
         try:
             print(f"🔍 Looking up {team_name} in team database...")
-            correct_id = find_team_id_in_db(team_name)
+            correct_id = find_team_id_in_db(team_name, league_id)
             
             if correct_id:
                 print(f"✅ Found in database: {team_name} (ID: {correct_id})")
@@ -104,6 +117,7 @@ class SoccerDataLoader:
         league_id = kwargs.get('league_id')
         home_team_id = kwargs.get('home_team_id')
         away_team_id = kwargs.get('away_team_id')
+        match_date = kwargs.get('match_date')
         
         # AUTO-CORRECT TEAM IDs IF THEY DON'T MATCH
         if home_team and league_id:
@@ -143,29 +157,29 @@ class SoccerDataLoader:
                                 } for row in standings_list[:6]
                             ]
             
-            # Fetch head-to-head stats
-            if home_team_id and away_team_id:
-                h2h = self.soccerdata_client.get_head_to_head(home_team_id, away_team_id)
-                if h2h:
-                    h2h_summary = self.soccerdata_client.extract_h2h_stats(home_team_id, away_team_id)
-                    if h2h_summary:
-                        quantitative_features['h2h_overall_games'] = h2h_summary['overall_games']
-                        quantitative_features['h2h_team1_wins'] = h2h_summary['team1_wins']
-                        quantitative_features['h2h_team2_wins'] = h2h_summary['team2_wins']
-                        quantitative_features['h2h_draws'] = h2h_summary['draws']
-                        quantitative_features['h2h_team1_win_pct'] = h2h_summary['team1_win_percentage']
-                        quantitative_features['h2h_team1_home_wins'] = h2h_summary['team1_home_wins']
-                else:
+            # Head-to-head: local index built from cached schedules first (no API call)
+            h2h_summary = None
+            if isinstance(home_team, str) and isinstance(away_team, str):
+                h2h_summary = h2h_index.stats(home_team, away_team, as_of=match_date)
+                if h2h_summary:
+                    print(f"   📦 Using local H2H index ({h2h_summary['overall_games']} meetings)")
+
+            # Fall back to the API (one call; extract_h2h_stats fetches the pair itself)
+            if not h2h_summary and home_team_id and away_team_id:
+                h2h_summary = self.soccerdata_client.extract_h2h_stats(home_team_id, away_team_id)
+                if not h2h_summary:
                     # Use cached H2H data as fallback
-                    cached_h2h = get_cached_h2h_data(home_team_id, away_team_id)
-                    if cached_h2h:
+                    h2h_summary = get_cached_h2h_data(home_team_id, away_team_id)
+                    if h2h_summary:
                         print(f"   📦 Using cached H2H data")
-                        quantitative_features['h2h_overall_games'] = cached_h2h['overall_games']
-                        quantitative_features['h2h_team1_wins'] = cached_h2h['team1_wins']
-                        quantitative_features['h2h_team2_wins'] = cached_h2h['team2_wins']
-                        quantitative_features['h2h_draws'] = cached_h2h['draws']
-                        quantitative_features['h2h_team1_win_pct'] = cached_h2h['team1_win_percentage']
-                        quantitative_features['h2h_team1_home_wins'] = cached_h2h['team1_home_wins']
+
+            if h2h_summary:
+                quantitative_features['h2h_overall_games'] = h2h_summary['overall_games']
+                quantitative_features['h2h_team1_wins'] = h2h_summary['team1_wins']
+                quantitative_features['h2h_team2_wins'] = h2h_summary['team2_wins']
+                quantitative_features['h2h_draws'] = h2h_summary['draws']
+                quantitative_features['h2h_team1_win_pct'] = h2h_summary['team1_win_percentage']
+                quantitative_features['h2h_team1_home_wins'] = h2h_summary['team1_home_wins']
             
             # Fetch team transfers
             if home_team_id:
@@ -236,6 +250,84 @@ class SoccerDataLoader:
         
         except Exception as e:
             print(f"❌ Error fetching from Soccerdata API: {str(e)}")
+
+        # Recent form from cached FBref matchlogs (no API call)
+        try:
+            for side, team in (('home', home_team), ('away', away_team)):
+                form = form_engine.lookup(team, match_date) if isinstance(team, str) else None
+                if form:
+                    quantitative_features[f'{side}_form'] = form['form']
+                    quantitative_features[f'{side}_form_stats'] = {
+                        key: form[key] for key in (
+                            'matches', 'points', 'goals_for', 'goals_against', 'shots',
+                            'shots_on_target', 'xg', 'last_match'
+                        ) if key in form
+                    }
+        except Exception as e:
+            print(f"⚠️  Form lookup failed: {str(e)}")
+
+        # Rest days and fixture congestion from cached schedules/matchlogs
+        try:
+            for side, team in (('home', home_team), ('away', away_team)):
+                rest = congestion_index.features(team, match_date) if isinstance(team, str) else None
+                if rest:
+                    for key, value in rest.items():
+                        if value is not None:
+                            quantitative_features[f'{side}_{key}'] = value
+        except Exception as e:
+            print(f"⚠️  Congestion lookup failed: {str(e)}")
+
+        # Season aggregates and table position from the local season cube
+        try:
+            season = season_for_date(match_date) if match_date else None
+            home_season = season_cube.lookup(home_team, season) if isinstance(home_team, str) else None
+            away_season = season_cube.lookup(away_team, season) if isinstance(away_team, str) else None
+            if home_season or away_season:
+                quantitative_features['scoring_stats'] = {
+                    f'{side}_attack': {
+                        key: stats[key] for key in (
+                            'season', 'matches', 'goals_for', 'goals_against', 'xg', 'xga', 'shots',
+                            'goals_for_per90', 'goals_against_per90', 'xg_per90', 'xga_per90'
+                        ) if key in stats
+                    }
+                    for side, stats in (('home', home_season), ('away', away_season)) if stats
+                }
+                quantitative_features['standings_context'] = " | ".join(
+                    f"{label} Rank: {stats['rank']} ({stats['points']} pts, {stats['season']})"
+                    if stats and 'rank' in stats else f"{label} Rank: N/A"
+                    for label, stats in (('Home', home_season), ('Away', away_season))
+                )
+                # Fall back to the cached league table when the API gave no standings
+                reference = home_season or away_season
+                if 'league_leader_points' not in quantitative_features:
+                    league_code = league_catalog.code(league_id) or reference['league']
+                    table = season_cube.league_table(league_code, reference['season'])
+                    if table:
+                        quantitative_features['league_teams_count'] = len(table)
+                        quantitative_features['league_leader_points'] = table[0].get('points')
+                        quantitative_features['standings_summary'] = [
+                            {"rank": row.get('rank'), "team": row['team'], "points": row.get('points')}
+                            for row in table[:6]
+                        ]
+        except Exception as e:
+            print(f"⚠️  Season cube lookup failed: {str(e)}")
+
+        # Title/top-4/relegation odds from the Monte Carlo season simulator
+        try:
+            league_code = league_catalog.code(league_id) if league_id else None
+            if not league_code and isinstance(home_team, str):
+                reference = season_cube.lookup(home_team, season_for_date(match_date) if match_date else None)
+                league_code = reference.get('league') if reference else None
+            if league_code:
+                projection = {
+                    side: season_simulator.team_projection(team, league_code, as_of=match_date)
+                    for side, team in (('home', home_team), ('away', away_team)) if isinstance(team, str)
+                }
+                projection = {side: row for side, row in projection.items() if row}
+                if projection:
+                    quantitative_features['season_projection'] = projection
+        except Exception as e:
+            print(f"⚠️  Season simulation failed: {str(e)}")
         
         # Set sensible defaults if data is empty
         if not quantitative_features:
@@ -263,5 +355,20 @@ class SoccerDataLoader:
             "qualitative_context": qualitative_context
         }
 
+
+def agent_data_packet(home_team: str, away_team: str, match_context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The match data the consensus engine receives for a loader context.
+
+    Shared by the analysis endpoint and the batch precompute, so the agents'
+    prompts (and response cache keys) are identical on both paths.
+    """
+    return {
+        "home_team": home_team,
+        "away_team": away_team,
+        "quantitative_features": match_context.get('quantitative_features', {}),
+        "qualitative_context": match_context.get('qualitative_context', {})
+    }
+
 # --- INSTANTIATE ---
 real_data_loader = SoccerDataLoader()
\ No newline at end of file
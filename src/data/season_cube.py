@@ -0,0 +1,265 @@
+"""
+Team x season aggregate cube built from the cached FBref league pages.
+
+Season totals (goals, xG, shots, points, rank, home/away splits) and per-90
+rates for every team-season in ``soccer_data_cache`` are stored as a single
+float32 matrix in ``<cache>/.artifacts/season_cube-*.npz`` and served from an
+in-memory dict index, so season context never needs an upstream API call.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.cache_store import CacheStore, cache_store
+from src.data.fbref_cache import (
+    ARTIFACT_DIRNAME,
+    PARSER_VERSION,
+    TeamResolver,
+    load_schedules,
+    load_team_seasons,
+)
+
+CUBE_VERSION = 1
+
+METRICS = [
+    "rank", "matches", "wins", "draws", "losses",
+    "goals_for", "goals_against", "goal_diff", "points",
+    "xg", "xga", "shots", "shots_on_target", "shots_against", "shots_on_target_against",
+    "home_points", "away_points", "home_goals_for", "home_goals_against",
+    "away_goals_for", "away_goals_against",
+    "points_per_match", "goals_for_per90", "goals_against_per90",
+    "xg_per90", "xga_per90", "shots_per90", "shots_on_target_per90",
+]
+INT_METRICS = {"rank", "matches", "wins", "draws", "losses", "goals_for", "goals_against",
+               "goal_diff", "points", "home_points", "away_points", "home_goals_for",
+               "home_goals_against", "away_goals_for", "away_goals_against",
+               "shots", "shots_on_target", "shots_against", "shots_on_target_against"}
+
+
+def _from_team_pages(team_seasons: pd.DataFrame) -> pd.DataFrame:
+    """Map the flattened FBref league-table columns onto cube metrics."""
+    col = lambda name: team_seasons[name] if name in team_seasons else np.nan
+    nineties = col("90s")
+    nineties = nineties.where(nineties > 0, team_seasons["MP"]) if "90s" in team_seasons else team_seasons["MP"]
+    return pd.DataFrame({
+        "league": team_seasons["league"],
+        "season": team_seasons["season"],
+        "team": team_seasons["team"],
+        "rank": col("Rk"),
+        "matches": col("MP"),
+        "wins": col("W"),
+        "draws": col("D"),
+        "losses": col("L"),
+        "goals_for": col("GF"),
+        "goals_against": col("GA"),
+        "goal_diff": col("GD"),
+        "points": col("Pts"),
+        "xg": col("xG"),
+        "xga": col("xGA"),
+        "shots": col("Sh"),
+        "shots_on_target": col("SoT"),
+        "shots_against": col("Opp Sh"),
+        "shots_on_target_against": col("Opp SoT"),
+        "home_points": col("Home Pts"),
+        "away_points": col("Away Pts"),
+        "home_goals_for": col("Home GF"),
+        "home_goals_against": col("Home GA"),
+        "away_goals_for": col("Away GF"),
+        "away_goals_against": col("Away GA"),
+        "nineties": nineties,
+    })
+
+
+def _from_schedules(schedules: pd.DataFrame) -> pd.DataFrame:
+    """Season totals from played fixtures, for league-seasons without a teams page."""
+    played = schedules[schedules["played"]]
+    if played.empty:
+        return pd.DataFrame()
+
+    def side(prefix: str, other: str, venue: str) -> pd.DataFrame:
+        gf, ga = played[f"{prefix}_goals"], played[f"{other}_goals"]
+        return pd.DataFrame({
+            "league": played["league"].astype(str),
+            "season": played["season"].astype(str),
+            "team": played[f"{prefix}_team"].astype(str),
+            "matches": 1, "wins": (gf > ga).astype(int), "draws": (gf == ga).astype(int),
+            "losses": (gf < ga).astype(int), "goals_for": gf, "goals_against": ga,
+            "xg": played[f"{prefix}_xg"], "xga": played[f"{other}_xg"],
+            f"{venue}_goals_for": gf, f"{venue}_goals_against": ga,
+            f"{venue}_points": np.select([gf > ga, gf == ga], [3, 1], 0),
+        })
+
+    rows = pd.concat([side("home", "away", "home"), side("away", "home", "away")], ignore_index=True)
+    totals = rows.groupby(["league", "season", "team"], observed=True).sum(min_count=1).reset_index()
+    totals["points"] = totals["wins"] * 3 + totals["draws"]
+    totals["goal_diff"] = totals["goals_for"] - totals["goals_against"]
+    totals["nineties"] = totals["matches"]
+    totals = totals.sort_values(["league", "season", "points", "goal_diff", "goals_for"],
+                                ascending=[True, True, False, False, False])
+    totals["rank"] = totals.groupby(["league", "season"], observed=True).cumcount() + 1
+    return totals
+
+
+def build_cube(team_seasons: pd.DataFrame, schedules: pd.DataFrame) -> pd.DataFrame:
+    """
+    Assemble the cube frame: one row per (league, season, team) with ``METRICS``.
+
+    Team pages are authoritative; schedules only fill league-seasons whose
+    teams page is missing from the cache.
+    """
+    frames = []
+    if len(team_seasons):
+        frames.append(_from_team_pages(team_seasons))
+    if len(schedules):
+        covered = set(zip(team_seasons.get("league", []), team_seasons.get("season", [])))
+        keys = list(zip(schedules["league"].astype(str), schedules["season"].astype(str)))
+        missing = schedules[[k not in covered for k in keys]]
+        if len(missing):
+            frames.append(_from_schedules(missing))
+    if not frames:
+        return pd.DataFrame(columns=["league", "season", "team"] + METRICS)
+
+    cube = pd.concat(frames, ignore_index=True)
+    nineties = cube["nineties"].where(cube["nineties"] > 0)
+    cube["points_per_match"] = cube["points"] / cube["matches"].where(cube["matches"] > 0)
+    for src, dst in (("goals_for", "goals_for_per90"), ("goals_against", "goals_against_per90"),
+                     ("xg", "xg_per90"), ("xga", "xga_per90"), ("shots", "shots_per90"),
+                     ("shots_on_target", "shots_on_target_per90")):
+        cube[dst] = cube[src] / nineties
+    for metric in METRICS:
+        if metric not in cube:
+            cube[metric] = np.nan
+    return cube[["league", "season", "team"] + METRICS].reset_index(drop=True)
+
+
+class SeasonCube:
+    """
+    O(1) team-season aggregate lookups backed by a compact float32 matrix.
+    """
+
+    def __init__(self, store: CacheStore = cache_store):
+        self.store = store
+        self.values: Optional[np.ndarray] = None
+        self.keys: List[Tuple[str, str, str]] = []
+        self.resolver: Optional[TeamResolver] = None
+        self._index: Dict[Tuple[str, str], int] = {}
+        self._seasons: Dict[str, List[str]] = {}
+        self._tables: Dict[Tuple[str, str], List[int]] = {}
+        self._metric_pos = {m: i for i, m in enumerate(METRICS)}
+        self._lock = threading.Lock()
+
+    # ============= BUILD / PERSIST =============
+
+    def _sources(self) -> List[str]:
+        return self.store.names("teams_*.html") + self.store.names("schedule_*.html")
+
+    def _artifact_path(self, fingerprint: str):
+        return self.store.root / ARTIFACT_DIRNAME / f"season_cube-{fingerprint[:16]}.npz"
+
+    def load(self) -> "SeasonCube":
+        """Load the cube artifact, rebuilding it if the cached pages changed."""
+        with self._lock:
+            if self.values is not None:
+                return self
+            fingerprint = self.store.fingerprint(
+                self._sources() + [f"parser-v{PARSER_VERSION}", f"cube-v{CUBE_VERSION}"]
+            )
+            path = self._artifact_path(fingerprint)
+            if path.exists():
+                with np.load(path, allow_pickle=False) as data:
+                    values, keys = data["values"], data["keys"]
+            else:
+                cube = build_cube(load_team_seasons(self.store), load_schedules(self.store))
+                values = cube[METRICS].to_numpy(dtype=np.float32)
+                keys = cube[["league", "season", "team"]].astype(str).to_numpy(dtype=str)
+                try:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    for old in path.parent.glob("season_cube-*.npz"):
+                        old.unlink()
+                    np.savez_compressed(path, values=values, keys=keys, metrics=np.array(METRICS))
+                except OSError as e:
+                    print(f"⚠️  Could not write season cube artifact: {e}")
+            self._set(values, [tuple(str(x) for x in k) for k in keys])
+            return self
+
+    def _set(self, values: np.ndarray, keys: List[Tuple[str, str, str]]):
+        self._index, self._seasons, self._tables = {}, {}, {}
+        for row, (league, season, team) in enumerate(keys):
+            self._index[(team, season)] = row
+            self._seasons.setdefault(team, []).append(season)
+            self._tables.setdefault((league, season), []).append(row)
+        for seasons in self._seasons.values():
+            seasons.sort()
+        rank = values[:, self._metric_pos["rank"]]
+        for rows in self._tables.values():
+            rows.sort(key=lambda r: (np.nan_to_num(rank[r], nan=1e9), r))
+        self.keys = keys
+        self.values = values
+        self.resolver = TeamResolver(self._seasons)
+
+    # ============= LOOKUPS =============
+
+    def _row_dict(self, row: int) -> Dict[str, Any]:
+        league, season, team = self.keys[row]
+        record: Dict[str, Any] = {"team": team, "league": league, "season": season}
+        for metric, value in zip(METRICS, self.values[row]):
+            if np.isnan(value):
+                continue
+            record[metric] = int(value) if metric in INT_METRICS else round(float(value), 2)
+        return record
+
+    def lookup(self, team: str, season: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Season aggregates for a team.
+
+        Args:
+            team: Team name (FBref or common alias)
+            season: FBref season key (e.g. '2324'); the latest cached season
+                at or before it is used. Defaults to the latest cached season.
+
+        Returns:
+            Dictionary of ``METRICS`` for that team-season, or None
+        """
+        self.load()
+        name = self.resolver.resolve(team)
+        if name is None:
+            return None
+        seasons = self._seasons[name]
+        if season is None:
+            chosen = seasons[-1]
+        else:
+            eligible = [s for s in seasons if s <= str(season)]
+            if not eligible:
+                return None
+            chosen = eligible[-1]
+        return self._row_dict(self._index[(name, chosen)])
+
+    def get(self, team: str, season: str, metric: str) -> Optional[float]:
+        """Single metric for an exact (FBref team, season) key."""
+        self.load()
+        row = self._index.get((team, season))
+        if row is None:
+            return None
+        value = self.values[row, self._metric_pos[metric]]
+        return None if np.isnan(value) else float(value)
+
+    def to_frame(self) -> pd.DataFrame:
+        """The whole cube as a frame: league, season, team and ``METRICS``."""
+        self.load()
+        frame = pd.DataFrame(self.values, columns=METRICS)
+        frame.insert(0, "team", [k[2] for k in self.keys])
+        frame.insert(0, "season", [k[1] for k in self.keys])
+        frame.insert(0, "league", [k[0] for k in self.keys])
+        return frame
+
+    def league_table(self, league: str, season: str) -> List[Dict[str, Any]]:
+        """All teams of a league-season ordered by final (or current) rank."""
+        self.load()
+        return [self._row_dict(r) for r in self._tables.get((league, season), [])]
+
+
+# --- INSTANTIATE ---
+season_cube = SeasonCube()
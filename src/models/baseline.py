@@ -8,14 +8,27 @@ Note: This is a research implementation. Production models use proprietary
 optimizations and larger training datasets.
 """
 
+import json
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from sklearn.metrics import log_loss
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 import xgboost as xgb
 import lightgbm as lgb
 
+from src.models.dixon_coles import DixonColesModel
+from src.models.elo import EloEngine, EloHistory, RatingsView
+
+# Bump when the on-disk layout written by BaselinePredictor.save changes
+MODEL_FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+PREPROCESSING_FILE = 'preprocessing.npz'
+BOOSTER_FILES = {'xgboost': 'xgboost.ubj', 'lightgbm': 'lightgbm.txt'}
+
 
 class BaselinePredictor:
     """
@@ -28,7 +41,10 @@ class BaselinePredictor:
     def __init__(
         self,
         model_type: str = 'ensemble',
-        random_state: int = 42
+        random_state: int = 42,
+        xgb_params: Optional[Dict[str, Any]] = None,
+        lgb_params: Optional[Dict[str, Any]] = None,
+        n_jobs: Optional[int] = None
     ):
         """
         Initialize the baseline predictor.
@@ -36,17 +52,25 @@ class BaselinePredictor:
         Args:
             model_type: Type of model ('xgboost', 'lightgbm', or 'ensemble')
             random_state: Random seed for reproducibility
+            xgb_params: Overrides for the XGBoost research parameters
+            lgb_params: Overrides for the LightGBM research parameters
+            n_jobs: Threads per model (library default if None)
         """
         self.model_type = model_type
         self.random_state = random_state
+        self.xgb_params = dict(xgb_params or {})
+        self.lgb_params = dict(lgb_params or {})
+        self.n_jobs = n_jobs
         self.scaler = StandardScaler()
         self.models = {}
         self.feature_names = None
         self.is_trained = False
+        self.training_info: Dict[str, Any] = {}
+        self._fast_path = None
         
     def _init_xgboost(self) -> xgb.XGBClassifier:
         """Initialize XGBoost model with research parameters."""
-        return xgb.XGBClassifier(
+        params = dict(
             max_depth=7,
             learning_rate=0.05,
             n_estimators=500,
@@ -56,12 +80,16 @@ class BaselinePredictor:
             num_class=3,
             random_state=self.random_state,
             eval_metric='mlogloss',
-            tree_method='hist'
+            early_stopping_rounds=50,
+            tree_method='hist',
+            n_jobs=self.n_jobs
         )
+        params.update(self.xgb_params)
+        return xgb.XGBClassifier(**params)
     
     def _init_lightgbm(self) -> lgb.LGBMClassifier:
         """Initialize LightGBM model with research parameters."""
-        return lgb.LGBMClassifier(
+        params = dict(
             num_leaves=63,
             learning_rate=0.05,
             n_estimators=500,
@@ -71,14 +99,18 @@ class BaselinePredictor:
             objective='multiclass',
             num_class=3,
             random_state=self.random_state,
+            n_jobs=self.n_jobs,
             verbose=-1
         )
+        params.update(self.lgb_params)
+        return lgb.LGBMClassifier(**params)
     
     def train(
         self,
         X: pd.DataFrame,
         y: np.ndarray,
-        validation_split: float = 0.2
+        validation_split: float = 0.2,
+        shuffle: bool = True
     ) -> Dict[str, float]:
         """
         Train the baseline models.
@@ -86,7 +118,9 @@ class BaselinePredictor:
         Args:
             X: Feature dataframe
             y: Target labels (0: Home Win, 1: Draw, 2: Away Win)
-            validation_split: Proportion of data for validation
+            validation_split: Proportion of data for validation (early stopping)
+            shuffle: Random split if True; otherwise the last rows are held
+                out, which is the correct split for chronologically ordered data
             
         Returns:
             Dictionary of training metrics
@@ -96,7 +130,8 @@ class BaselinePredictor:
         
         # Split data
         X_train, X_val, y_train, y_val = train_test_split(
-            X, y, test_size=validation_split, random_state=self.random_state
+            X, y, test_size=validation_split, shuffle=shuffle,
+            random_state=self.random_state if shuffle else None
         )
         
         # Scale features
@@ -116,6 +151,7 @@ class BaselinePredictor:
             )
             xgb_acc = self.models['xgboost'].score(X_val_scaled, y_val)
             metrics['xgboost_accuracy'] = xgb_acc
+            metrics['xgboost_best_iteration'] = self.models['xgboost'].best_iteration
             print(f"XGBoost validation accuracy: {xgb_acc:.4f}")
         
         # Train LightGBM
@@ -129,11 +165,70 @@ class BaselinePredictor:
             )
             lgb_acc = self.models['lightgbm'].score(X_val_scaled, y_val)
             metrics['lightgbm_accuracy'] = lgb_acc
+            metrics['lightgbm_best_iteration'] = self.models['lightgbm'].best_iteration_
             print(f"LightGBM validation accuracy: {lgb_acc:.4f}")
         
         self.is_trained = True
+        metrics['validation_log_loss'] = log_loss(
+            y_val, self._ensemble_proba(X_val_scaled), labels=[0, 1, 2]
+        )
+        self.training_info = {
+            'trained_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'n_samples': int(len(X)),
+            'validation_split': validation_split,
+            'shuffle': shuffle,
+            'metrics': {k: float(v) for k, v in metrics.items()},
+        }
+        self._fast_path = None
         return metrics
-    
+
+    def refit(self, X: pd.DataFrame, y: np.ndarray) -> Dict[str, int]:
+        """
+        Refit every model on all rows at the rounds chosen by early stopping.
+
+        ``train`` holds the validation rows out to pick the number of
+        boosting rounds; with a chronological split those are the newest
+        matches. Refitting on everything keeps the tuned round counts and
+        lets the final model learn from them too.
+
+        Args:
+            X: Feature dataframe (same columns as in ``train``)
+            y: Target labels (0: Home Win, 1: Draw, 2: Away Win)
+
+        Returns:
+            Boosting rounds used per model
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before refitting")
+
+        metrics = self.training_info.get('metrics', {})
+        X_scaled = self.scaler.fit_transform(X[self.feature_names])
+        rounds = {}
+
+        if 'xgboost' in self.models:
+            best = metrics.get('xgboost_best_iteration')
+            model = self._init_xgboost()
+            rounds['xgboost'] = int(best) + 1 if best is not None else model.get_params()['n_estimators']
+            model.set_params(n_estimators=rounds['xgboost'], early_stopping_rounds=None)
+            model.fit(X_scaled, y, verbose=False)
+            self.models['xgboost'] = model
+
+        if 'lightgbm' in self.models:
+            best = metrics.get('lightgbm_best_iteration')
+            model = self._init_lightgbm()
+            rounds['lightgbm'] = int(best) if best else model.get_params()['n_estimators']
+            model.set_params(n_estimators=rounds['lightgbm'])
+            model.fit(X_scaled, y)
+            self.models['lightgbm'] = model
+
+        self.training_info.update(
+            trained_at=datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            n_samples=int(len(X)),
+            refit_rounds=rounds,
+        )
+        self._fast_path = None
+        return rounds
+
     def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
         """
         Predict outcome probabilities.
@@ -151,14 +246,28 @@ class BaselinePredictor:
         # Scale features
         X_scaled = self.scaler.transform(X)
         
+        return self._ensemble_proba(X_scaled)
+    
+    def _ensemble_proba(self, X_scaled: np.ndarray) -> np.ndarray:
+        """Average the models' probabilities for already scaled features."""
         # Get predictions from all models
         predictions = []
         
         if 'xgboost' in self.models:
-            predictions.append(self.models['xgboost'].predict_proba(X_scaled))
+            model = self.models['xgboost']
+            # Models extended by ``update`` are native boosters
+            if isinstance(model, xgb.Booster):
+                predictions.append(model.inplace_predict(X_scaled))
+            else:
+                predictions.append(model.predict_proba(X_scaled))
         
         if 'lightgbm' in self.models:
-            predictions.append(self.models['lightgbm'].predict_proba(X_scaled))
+            model = self.models['lightgbm']
+            # Models restored by ``load`` or extended by ``update`` are native boosters
+            if isinstance(model, lgb.Booster):
+                predictions.append(model.predict(X_scaled))
+            else:
+                predictions.append(model.predict_proba(X_scaled))
         
         # Ensemble: average predictions
         if len(predictions) > 1:
@@ -166,6 +275,88 @@ class BaselinePredictor:
         else:
             return predictions[0]
     
+    def prepare_fast_inference(self):
+        """
+        Set up the single-row inference path used when serving requests.
+
+        Pulls the native boosters out of the sklearn wrappers, keeps the
+        scaler as plain arrays and preallocates the input buffer, so
+        ``predict_proba_fast`` avoids DataFrame construction and sklearn
+        input validation entirely.
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before prediction")
+
+        n_features = len(self.feature_names)
+        boosters = []
+        if 'xgboost' in self.models:
+            booster = self._xgb_booster()
+            booster.set_param({'nthread': 1})
+            boosters.append(('xgboost', booster))
+        if 'lightgbm' in self.models:
+            model = self.models['lightgbm']
+            boosters.append(('lightgbm', model if isinstance(model, lgb.Booster) else model.booster_))
+
+        self._fast_path = {
+            # float32 like the feature matrix the boosters see. This can differ from
+            # StandardScaler.transform by an ulp (sklearn versions differ in whether
+            # they scale in float32 or float64), which only changes a split when a
+            # value sits exactly on its threshold
+            'mean': np.asarray(self.scaler.mean_, dtype=np.float32),
+            'scale': np.asarray(self.scaler.scale_, dtype=np.float32),
+            'buffer': np.empty((1, n_features), dtype=np.float32),
+            'boosters': boosters,
+        }
+
+    def predict_proba_fast(self, features: np.ndarray) -> np.ndarray:
+        """
+        Predict outcome probabilities for a single row.
+
+        Args:
+            features: 1-D array of raw features ordered like ``feature_names``
+                (NaN for missing values)
+
+        Returns:
+            Array of shape (3,) with probabilities for [Home Win, Draw, Away Win]
+        """
+        if self._fast_path is None:
+            self.prepare_fast_inference()
+        fast = self._fast_path
+        buffer = fast['buffer']
+
+        # Scale in place into the preallocated buffer
+        np.subtract(features, fast['mean'], out=buffer[0])
+        np.divide(buffer[0], fast['scale'], out=buffer[0])
+        return self._native_proba(buffer)[0]
+
+    def predict_proba_array(self, X: np.ndarray) -> np.ndarray:
+        """
+        Batched variant of ``predict_proba_fast`` for a raw float array.
+
+        Args:
+            X: Array of shape (n_samples, n_features) ordered like ``feature_names``
+
+        Returns:
+            Array of shape (n_samples, 3) with probabilities for
+            [Home Win, Draw, Away Win]
+        """
+        if self._fast_path is None:
+            self.prepare_fast_inference()
+        fast = self._fast_path
+        X_scaled = (np.asarray(X, dtype=np.float32) - fast['mean']) / fast['scale']
+        return self._native_proba(X_scaled)
+
+    def _native_proba(self, X_scaled: np.ndarray) -> np.ndarray:
+        """Average of the native boosters' probabilities for an already scaled array."""
+        total = None
+        for name, booster in self._fast_path['boosters']:
+            if name == 'xgboost':
+                proba = booster.inplace_predict(X_scaled, validate_features=False)
+            else:
+                proba = booster.predict(X_scaled, num_threads=1, validate_features=False)
+            total = proba if total is None else total + proba
+        return total / len(self._fast_path['boosters'])
+
     def predict(self, X: pd.DataFrame) -> np.ndarray:
         """
         Predict outcome classes.
@@ -192,10 +383,20 @@ class BaselinePredictor:
         importance_dict = {}
         
         if 'xgboost' in self.models:
-            importance_dict['xgboost'] = self.models['xgboost'].feature_importances_
+            model = self.models['xgboost']
+            if isinstance(model, xgb.Booster):
+                gain = model.get_score(importance_type='gain')
+                scores = np.array([gain.get(f'f{i}', 0.0) for i in range(len(self.feature_names))])
+                importance_dict['xgboost'] = scores / scores.sum() if scores.sum() else scores
+            else:
+                importance_dict['xgboost'] = model.feature_importances_
         
         if 'lightgbm' in self.models:
-            importance_dict['lightgbm'] = self.models['lightgbm'].feature_importances_
+            model = self.models['lightgbm']
+            if isinstance(model, lgb.Booster):
+                importance_dict['lightgbm'] = model.feature_importance()
+            else:
+                importance_dict['lightgbm'] = model.feature_importances_
         
         # Average importance across models
         avg_importance = np.mean(list(importance_dict.values()), axis=0)
@@ -206,6 +407,209 @@ class BaselinePredictor:
         }).sort_values('importance', ascending=False)
         
         return importance_df
+    
+    def _xgb_booster(self) -> xgb.Booster:
+        """Native XGBoost booster, trimmed to the early-stopping optimum."""
+        model = self.models['xgboost']
+        if isinstance(model, xgb.Booster):
+            return model
+        booster = model.get_booster()
+        best_iteration = getattr(model, 'best_iteration', None)
+        if best_iteration is not None and best_iteration + 1 < booster.num_boosted_rounds():
+            # Slicing also drops the best_iteration attribute
+            booster = booster[: best_iteration + 1]
+        return booster
+    
+    def _lgb_booster(self) -> lgb.Booster:
+        """Native LightGBM booster, trimmed to the early-stopping optimum."""
+        model = self.models['lightgbm']
+        booster = model if isinstance(model, lgb.Booster) else model.booster_
+        if booster.best_iteration and booster.best_iteration < booster.current_iteration():
+            booster = lgb.Booster(model_str=booster.model_to_string(num_iteration=booster.best_iteration))
+        return booster
+    
+    def update(
+        self,
+        X: pd.DataFrame,
+        y: np.ndarray,
+        n_rounds: int = 20,
+        shrinkage: float = 0.25
+    ) -> Dict[str, float]:
+        """
+        Warm-start update: append boosting rounds fitted on new rows only.
+        
+        The scaler is kept as is, so the existing trees see the same inputs.
+        Boosters are continued through the native training APIs, which
+        accept batches that miss an outcome class (e.g. a matchday
+        without draws); the updated models are stored as native boosters.
+        
+        Args:
+            X: New feature rows (same columns as training)
+            y: New target labels (0: Home Win, 1: Draw, 2: Away Win)
+            n_rounds: Boosting rounds to append per model
+            shrinkage: Factor applied to the learning rate for the new rounds,
+                so a small batch nudges the model instead of refitting it
+            
+        Returns:
+            Dictionary with the log loss on the new rows before and after
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before updating")
+        
+        X_scaled = self.scaler.transform(X[self.feature_names])
+        y = np.asarray(y)
+        metrics = {'pre_update_log_loss': log_loss(y, self._ensemble_proba(X_scaled), labels=[0, 1, 2])}
+        
+        if 'xgboost' in self.models:
+            params = self._init_xgboost().get_xgb_params()
+            for key in ('n_estimators', 'early_stopping_rounds', 'eval_metric'):
+                params.pop(key, None)
+            params['learning_rate'] *= shrinkage
+            booster = xgb.train(
+                params, xgb.DMatrix(X_scaled, label=y),
+                num_boost_round=n_rounds, xgb_model=self._xgb_booster()
+            )
+            # An untrimmed booster carries the early-stopping optimum over; left in place,
+            # a reloaded classifier would stop predicting before the appended rounds
+            booster.set_attr(best_iteration=None, best_score=None)
+            self.models['xgboost'] = booster
+        
+        if 'lightgbm' in self.models:
+            params = {k: v for k, v in self._init_lightgbm().get_params().items()
+                      if v is not None and k not in ('n_estimators', 'class_weight', 'importance_type')}
+            # A matchday is a few dozen rows; let leaves form on it
+            params['min_child_samples'] = min(params.get('min_child_samples', 20), max(1, len(y) // 4))
+            params['learning_rate'] *= shrinkage
+            self.models['lightgbm'] = lgb.train(
+                params, lgb.Dataset(X_scaled, label=y),
+                num_boost_round=n_rounds, init_model=self._lgb_booster()
+            )
+        
+        metrics['post_update_log_loss'] = log_loss(y, self._ensemble_proba(X_scaled), labels=[0, 1, 2])
+        self.training_info.setdefault('updates', []).append({
+            'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'n_samples': int(len(y)),
+            'n_rounds': n_rounds,
+            **{k: float(v) for k, v in metrics.items()},
+        })
+        self._fast_path = None
+        return metrics
+    
+    def save(self, path: Union[str, Path], metadata: Optional[Dict[str, Any]] = None) -> Path:
+        """
+        Save the trained ensemble to a directory.
+        
+        Each booster is written in its native format, the scaler parameters
+        and feature names go into one small array file, and a JSON manifest
+        records the format version and training metadata.
+        
+        Args:
+            path: Target directory (created if missing)
+            metadata: Extra entries for the manifest (e.g. feature version)
+            
+        Returns:
+            The model directory
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before saving")
+        
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        
+        for name, model in self.models.items():
+            target = path / BOOSTER_FILES[name]
+            if name == 'xgboost':
+                model.save_model(target)
+            else:
+                booster = model if isinstance(model, lgb.Booster) else model.booster_
+                booster.save_model(target)
+        
+        np.savez(
+            path / PREPROCESSING_FILE,
+            mean=self.scaler.mean_,
+            scale=self.scaler.scale_,
+            var=self.scaler.var_,
+            n_samples_seen=np.asarray(self.scaler.n_samples_seen_),
+            feature_names=np.array(self.feature_names, dtype=str)
+        )
+        
+        manifest = {
+            'format_version': MODEL_FORMAT_VERSION,
+            'model_type': self.model_type,
+            'random_state': self.random_state,
+            'xgb_params': self.xgb_params,
+            'lgb_params': self.lgb_params,
+            'models': {name: BOOSTER_FILES[name] for name in self.models},
+            'n_features': len(self.feature_names),
+            'xgboost_version': xgb.__version__,
+            'lightgbm_version': lgb.__version__,
+            **self.training_info,
+            **(metadata or {}),
+        }
+        with open(path / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return path
+    
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'BaselinePredictor':
+        """
+        Load an ensemble written by ``save``.
+        
+        Args:
+            path: Model directory
+            
+        Returns:
+            Trained predictor, ready for ``predict_proba``/``predict_proba_fast``
+        """
+        path = Path(path)
+        with open(path / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != MODEL_FORMAT_VERSION:
+            raise ValueError(f"Unsupported model format {manifest.get('format_version')} in {path}")
+        
+        predictor = cls(
+            model_type=manifest['model_type'],
+            random_state=manifest['random_state'],
+            xgb_params=manifest.get('xgb_params'),
+            lgb_params=manifest.get('lgb_params')
+        )
+        
+        with np.load(path / PREPROCESSING_FILE, allow_pickle=False) as data:
+            predictor.feature_names = [str(name) for name in data['feature_names']]
+            scaler = predictor.scaler
+            scaler.mean_ = data['mean']
+            scaler.scale_ = data['scale']
+            scaler.var_ = data['var']
+            scaler.n_samples_seen_ = data['n_samples_seen']
+            scaler.n_features_in_ = len(predictor.feature_names)
+            scaler.feature_names_in_ = np.array(predictor.feature_names, dtype=object)
+        
+        for name, filename in manifest['models'].items():
+            if name == 'xgboost':
+                model = xgb.XGBClassifier()
+                model.load_model(path / filename)
+                if manifest.get('updates'):
+                    # Versions updated before best_iteration was cleared: predict with every round
+                    model = model.get_booster()
+                    model.set_attr(best_iteration=None, best_score=None)
+            else:
+                model = lgb.Booster(model_file=str(path / filename))
+            predictor.models[name] = model
+        
+        predictor.training_info = {k: manifest[k] for k in ('trained_at', 'n_samples', 'validation_split',
+                                                            'shuffle', 'metrics', 'refit_rounds', 'updates')
+                                   if k in manifest}
+        predictor.is_trained = True
+        return predictor
+    
+    @staticmethod
+    def read_manifest(path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+        """Manifest of a saved model directory, or None if there is none."""
+        manifest_path = Path(path) / MANIFEST_FILE
+        if not manifest_path.exists():
+            return None
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
 
 
 class SimpleELOPredictor:
@@ -213,29 +617,44 @@ class SimpleELOPredictor:
     Simple ELO-based predictor for comparison baseline.
     
     This implements a basic ELO rating system as described in the paper,
-    serving as a traditional statistical benchmark.
+    serving as a traditional statistical benchmark. Ratings are kept by an
+    array-backed ``EloEngine``, so whole match histories can be replayed
+    with ``fit``.
+    
+    When ``fit`` sees goal columns it also fits a Dixon-Coles model, whose
+    per-fixture draw probability replaces the engine's flat one; the
+    ratings still split the remaining mass between home and away.
     """
     
-    def __init__(self, k_factor: float = 32, home_advantage: float = 100):
+    def __init__(self, k_factor: float = 32, home_advantage: float = 100,
+                 dixon_coles_draws: bool = True):
         """
         Initialize ELO predictor.
         
         Args:
             k_factor: ELO K-factor for rating updates
             home_advantage: Home advantage in ELO points
+            dixon_coles_draws: Fit a Dixon-Coles draw model in ``fit`` when
+                the history has home_goals/away_goals
         """
         self.k_factor = k_factor
         self.home_advantage = home_advantage
-        self.ratings = {}
-        
-    def _expected_score(self, rating_a: float, rating_b: float) -> float:
-        """Calculate expected score for team A against team B."""
-        return 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
+        self.dixon_coles_draws = dixon_coles_draws
+        self.engine = EloEngine(k_factor=k_factor, home_advantage=home_advantage)
+        self.history: Optional[EloHistory] = None
+        self.draw_model: Optional[DixonColesModel] = None
     
+    @property
+    def ratings(self) -> RatingsView:
+        """Current rating per team; assigning ``ratings[team]`` updates the engine."""
+        return RatingsView(self.engine)
+        
     def predict_proba(
         self,
         home_rating: float,
-        away_rating: float
+        away_rating: float,
+        home_team: Optional[str] = None,
+        away_team: Optional[str] = None
     ) -> Tuple[float, float, float]:
         """
         Predict match outcome probabilities based on ELO ratings.
@@ -243,29 +662,25 @@ class SimpleELOPredictor:
         Args:
             home_rating: Home team ELO rating
             away_rating: Away team ELO rating
+            home_team: Home team identifier, for the Dixon-Coles draw
+            away_team: Away team identifier, for the Dixon-Coles draw
             
         Returns:
             Tuple of (home_win_prob, draw_prob, away_win_prob)
         """
-        # Adjust for home advantage
-        adjusted_home = home_rating + self.home_advantage
-        
-        # Calculate expected score
-        home_expected = self._expected_score(adjusted_home, away_rating)
-        
-        # Simple probability model
-        # (Note: This is simplified; production models use more sophisticated approaches)
-        draw_prob = 0.25  # Base draw probability
-        home_win_prob = home_expected * (1 - draw_prob)
-        away_win_prob = (1 - home_expected) * (1 - draw_prob)
-        
-        # Normalize to sum to 1
-        total = home_win_prob + draw_prob + away_win_prob
-        return (
-            home_win_prob / total,
-            draw_prob / total,
-            away_win_prob / total
-        )
+        # Dixon-Coles draw probability when fitted and the teams are named,
+        # else the flat base rate; the rest is split by expected score
+        draw = None
+        if home_team is not None and away_team is not None:
+            draw = self._draw_proba([home_team], [away_team])
+        home_win_prob, draw_prob, away_win_prob = self.engine.predict_proba(
+            home_rating, away_rating, None if draw is None else draw[0])
+        return float(home_win_prob), float(draw_prob), float(away_win_prob)
+    
+    def _draw_proba(self, home_teams, away_teams) -> Optional[np.ndarray]:
+        if self.draw_model is None or not self.draw_model.is_fitted:
+            return None
+        return self.draw_model.draw_proba(home_teams, away_teams)
     
     def update_ratings(
         self,
@@ -281,32 +696,58 @@ class SimpleELOPredictor:
             away_team: Away team identifier
             result: Match result (0: Home Win, 1: Draw, 2: Away Win)
         """
-        # Initialize ratings if not present
-        if home_team not in self.ratings:
-            self.ratings[home_team] = 1500
-        if away_team not in self.ratings:
-            self.ratings[away_team] = 1500
+        self.engine.update(home_team, away_team, result)
+    
+    def fit(self, matches: pd.DataFrame) -> 'SimpleELOPredictor':
+        """
+        Replay a match history in one vectorized pass.
         
-        # Get current ratings
-        home_rating = self.ratings[home_team]
-        away_rating = self.ratings[away_team]
+        With a date column the replay is also recorded in ``history``, so
+        ``rating_as_of`` can answer for any earlier date. With home_goals
+        and away_goals the Dixon-Coles draw model is fitted as well.
         
-        # Calculate expected scores
-        home_expected = self._expected_score(
-            home_rating + self.home_advantage,
-            away_rating
-        )
-        away_expected = 1 - home_expected
-        
-        # Determine actual scores
-        if result == 0:  # Home win
-            home_actual, away_actual = 1, 0
-        elif result == 1:  # Draw
-            home_actual, away_actual = 0.5, 0.5
-        else:  # Away win
-            home_actual, away_actual = 0, 1
-        
-        # Update ratings
-        self.ratings[home_team] += self.k_factor * (home_actual - home_expected)
-        self.ratings[away_team] += self.k_factor * (away_actual - away_expected)
-
+        Args:
+            matches: Chronologically sorted frame with home_team, away_team
+                and result (0: Home Win, 1: Draw, 2: Away Win), optionally
+                date and home_goals/away_goals; may mix leagues
+            
+        Returns:
+            self
+        """
+        if 'date' in matches:
+            self.history = self.engine.replay_history(matches['date'], matches['home_team'],
+                                                      matches['away_team'], matches['result'])
+        else:
+            self.engine.replay(matches['home_team'], matches['away_team'], matches['result'])
+        if self.dixon_coles_draws and {'home_goals', 'away_goals'} <= set(matches.columns):
+            self.draw_model = DixonColesModel().fit(matches)
+        return self
+    
+    def rating_as_of(self, team: str, as_of) -> float:
+        """
+        A team's rating going into a date, from the history recorded by ``fit``.
+        
+        Args:
+            team: Team identifier
+            as_of: Date; matches on that day are not counted
+            
+        Returns:
+            Rating (initial rating for teams unseen by then)
+        """
+        if self.history is None:
+            raise ValueError("fit() with a date column is required for as-of ratings")
+        rating = self.history.rating(team, as_of)
+        return self.engine.initial_rating if rating is None else rating
+    
+    def predict_matches(self, matches: pd.DataFrame) -> np.ndarray:
+        """
+        Outcome probabilities from the current ratings.
+        
+        Args:
+            matches: Frame with home_team and away_team
+            
+        Returns:
+            Array of shape (n, 3) with [home_win, draw, away_win]
+        """
+        draw = self._draw_proba(matches['home_team'], matches['away_team'])
+        return self.engine.predict_teams(matches['home_team'], matches['away_team'], draw)
@@ -0,0 +1,162 @@
+"""
+Micro-batched model inference.
+
+Concurrent callers submit single feature rows; one worker thread collects
+them for up to ``max_wait_ms`` or ``max_batch_size`` rows, scores the whole
+batch with one vectorized call and hands each caller its own row back
+through a future.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+_STOP = object()  # queue sentinel from ``close``
+
+
+def _start(future: Future) -> bool:
+    """Claim a queued future; False if its caller already cancelled it."""
+    try:
+        return future.set_running_or_notify_cancel()
+    except RuntimeError:  # already resolved
+        return False
+
+
+def _resolve(future: Future, result: Any = None, exception: Optional[BaseException] = None):
+    """Hand one caller its row (or the error) without letting its state break the batch."""
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+class MicroBatcher:
+    """
+    Coalesces single-row predictions from many threads into batched calls.
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray], n_features: int,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        """
+        Args:
+            predict_fn: Batch predictor taking a (n, n_features) float32 array
+            n_features: Width of each submitted row
+            max_batch_size: Most rows scored in one call
+            max_wait_ms: Longest time the first row of a batch waits for company
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._buffer = np.empty((max_batch_size, n_features), dtype=np.float32)
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._stats = {"batches": 0, "rows": 0, "max_batch": 0}
+
+    def _ensure_worker(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                    self._thread.start()
+
+    def submit(self, row: np.ndarray) -> Future:
+        """Queue one feature row; the future resolves to its prediction row."""
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((row, future))
+        return future
+
+    def predict(self, row: np.ndarray, timeout: float = None) -> np.ndarray:
+        """Blocking single-row prediction through the batch queue."""
+        return self.submit(row).result(timeout)
+
+    async def predict_async(self, row: np.ndarray) -> np.ndarray:
+        """Awaitable single-row prediction for async request handlers."""
+        return await asyncio.wrap_future(self.submit(row))
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                # Take whatever is already queued without waiting
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def close(self):
+        """Stop the worker once the rows already queued are scored."""
+        with self._start_lock:
+            self._closed = True
+            if self._thread is not None:
+                self._queue.put(_STOP)
+
+    def _run(self):
+        while True:
+            try:
+                batch = self._collect()
+                stop = any(item is _STOP for item in batch)
+                self._score([item for item in batch if item is not _STOP])
+            except Exception as e:  # never let the worker die: later callers would hang
+                print(f"⚠️  Micro-batch worker error: {str(e)}")
+                continue
+            if stop:
+                break
+        # Rows that raced in after close
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and _start(item[1]):
+                _resolve(item[1], exception=RuntimeError("MicroBatcher is closed"))
+
+    def _score(self, batch: list):
+        # Callers that gave up (cancelled / timed out) are dropped before scoring
+        batch = [(row, future) for row, future in batch if _start(future)]
+        n = len(batch)
+        if not n:
+            return
+        X = self._buffer[:n]
+        try:
+            for i, (row, _) in enumerate(batch):
+                X[i] = row
+            out = np.asarray(self.predict_fn(X))
+        except Exception as e:
+            for _, future in batch:
+                _resolve(future, exception=e)
+            return
+        for i, (_, future) in enumerate(batch):
+            _resolve(future, out[i].copy())
+        self._stats["batches"] += 1
+        self._stats["rows"] += n
+        self._stats["max_batch"] = max(self._stats["max_batch"], n)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch count, rows scored, largest and mean batch size."""
+        stats = dict(self._stats)
+        stats["mean_batch"] = round(stats["rows"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
@@ -0,0 +1,406 @@
+"""
+Array-backed ELO rating engine.
+
+Team names are interned to integer IDs and ratings live in one float64 array,
+so a whole match table (any mix of leagues) is replayed without dict lookups.
+Replay is vectorized by layering: each match is placed one layer after the
+latest earlier match of either team, so a layer never contains the same team
+twice and can be updated with a handful of NumPy operations. Each team still
+sees its matches in order, so the ratings equal a one-match-at-a-time pass.
+
+``EloHistory`` answers "ratings as of date D" for a replayed table: full
+rating vectors are checkpointed every N matches next to a per-match delta
+log, so a query starts from the nearest checkpoint and adds at most N
+deltas. Saved histories are opened as memory-mapped ``.npy`` arrays.
+"""
+
+import json
+import shutil
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_INITIAL_RATING = 1500.0
+DEFAULT_K_FACTOR = 32.0
+DEFAULT_HOME_ADVANTAGE = 100.0
+DEFAULT_DRAW_PROB = 0.25
+DEFAULT_CHECKPOINT_EVERY = 256
+
+# Bump when the on-disk layout written by EloHistory.save changes
+HISTORY_FORMAT_VERSION = 1
+HISTORY_META_FILE = "meta.json"
+HISTORY_ARRAYS = ("dates", "home_ids", "away_ids", "deltas", "checkpoints")
+
+# Home team's actual score per result code (0: home win, 1: draw, 2: away win)
+ACTUAL_SCORE = np.array([1.0, 0.5, 0.0])
+
+
+def _layers(home_ids: np.ndarray, away_ids: np.ndarray) -> np.ndarray:
+    """Layer per match such that no team appears twice in a layer and per-team order is kept."""
+    n_teams = int(max(home_ids.max(), away_ids.max())) + 1 if len(home_ids) else 0
+    last = [-1] * n_teams
+    layers = [0] * len(home_ids)
+    for i, (h, a) in enumerate(zip(home_ids.tolist(), away_ids.tolist())):
+        lh, la = last[h], last[a]
+        layer = (lh if lh > la else la) + 1
+        last[h] = last[a] = layers[i] = layer
+    return np.array(layers, dtype=np.int32)
+
+
+class RatingsView(MutableMapping):
+    """
+    Live ``{team: rating}`` mapping over an ``EloEngine``; writes go to the engine.
+    """
+
+    def __init__(self, engine: 'EloEngine'):
+        self._engine = engine
+
+    def __getitem__(self, team: str) -> float:
+        team_id = self._engine.team_id(team)
+        if team_id is None:
+            raise KeyError(team)
+        return float(self._engine._ratings[team_id])
+
+    def __setitem__(self, team: str, rating: float):
+        self._engine.set_rating(team, rating)
+
+    def __delitem__(self, team: str):
+        raise TypeError("ratings cannot be removed from an EloEngine")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._engine._names))
+
+    def __len__(self) -> int:
+        return self._engine.n_teams
+
+    def __repr__(self) -> str:
+        return repr(self._engine.ratings())
+
+
+class EloEngine:
+    """
+    ELO ratings for every team seen, stored in a NumPy array by team ID.
+    """
+
+    def __init__(self, k_factor: float = DEFAULT_K_FACTOR, home_advantage: float = DEFAULT_HOME_ADVANTAGE,
+                 initial_rating: float = DEFAULT_INITIAL_RATING, draw_prob: float = DEFAULT_DRAW_PROB):
+        """
+        Args:
+            k_factor: Rating change per unit of surprise
+            home_advantage: Home advantage in ELO points
+            initial_rating: Rating of a team's first appearance
+            draw_prob: Flat draw probability used by ``predict_proba``
+        """
+        self.k_factor = k_factor
+        self.home_advantage = home_advantage
+        self.initial_rating = initial_rating
+        self.draw_prob = draw_prob
+        self._ids: Dict[str, int] = {}
+        self._names = []
+        self._ratings = np.empty(0)
+
+    # ============= TEAM IDS =============
+
+    @property
+    def n_teams(self) -> int:
+        return len(self._names)
+
+    @property
+    def teams(self) -> list:
+        """Team names in ID order."""
+        return list(self._names)
+
+    def intern(self, teams: Iterable[str]) -> np.ndarray:
+        """
+        IDs for a sequence of team names, registering unseen teams.
+
+        Returns:
+            int32 array of team IDs, aligned with ``teams``
+        """
+        codes, uniques = pd.factorize(pd.Series(teams, dtype=object).astype(str))
+        lookup = np.empty(len(uniques), dtype=np.int32)
+        for i, name in enumerate(uniques):
+            team_id = self._ids.get(name)
+            if team_id is None:
+                team_id = self._ids[name] = len(self._names)
+                self._names.append(name)
+            lookup[i] = team_id
+        self._grow()
+        return lookup[codes]
+
+    def team_id(self, team: str) -> Optional[int]:
+        return self._ids.get(team)
+
+    def _grow(self):
+        missing = len(self._names) - len(self._ratings)
+        if missing > 0:
+            self._ratings = np.concatenate([self._ratings, np.full(missing, self.initial_rating)])
+
+    # ============= RATINGS =============
+
+    def rating(self, team: str) -> float:
+        """Current rating (the initial rating for unseen teams)."""
+        team_id = self._ids.get(team)
+        return float(self._ratings[team_id]) if team_id is not None else self.initial_rating
+
+    def ratings(self) -> Dict[str, float]:
+        """Current rating of every team seen."""
+        return dict(zip(self._names, self._ratings.tolist()))
+
+    def set_rating(self, team: str, rating: float):
+        """Overwrite one team's rating (registering it if unseen)."""
+        team_id = self.intern([team])[0]
+        self._ratings[team_id] = rating
+
+    def ratings_array(self) -> np.ndarray:
+        """Copy of the rating array, indexed by team ID."""
+        return self._ratings.copy()
+
+    def reset(self):
+        self._ratings.fill(self.initial_rating)
+
+    def expected_home(self, home_rating, away_rating):
+        """Home team's expected score, home advantage included (scalars or arrays)."""
+        return 1.0 / (1.0 + 10.0 ** ((away_rating - home_rating - self.home_advantage) / 400.0))
+
+    def predict_proba(self, home_rating, away_rating, draw_prob=None) -> np.ndarray:
+        """
+        Outcome probabilities from ratings.
+
+        The draw probability is taken out first and the rest is split by
+        the expected score.
+
+        Args:
+            home_rating: Home rating (scalar or array)
+            away_rating: Away rating (scalar or array)
+            draw_prob: Draw probability per fixture (scalar or array);
+                the flat ``self.draw_prob`` if None
+
+        Returns:
+            Array of (home_win, draw, away_win), shape (3,) or (n, 3)
+        """
+        expected = np.asarray(self.expected_home(home_rating, away_rating), dtype=np.float64)
+        draw = np.broadcast_to(np.asarray(self.draw_prob if draw_prob is None else draw_prob,
+                                          dtype=np.float64), expected.shape)
+        decisive = 1.0 - draw
+        return np.stack([expected * decisive, draw, (1.0 - expected) * decisive], axis=-1)
+
+    def predict_teams(self, home_teams: Iterable[str], away_teams: Iterable[str],
+                      draw_prob=None) -> np.ndarray:
+        """Outcome probabilities, shape (n, 3), from the current ratings of named teams."""
+        ratings = self.ratings()
+        home = np.array([ratings.get(t, self.initial_rating) for t in home_teams])
+        away = np.array([ratings.get(t, self.initial_rating) for t in away_teams])
+        return self.predict_proba(home, away, draw_prob)
+
+    # ============= UPDATES =============
+
+    def update(self, home_team: str, away_team: str, result: int) -> float:
+        """
+        Apply one result (0: home win, 1: draw, 2: away win).
+
+        Returns:
+            Rating points moved from the away team to the home team
+        """
+        h, a = self.intern([home_team, away_team])
+        rh, ra = self._ratings[h], self._ratings[a]
+        delta = self.k_factor * (ACTUAL_SCORE[result] - self.expected_home(rh, ra))
+        self._ratings[h] = rh + delta
+        self._ratings[a] = ra - delta
+        return float(delta)
+
+    def replay(self, home_teams: Iterable[str], away_teams: Iterable[str],
+               results: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Apply a chronologically sorted match table.
+
+        Args:
+            home_teams: Home team per match
+            away_teams: Away team per match
+            results: Result code per match (0: home win, 1: draw, 2: away win)
+
+        Returns:
+            (home_pre, away_pre): ratings going into each match
+        """
+        return self.replay_ids(self.intern(home_teams), self.intern(away_teams), results)
+
+    def replay_ids(self, home_ids: np.ndarray, away_ids: np.ndarray,
+                   results: Union[np.ndarray, Iterable[int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Like ``replay``, for team IDs from ``intern``."""
+        home_pre, away_pre, _ = self._replay(np.asarray(home_ids, dtype=np.int32),
+                                             np.asarray(away_ids, dtype=np.int32), results)
+        return home_pre, away_pre
+
+    def replay_history(self, dates: Iterable, home_teams: Iterable[str], away_teams: Iterable[str],
+                       results: Iterable[int], checkpoint_every: int = None) -> "EloHistory":
+        """
+        Like ``replay``, also recording an ``EloHistory`` for as-of-date queries.
+
+        Args:
+            dates: Match date per row (chronological)
+            home_teams: Home team per match
+            away_teams: Away team per match
+            results: Result code per match
+            checkpoint_every: Matches between full rating checkpoints
+
+        Returns:
+            History covering this replay, starting from the ratings before it
+        """
+        home_ids, away_ids = self.intern(home_teams), self.intern(away_teams)
+        start = self.ratings_array()
+        home_pre, _, deltas = self._replay(home_ids, away_ids, results)
+        return EloHistory.from_deltas(self.teams, start, np.asarray(dates, dtype="datetime64[D]"),
+                                      home_ids, away_ids, deltas,
+                                      checkpoint_every or DEFAULT_CHECKPOINT_EVERY)
+
+    def _replay(self, home_ids: np.ndarray, away_ids: np.ndarray,
+                results) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Layered replay returning pre-match ratings and the home rating change per match."""
+        actual = ACTUAL_SCORE[np.asarray(results, dtype=np.int64)]
+        n = len(home_ids)
+        home_pre = np.empty(n)
+        away_pre = np.empty(n)
+        deltas = np.empty(n)
+        if n == 0:
+            return home_pre, away_pre, deltas
+
+        # Sort by layer once so each layer is a contiguous slice
+        layers = _layers(home_ids, away_ids)
+        order = np.argsort(layers, kind="stable")
+        bounds = np.r_[0, np.flatnonzero(np.diff(layers[order])) + 1, n].tolist()
+        home_sorted, away_sorted, actual_sorted = home_ids[order], away_ids[order], actual[order]
+        home_pre_sorted, away_pre_sorted, deltas_sorted = np.empty(n), np.empty(n), np.empty(n)
+
+        ratings = self._ratings
+        k, offset = self.k_factor, self.home_advantage
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            h, a = home_sorted[start:stop], away_sorted[start:stop]
+            rh, ra = ratings[h], ratings[a]
+            home_pre_sorted[start:stop] = rh
+            away_pre_sorted[start:stop] = ra
+            delta = k * (actual_sorted[start:stop] - 1.0 / (1.0 + 10.0 ** ((ra - rh - offset) / 400.0)))
+            deltas_sorted[start:stop] = delta
+            ratings[h] = rh + delta
+            ratings[a] = ra - delta
+
+        home_pre[order] = home_pre_sorted
+        away_pre[order] = away_pre_sorted
+        deltas[order] = deltas_sorted
+        return home_pre, away_pre, deltas
+
+
+def _apply_deltas(ratings: np.ndarray, home_ids: np.ndarray, away_ids: np.ndarray, deltas: np.ndarray):
+    """Add logged rating changes in match order (so sums match a sequential replay)."""
+    ids = np.stack([home_ids, away_ids], axis=1).ravel()
+    np.add.at(ratings, ids, np.stack([deltas, -deltas], axis=1).ravel())
+
+
+class EloHistory:
+    """
+    Ratings as of any date: periodic checkpoints plus a per-match delta log.
+
+    Checkpoint ``c`` holds every team's rating before match ``c * every``;
+    the log holds, per match in chronological order, the date, both team
+    IDs and the home team's rating change (the away team's is its negative).
+    """
+
+    def __init__(self, teams: list, dates: np.ndarray, home_ids: np.ndarray, away_ids: np.ndarray,
+                 deltas: np.ndarray, checkpoints: np.ndarray, checkpoint_every: int):
+        self.teams = list(teams)
+        self.dates = dates
+        self.home_ids = home_ids
+        self.away_ids = away_ids
+        self.deltas = deltas
+        self.checkpoints = checkpoints
+        self.checkpoint_every = checkpoint_every
+        self._ids = {name: i for i, name in enumerate(self.teams)}
+
+    @classmethod
+    def from_deltas(cls, teams: list, start: np.ndarray, dates: np.ndarray, home_ids: np.ndarray,
+                    away_ids: np.ndarray, deltas: np.ndarray, checkpoint_every: int) -> "EloHistory":
+        """Build the checkpoints by accumulating the delta log chunk by chunk."""
+        n = len(deltas)
+        ratings = np.asarray(start, dtype=np.float64).copy()
+        checkpoints = np.empty((n // checkpoint_every + 1, len(ratings)))
+        for c in range(len(checkpoints)):
+            checkpoints[c] = ratings
+            chunk = slice(c * checkpoint_every, min((c + 1) * checkpoint_every, n))
+            _apply_deltas(ratings, home_ids[chunk], away_ids[chunk], deltas[chunk])
+        return cls(teams, dates, np.asarray(home_ids, dtype=np.int32), np.asarray(away_ids, dtype=np.int32),
+                   np.asarray(deltas, dtype=np.float64), checkpoints, checkpoint_every)
+
+    def __len__(self) -> int:
+        return len(self.deltas)
+
+    def position(self, as_of) -> int:
+        """Number of logged matches played before ``as_of`` (matches on that day excluded)."""
+        return int(np.searchsorted(self.dates, np.datetime64(as_of, "D"), side="left"))
+
+    def ratings_as_of(self, as_of) -> np.ndarray:
+        """Every team's rating going into ``as_of``, indexed by team ID."""
+        position = self.position(as_of)
+        c = position // self.checkpoint_every
+        ratings = np.array(self.checkpoints[c])
+        chunk = slice(c * self.checkpoint_every, position)
+        _apply_deltas(ratings, self.home_ids[chunk], self.away_ids[chunk], self.deltas[chunk])
+        return ratings
+
+    def ratings_dict(self, as_of) -> Dict[str, float]:
+        return dict(zip(self.teams, self.ratings_as_of(as_of).tolist()))
+
+    def rating(self, team: str, as_of) -> Optional[float]:
+        """One team's rating going into ``as_of`` (None for unknown teams)."""
+        team_id = self._ids.get(team)
+        if team_id is None:
+            return None
+        position = self.position(as_of)
+        c = position // self.checkpoint_every
+        chunk = slice(c * self.checkpoint_every, position)
+        home, away, deltas = self.home_ids[chunk], self.away_ids[chunk], self.deltas[chunk]
+        rating = float(self.checkpoints[c, team_id])
+        for i in np.flatnonzero((home == team_id) | (away == team_id)).tolist():
+            rating += deltas[i] if home[i] == team_id else -deltas[i]
+        return rating
+
+    # ============= PERSISTENCE =============
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """
+        Write the history as ``.npy`` arrays plus ``meta.json``.
+
+        The directory is written next to the target and renamed into place.
+        """
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        for name in HISTORY_ARRAYS:
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        meta = {"format_version": HISTORY_FORMAT_VERSION, "checkpoint_every": self.checkpoint_every,
+                "teams": self.teams}
+        (tmp / HISTORY_META_FILE).write_text(json.dumps(meta), encoding="utf-8")
+        shutil.rmtree(path, ignore_errors=True)
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> Optional["EloHistory"]:
+        """
+        Open a saved history, memory-mapping the arrays by default.
+
+        Returns:
+            The history, or None if missing or written by another format version
+        """
+        path = Path(path)
+        try:
+            meta = json.loads((path / HISTORY_META_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if meta.get("format_version") != HISTORY_FORMAT_VERSION:
+            return None
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None)
+                  for name in HISTORY_ARRAYS}
+        return cls(meta["teams"], checkpoint_every=meta["checkpoint_every"], **arrays)
@@ -0,0 +1,180 @@
+"""
+Nightly refresh of the baseline ensemble.
+
+New results since the latest model version are folded in with a warm-start
+update (a few boosting rounds fitted on the new rows only) instead of a full
+retrain. A full retrain still happens when:
+
+    - there is no model yet, or the feature definition changed
+    - the update budget since the last full retrain is used up
+    - drift: the current model's log loss on the new rows is clearly worse
+      than its out-of-sample log loss at training time (at least
+      DRIFT_MIN_ROWS new rows, and worse even at the lower end of a 95%
+      confidence interval)
+
+A full retrain picks the boosting rounds by early stopping on the newest
+matches, then refits on every row so the published model has seen them. The
+drift reference is the log loss on the last rolling-origin fold (the latest
+season, predicted by a model trained on the seasons before it), since the
+early-stopping loss is optimistic: the rounds were tuned on those rows.
+
+Each outcome is published as a new version in the ``ModelRegistry``.
+
+Usage:
+    python -m src.models.refresh            # update or retrain as needed
+    python -m src.models.refresh --full     # force a full retrain
+"""
+
+import argparse
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.feature_store import FEATURE_COLUMNS, FeatureStore, feature_store, feature_version
+from src.models.baseline import BaselinePredictor
+from src.models.registry import ModelRegistry
+from src.models.training import cross_validate
+
+UPDATE_BUDGET = 8        # incremental updates allowed between full retrains
+UPDATE_ROUNDS = 20       # boosting rounds appended per model per update
+DRIFT_TOLERANCE = 0.10   # relative log-loss degradation on new rows that forces a retrain
+DRIFT_MIN_ROWS = 100     # fewer new rows are too noisy to judge drift
+DRIFT_Z = 1.96           # the degradation must hold at the lower end of this confidence bound
+
+
+def holdout_log_loss(X: pd.DataFrame, y: np.ndarray, seasons: np.ndarray,
+                     model_type: str = 'ensemble') -> Tuple[Optional[float], Optional[str]]:
+    """
+    Log loss on the last rolling-origin fold: the latest season, predicted by
+    a model trained on the seasons before it.
+
+    Returns:
+        (log loss, test season), or (None, None) with fewer than two seasons
+    """
+    results = cross_validate(X, y, seasons, n_folds=1, model_type=model_type, n_workers=1)
+    if results.empty:
+        return None, None
+    fold = results.iloc[-1]
+    return float(fold["log_loss"]), str(fold["test_season"])
+
+
+def train_full(store: FeatureStore = feature_store, model_type: str = 'ensemble') -> tuple:
+    """
+    Train on the whole feature store: early stopping on a chronological
+    split, then a refit on every row at the chosen rounds.
+
+    Returns:
+        (model, manifest metadata)
+    """
+    frame = store.training_frame()
+    X = frame[FEATURE_COLUMNS].reset_index(drop=True)
+    y = frame["target"].to_numpy(dtype=np.int64)
+
+    reference, season = holdout_log_loss(X, y, frame["season"].to_numpy(), model_type)
+    model = BaselinePredictor(model_type=model_type)
+    model.train(X, y, shuffle=False)
+    model.refit(X, y)
+    if reference is not None:
+        # Kept in the model's metrics so warm-start versions carry it along
+        model.training_info["metrics"]["holdout_log_loss"] = reference
+    return model, {
+        "kind": "full",
+        "feature_version": feature_version(),
+        "last_match_date": frame["date"].max().strftime("%Y-%m-%d"),
+        "holdout_season": season,
+        "updates_since_full": 0,
+    }
+
+
+def drift_check(y_true: np.ndarray, proba: np.ndarray, reference: Optional[float],
+                tolerance: float = DRIFT_TOLERANCE, min_rows: int = DRIFT_MIN_ROWS,
+                z: float = DRIFT_Z) -> Optional[str]:
+    """
+    Decide whether new results show drift against the out-of-sample log
+    loss measured at training time.
+
+    Returns:
+        A reason string if the model has drifted, else None (also when there
+        are too few rows to tell)
+    """
+    if not reference or len(y_true) < min_rows:
+        return None
+    picked = np.clip(proba[np.arange(len(y_true)), y_true], 1e-15, 1.0)
+    losses = -np.log(picked)
+    mean = losses.mean()
+    lower = mean - z * losses.std(ddof=1) / np.sqrt(len(losses))
+    if lower > reference * (1 + tolerance):
+        return f"drift (log loss {mean:.3f}, lower bound {lower:.3f} vs {reference:.3f})"
+    return None
+
+
+def refresh(registry: Optional[ModelRegistry] = None, store: FeatureStore = feature_store,
+            update_budget: int = UPDATE_BUDGET, n_rounds: int = UPDATE_ROUNDS,
+            drift_tolerance: float = DRIFT_TOLERANCE, force_full: bool = False,
+            model_type: str = 'ensemble') -> Dict[str, Any]:
+    """
+    Bring the latest model version up to date with the feature store.
+
+    Returns:
+        Summary with the action taken ('none', 'update' or 'full'), the
+        reason, the published version and timing
+    """
+    registry = registry or ModelRegistry()
+    start = time.time()
+    manifest = registry.manifest()
+
+    def retrain(reason: str) -> Dict[str, Any]:
+        model, metadata = train_full(store, model_type)
+        version = registry.publish(model, metadata)
+        return {"action": "full", "reason": reason, "version": version,
+                "seconds": round(time.time() - start, 2)}
+
+    if force_full:
+        return retrain("forced")
+    if manifest is None:
+        return retrain("no model")
+    if manifest.get("feature_version") != feature_version() or manifest.get("model_type") != model_type:
+        return retrain("feature definition changed")
+
+    frame = store.training_frame()
+    new_rows = frame[frame["date"] > pd.Timestamp(manifest["last_match_date"])]
+    if new_rows.empty:
+        return {"action": "none", "reason": "no new results", "version": registry.latest(),
+                "seconds": round(time.time() - start, 2)}
+    if manifest.get("updates_since_full", 0) >= update_budget:
+        return retrain("update budget exhausted")
+
+    model = registry.load()
+    X_new = new_rows[FEATURE_COLUMNS].reset_index(drop=True)
+    y_new = new_rows["target"].to_numpy(dtype=np.int64)
+
+    # Versions trained before the holdout was recorded have no trustworthy reference
+    reference = manifest.get("metrics", {}).get("holdout_log_loss")
+    drift = drift_check(y_new, np.asarray(model.predict_proba(X_new)), reference, drift_tolerance)
+    if drift:
+        return retrain(drift)
+
+    metrics = model.update(X_new, y_new, n_rounds=n_rounds)
+    version = registry.publish(model, {
+        "kind": "update",
+        "feature_version": manifest["feature_version"],
+        "last_match_date": new_rows["date"].max().strftime("%Y-%m-%d"),
+        "updates_since_full": manifest.get("updates_since_full", 0) + 1,
+    })
+    return {"action": "update", "reason": f"{len(new_rows)} new results", "version": version,
+            **{k: round(v, 4) for k, v in metrics.items()}, "seconds": round(time.time() - start, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the baseline ensemble")
+    parser.add_argument("--full", action="store_true", help="Force a full retrain")
+    args = parser.parse_args()
+
+    result = refresh(force_full=args.full)
+    print(f"✅ Baseline refresh: {result}")
+
+
+if __name__ == "__main__":
+    main()
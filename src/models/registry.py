@@ -0,0 +1,106 @@
+"""
+Versioned on-disk registry for baseline model artifacts.
+
+Every full retrain or incremental update is published as a new immutable
+version directory (``v0001``, ``v0002``, ...) written by
+``BaselinePredictor.save``. ``LATEST`` names the version servers should load
+and is swapped atomically after the new directory is complete.
+"""
+
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.models.baseline import BaselinePredictor
+
+MODEL_DIR = Path(os.getenv("BASELINE_MODEL_DIR", Path(__file__).resolve().parents[2] / "models" / "baseline"))
+LATEST_FILE = "LATEST"
+VERSION_PATTERN = re.compile(r"^v(\d{4,})$")
+DEFAULT_KEEP = 10
+
+
+class ModelRegistry:
+    """
+    Immutable model versions plus a ``LATEST`` pointer.
+    """
+
+    def __init__(self, root: Path = MODEL_DIR, keep: int = DEFAULT_KEEP):
+        """
+        Args:
+            root: Registry directory
+            keep: Number of versions retained when publishing
+        """
+        self.root = Path(root)
+        self.keep = keep
+
+    def versions(self) -> List[str]:
+        """Published versions, oldest first."""
+        if not self.root.exists():
+            return []
+        found = [p.name for p in self.root.iterdir() if p.is_dir() and VERSION_PATTERN.match(p.name)]
+        return sorted(found, key=lambda name: int(VERSION_PATTERN.match(name).group(1)))
+
+    def latest(self) -> Optional[str]:
+        """Version named by ``LATEST`` (falls back to the newest directory)."""
+        pointer = self.root / LATEST_FILE
+        if pointer.exists():
+            version = pointer.read_text(encoding="utf-8").strip()
+            if (self.root / version).is_dir():
+                return version
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def path(self, version: Optional[str] = None) -> Optional[Path]:
+        version = version or self.latest()
+        return self.root / version if version else None
+
+    def manifest(self, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Manifest of a version (latest by default), or None."""
+        path = self.path(version)
+        return BaselinePredictor.read_manifest(path) if path else None
+
+    def load(self, version: Optional[str] = None) -> Optional[BaselinePredictor]:
+        path = self.path(version)
+        return BaselinePredictor.load(path) if path else None
+
+    def publish(self, model: BaselinePredictor, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Save a model as the next version and point ``LATEST`` at it.
+
+        Returns:
+            The new version name
+        """
+        versions = self.versions()
+        number = int(VERSION_PATTERN.match(versions[-1]).group(1)) + 1 if versions else 1
+        version = f"v{number:04d}"
+        model.save(self.root / version, metadata={**(metadata or {}), "version": version,
+                                                  "parent_version": self.latest()})
+
+        tmp = self.root / f"{LATEST_FILE}.tmp"
+        tmp.write_text(version, encoding="utf-8")
+        tmp.replace(self.root / LATEST_FILE)
+        self._prune()
+        return version
+
+    def _prune(self):
+        versions = self.versions()
+        latest = self.latest()
+        for version in versions[:-self.keep] if self.keep else []:
+            if version != latest:
+                shutil.rmtree(self.root / version, ignore_errors=True)
+
+    def history(self) -> List[Dict[str, Any]]:
+        """Short summary of every retained version, oldest first."""
+        rows = []
+        for version in self.versions():
+            manifest = self.manifest(version) or {}
+            rows.append({
+                "version": version,
+                "kind": manifest.get("kind"),
+                "trained_at": manifest.get("trained_at"),
+                "last_match_date": manifest.get("last_match_date"),
+                "updates_since_full": manifest.get("updates_since_full"),
+            })
+        return rows
@@ -0,0 +1,600 @@
+"""
+Monte Carlo season simulator.
+
+Starting from the table as of a date, every remaining fixture of the
+league-season is drawn from a match model (Dixon-Coles scorelines or ELO
+outcomes) for many simulated seasons at once: a chunk of simulations is a
+(simulations x fixtures) array of outcomes sampled from per-fixture alias
+tables, folded into team points, goal difference and goals with matrix
+products against fixture/team incidence matrices and ranked in one
+``argsort``. Chunks are independent and fan out over a process pool.
+
+Projections (title, top-4 and relegation probabilities per team) are
+memoized under ``<cache>/.artifacts`` per league, season and matchday, and
+the least recently used ones are evicted beyond ``MAX_ARTIFACTS``. The
+server only reads them; they are precomputed offline or on a background
+thread.
+
+Usage:
+    python -m src.models.season_sim "ENG-Premier League" --as-of 2025-01-01
+    python -m src.models.season_sim --precompute --all-matchdays
+"""
+
+import argparse
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.cache_store import CacheStore, cache_store
+from src.data.fbref_cache import (ARTIFACT_DIRNAME, TeamResolver, cached_frame, load_schedules, read_cached_frame,
+                                  season_for_date)
+from src.data.feature_store import ELO_HOME_ADVANTAGE, ELO_INITIAL, ELO_K_FACTOR, feature_store
+from src.models.dixon_coles import fit_cached_history
+from src.models.elo import EloEngine
+
+SIM_VERSION = 1
+DEFAULT_SIMULATIONS = 10_000
+CHUNK_SIZE = 5_000
+TOP_SPOTS = 4
+RELEGATION_SPOTS = 3
+SIM_GOALS = 7              # Poisson scorelines 0..SIM_GOALS per side are sampled
+MODELS = ("poisson", "elo")
+ARTIFACT_PREFIX = "season_sim"
+MAX_PROJECTIONS = 64       # in memory
+MAX_ARTIFACTS = int(os.getenv("SEASON_SIM_MAX_ARTIFACTS", 512))  # on disk, across leagues and matchdays
+
+# ELO outcomes as nominal scorelines: home win 1-0, draw 0-0, away win 0-1
+ELO_SCORELINES = (np.array([1, 0, 0]), np.array([0, 0, 1]))
+
+
+def current_table(played: pd.DataFrame, teams: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Points, goal difference, goals for and games played per team from results.
+
+    Returns:
+        Four int arrays aligned with ``teams``
+    """
+    index = pd.Index(teams)
+    h = index.get_indexer(played["home_team"].astype(str))
+    a = index.get_indexer(played["away_team"].astype(str))
+    hg = played["home_goals"].to_numpy(dtype=np.int64)
+    ag = played["away_goals"].to_numpy(dtype=np.int64)
+    n = len(teams)
+
+    home_points = np.select([hg > ag, hg == ag], [3, 1], 0)
+    away_points = np.select([ag > hg, ag == hg], [3, 1], 0)
+    points = np.bincount(h, home_points, n) + np.bincount(a, away_points, n)
+    gd = np.bincount(h, hg - ag, n) + np.bincount(a, ag - hg, n)
+    gf = np.bincount(h, hg, n) + np.bincount(a, ag, n)
+    games = np.bincount(h, minlength=n) + np.bincount(a, minlength=n)
+    return points.astype(np.int64), gd.astype(np.int64), gf.astype(np.int64), games
+
+
+def fixture_distributions(fixtures: pd.DataFrame, league: str, as_of,
+                          model: str = "poisson") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Outcome distribution per remaining fixture.
+
+    Args:
+        fixtures: Remaining fixtures (home_team, away_team)
+        league: League code, for fitting the Poisson model
+        as_of: Only results before this date inform the model
+        model: 'poisson' (Dixon-Coles scorelines) or 'elo' (win/draw/loss)
+
+    Returns:
+        (probs, home_goals, away_goals): probs is (n_fixtures, K); outcome
+        k means the scoreline home_goals[k]-away_goals[k]
+    """
+    home, away = fixtures["home_team"].astype(str), fixtures["away_team"].astype(str)
+    if model == "poisson":
+        dc = fit_cached_history(leagues=[league], as_of=as_of)
+        lh, la = dc.expected_goals(home, away)
+        matrix = dc.score_matrix_from_rates(lh, la)[:, :SIM_GOALS + 1, :SIM_GOALS + 1]
+        goals = np.arange(SIM_GOALS + 1)
+        return (matrix.reshape(len(fixtures), -1), np.repeat(goals, len(goals)), np.tile(goals, len(goals)))
+    if model == "elo":
+        ratings = feature_store.elo_history().ratings_dict(as_of)
+        engine = EloEngine(k_factor=ELO_K_FACTOR, home_advantage=ELO_HOME_ADVANTAGE, initial_rating=ELO_INITIAL)
+        probs = engine.predict_proba(np.array([ratings.get(t, ELO_INITIAL) for t in home]),
+                                     np.array([ratings.get(t, ELO_INITIAL) for t in away]))
+        return probs.reshape(len(fixtures), 3), ELO_SCORELINES[0], ELO_SCORELINES[1]
+    raise ValueError(f"Unknown match model '{model}' (expected one of {MODELS})")
+
+
+def alias_tables(probs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Walker alias tables, one row per fixture, for O(1) categorical sampling.
+
+    Returns:
+        (accept, alias): outcome k is kept with probability accept[i, k],
+        otherwise alias[i, k] is taken
+    """
+    n_rows, n_outcomes = probs.shape
+    scaled = probs / probs.sum(axis=1, keepdims=True) * n_outcomes
+    accept = np.ones((n_rows, n_outcomes))
+    alias = np.tile(np.arange(n_outcomes), (n_rows, 1))
+    for i in range(n_rows):
+        p = scaled[i].tolist()
+        small = [k for k in range(n_outcomes) if p[k] < 1.0]
+        large = [k for k in range(n_outcomes) if p[k] >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            accept[i, s] = p[s]
+            alias[i, s] = l
+            p[l] += p[s] - 1.0
+            (small if p[l] < 1.0 else large).append(l)
+    return accept, alias
+
+
+def _simulate_chunk(task: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulate one chunk of seasons. Runs in a worker process.
+
+    Returns:
+        (position_counts, points_sum): counts is (n_teams, n_teams) with
+        [team, position] occurrences; points_sum is final points summed
+    """
+    rng = np.random.default_rng(task["seed"])
+    n_sims = task["n_sims"]
+    accept, alias = task["accept"], task["alias"]
+    home_goals, away_goals = task["home_goals"], task["away_goals"]
+    home_inc, away_inc = task["home_inc"], task["away_inc"]
+    points, gd, gf = task["points"], task["gd"], task["gf"]
+    n_fixtures, n_outcomes = accept.shape
+    n_teams = len(points)
+
+    # Alias sampling for every (simulation, fixture): the integer part of
+    # u * K picks a column, the fractional part decides column vs. alias
+    u = rng.random((n_sims, n_fixtures)) * n_outcomes
+    column = u.astype(np.int64)
+    np.minimum(column, n_outcomes - 1, out=column)
+    cell = column + np.arange(n_fixtures) * n_outcomes
+    outcome = np.where(u - column < accept.ravel()[cell], column, alias.ravel()[cell])
+    hg, ag = home_goals[outcome], away_goals[outcome]
+
+    home_points = np.where(hg > ag, 3, np.where(hg == ag, 1, 0)).astype(np.float32)
+    away_points = np.where(ag > hg, 3, np.where(ag == hg, 1, 0)).astype(np.float32)
+    margin = (hg - ag).astype(np.float32)
+    final_points = points + home_points @ home_inc + away_points @ away_inc
+    final_gd = gd + margin @ home_inc - margin @ away_inc
+    final_gf = gf + hg.astype(np.float32) @ home_inc + ag.astype(np.float32) @ away_inc
+
+    # Points, then goal difference, then goals scored; remaining ties broken at random
+    key = (final_points.astype(np.float64) * 1e6 + (final_gd + 1000.0) * 1e3 + final_gf
+           + rng.random((n_sims, n_teams)))
+    order = np.argsort(-key, axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(n_teams)[None, :], axis=1)
+    counts = np.bincount((np.arange(n_teams)[None, :] * n_teams + positions).ravel(),
+                         minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+    return counts, final_points.sum(axis=0, dtype=np.float64)
+
+
+def simulate(teams: List[str], table: Tuple[np.ndarray, np.ndarray, np.ndarray], fixtures: pd.DataFrame,
+             probs: np.ndarray, home_goals: np.ndarray, away_goals: np.ndarray,
+             n_sims: int = DEFAULT_SIMULATIONS, seed: int = 0, n_workers: Optional[int] = None,
+             chunk_size: int = CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run ``n_sims`` seasons from a table and remaining fixtures.
+
+    Args:
+        teams: Team names (table order)
+        table: (points, gd, gf) per team before the remaining fixtures
+        fixtures: Remaining fixtures (home_team, away_team)
+        probs: Outcome distribution per fixture (``fixture_distributions``)
+        home_goals: Home goals per outcome
+        away_goals: Away goals per outcome
+        n_sims: Number of simulated seasons
+        seed: Base random seed (chunks use seed + chunk number)
+        n_workers: Worker processes (all CPUs if None)
+        chunk_size: Simulations per task
+
+    Returns:
+        (position_counts, mean_points)
+    """
+    index = pd.Index(teams)
+    n_teams = len(teams)
+    h = index.get_indexer(fixtures["home_team"].astype(str))
+    a = index.get_indexer(fixtures["away_team"].astype(str))
+    home_inc = np.zeros((len(fixtures), n_teams), dtype=np.float32)
+    away_inc = np.zeros((len(fixtures), n_teams), dtype=np.float32)
+    home_inc[np.arange(len(fixtures)), h] = 1.0
+    away_inc[np.arange(len(fixtures)), a] = 1.0
+
+    accept, alias = alias_tables(probs)
+    points, gd, gf = (np.asarray(x, dtype=np.float32) for x in table)
+
+    sizes = [min(chunk_size, n_sims - start) for start in range(0, n_sims, chunk_size)]
+    tasks = [
+        {"seed": seed + i, "n_sims": size, "accept": accept, "alias": alias, "home_goals": home_goals, "away_goals": away_goals,
+         "home_inc": home_inc, "away_inc": away_inc, "points": points, "gd": gd, "gf": gf}
+        for i, size in enumerate(sizes)
+    ]
+    n_workers = min(n_workers or os.cpu_count() or 1, len(tasks))
+    if n_workers <= 1:
+        results = [_simulate_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_simulate_chunk, tasks))
+
+    counts = sum(r[0] for r in results)
+    mean_points = sum(r[1] for r in results) / n_sims
+    return counts, mean_points
+
+
+class SeasonSimulator:
+    """
+    Standings projections per league-season, memoized per matchday.
+
+    Simulations never run on the request path: ``team_projection`` only
+    reads projections that are already in memory or on disk, and queues a
+    missing one on a single background thread (in-process, no worker pool
+    forked from the server). ``precompute`` fills the artifacts offline.
+    """
+
+    def __init__(self, store: CacheStore = cache_store, n_sims: int = DEFAULT_SIMULATIONS,
+                 model: str = "poisson", n_workers: Optional[int] = None,
+                 max_projections: int = MAX_PROJECTIONS, max_artifacts: int = MAX_ARTIFACTS):
+        """
+        Args:
+            store: Cache store holding the schedule pages
+            n_sims: Default number of simulated seasons
+            model: Default match model ('poisson' or 'elo')
+            n_workers: Worker processes for ``project``/``precompute`` (all CPUs if None)
+            max_projections: Projections kept in memory (least recently used evicted)
+            max_artifacts: Projection artifacts kept on disk (least recently used evicted)
+        """
+        self.store = store
+        self.n_sims = n_sims
+        self.model = model
+        self.n_workers = n_workers
+        self.max_projections = max_projections
+        self.max_artifacts = max_artifacts
+        self._projections: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: set = set()
+        self._seasons: Dict[tuple, Dict[str, Any]] = {}
+        self._schedules_token: Optional[str] = None
+
+    # ============= PROJECTIONS =============
+
+    def _season_fixtures(self, league: str, season: str, sources: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        One league-season's fixtures with their played flags, dates and weeks
+        as arrays, memoized until the schedule pages change (filtering the
+        full schedule frame costs milliseconds per call).
+        """
+        token = self.store.fingerprint(sources)
+        with self._lock:
+            if token != self._schedules_token:
+                self._seasons, self._schedules_token = {}, token
+            if (league, season) in self._seasons:
+                return self._seasons[(league, season)]
+
+        schedules = load_schedules(self.store)
+        fixtures = schedules[(schedules["league"].astype(str) == league)
+                             & (schedules["season"].astype(str) == season)].reset_index(drop=True)
+        entry = None if fixtures.empty else {
+            "fixtures": fixtures,
+            "played": fixtures["played"].to_numpy(dtype=bool),
+            "dates": fixtures["date"].to_numpy(dtype="datetime64[ns]"),
+            "weeks": fixtures["week"].to_numpy(dtype=np.float64),
+        }
+        with self._lock:
+            if token == self._schedules_token:
+                self._seasons[(league, season)] = entry
+        return entry
+
+    def _plan(self, league: str, season: Optional[str], as_of, n_sims: Optional[int],
+              model: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Table split and cache keys for one projection; None if the league-season is not cached."""
+        when = pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.now().normalize()
+        season = str(season or season_for_date(when))
+        n_sims = n_sims or self.n_sims
+        model = model or self.model
+
+        sources = self.store.names("schedule_*.html")
+        entry = self._season_fixtures(league, season, sources)
+        if entry is None:
+            return None
+        fixtures = entry["fixtures"]
+        is_played = entry["played"] & (entry["dates"] < np.datetime64(when, "ns"))
+        n_played = int(is_played.sum())
+        weeks = entry["weeks"][is_played]
+        matchday = int(np.nanmax(weeks)) if n_played and not np.isnan(weeks).all() else 0
+
+        slug = "".join(c if c.isalnum() else "_" for c in league)
+        return {
+            "league": league, "season": season, "when": when, "n_sims": n_sims, "model": model,
+            "fixtures": fixtures, "is_played": is_played, "matchday": matchday,
+            "key": (league, season, matchday, n_played, model, n_sims),
+            "artifact": f"{ARTIFACT_PREFIX}-{slug}-{season}-md{matchday:02d}-{n_played}-{model}-{n_sims}",
+            "sources": sources + [f"season-sim-v{SIM_VERSION}"],
+        }
+
+    def project(self, league: str, season: Optional[str] = None, as_of=None, n_sims: Optional[int] = None,
+                model: Optional[str] = None, build: bool = True,
+                n_workers: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        Simulate the rest of a league-season from the table as of a date.
+
+        Args:
+            league: League code (e.g. 'ENG-Premier League')
+            season: Season key; defaults to the season of ``as_of``
+            as_of: Results before this date count as played (defaults to today)
+            n_sims: Number of simulated seasons
+            model: 'poisson' or 'elo'
+            build: Simulate when no projection is cached; if False, return
+                None instead
+            n_workers: Worker processes (``self.n_workers`` if None)
+
+        Returns:
+            One row per team, best projected first: points, played,
+            expected_points, expected_position, title, top4, relegation;
+            None if the league-season is not cached (or, with
+            ``build=False``, not yet simulated)
+        """
+        plan = self._plan(league, season, as_of, n_sims, model)
+        if plan is None:
+            return None
+        key = plan["key"]
+        with self._lock:
+            if key in self._projections:
+                self._projections.move_to_end(key)
+                return self._projections[key]
+
+        projection = read_cached_frame(plan["artifact"], plan["sources"], self.store)
+        if projection is not None:
+            self._touch(plan["artifact"])
+        elif not build:
+            return None
+        else:
+            projection = cached_frame(plan["artifact"], plan["sources"],
+                                      lambda: self._simulate(plan, n_workers or self.n_workers), self.store)
+            self._prune_artifacts()
+        self._remember(key, projection)
+        return projection
+
+    def _remember(self, key: tuple, projection: pd.DataFrame):
+        with self._lock:
+            self._projections[key] = projection
+            self._projections.move_to_end(key)
+            while len(self._projections) > self.max_projections:
+                self._projections.popitem(last=False)
+
+    def _artifact_paths(self) -> List[Path]:
+        return list((self.store.root / ARTIFACT_DIRNAME).glob(f"{ARTIFACT_PREFIX}-*.pkl"))
+
+    def _touch(self, artifact: str):
+        """Mark an artifact as recently used (its mtime orders eviction)."""
+        for path in (self.store.root / ARTIFACT_DIRNAME).glob(f"{artifact}-*.pkl"):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+    def _prune_artifacts(self):
+        """Delete the least recently used projection artifacts beyond ``max_artifacts``."""
+        paths = []
+        for path in self._artifact_paths():
+            try:
+                paths.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        paths.sort(reverse=True)
+        for _, path in paths[self.max_artifacts:]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _simulate(self, plan: Dict[str, Any], n_workers: Optional[int]) -> pd.DataFrame:
+        start = time.time()
+        league, season, when, matchday = plan["league"], plan["season"], plan["when"], plan["matchday"]
+        n_sims, model = plan["n_sims"], plan["model"]
+        # Row subsets are only taken here, when a projection is actually simulated
+        played, remaining = plan["fixtures"][plan["is_played"]], plan["fixtures"][~plan["is_played"]]
+        teams = sorted(set(played["home_team"].astype(str)) | set(played["away_team"].astype(str))
+                       | set(remaining["home_team"].astype(str)) | set(remaining["away_team"].astype(str)))
+        points, gd, gf, games = current_table(played, teams)
+        n_teams = len(teams)
+
+        if len(remaining):
+            probs, home_goals, away_goals = fixture_distributions(remaining, league, when, model)
+            counts, mean_points = simulate(teams, (points, gd, gf), remaining, probs, home_goals, away_goals,
+                                           n_sims=n_sims, n_workers=n_workers)
+        else:
+            # Season over: the table is final
+            order = np.lexsort((-gf, -gd, -points))
+            counts = np.zeros((n_teams, n_teams), dtype=np.int64)
+            counts[order, np.arange(n_teams)] = n_sims
+            mean_points = points.astype(np.float64)
+
+        position_probs = counts / n_sims
+        positions = np.arange(1, n_teams + 1)
+        projection = pd.DataFrame({
+            "team": teams,
+            "points": points,
+            "played": games,
+            "expected_points": np.round(mean_points, 2),
+            "expected_position": np.round(position_probs @ positions, 2),
+            "title": position_probs[:, 0],
+            "top4": position_probs[:, :TOP_SPOTS].sum(axis=1),
+            "relegation": position_probs[:, n_teams - RELEGATION_SPOTS:].sum(axis=1),
+        }).sort_values(["expected_position", "team"]).reset_index(drop=True)
+        projection.attrs = {"league": league, "season": season, "matchday": matchday, "model": model,
+                            "n_sims": n_sims, "seconds": round(time.time() - start, 2)}
+        print(f"🎲 {league} {season} matchday {matchday}: {n_sims} seasons, "
+              f"{len(remaining)} fixtures left ({time.time() - start:.1f}s)")
+        return projection
+
+    # ============= OFFLINE / BACKGROUND =============
+
+    def precompute(self, leagues: Optional[Iterable[str]] = None, season: Optional[str] = None,
+                   as_of=None, all_matchdays: bool = False, n_sims: Optional[int] = None,
+                   model: Optional[str] = None) -> int:
+        """
+        Simulate and store projections ahead of requests.
+
+        Args:
+            leagues: League codes (every cached league if None)
+            season: Season key; defaults to the season of ``as_of``
+            as_of: Date of the projection (today if None)
+            all_matchdays: Also project the table after every earlier
+                match date of the season (for historical requests)
+            n_sims: Number of simulated seasons
+            model: 'poisson' or 'elo'
+
+        Returns:
+            Number of projections available afterwards
+        """
+        schedules = load_schedules(self.store)
+        leagues = list(leagues) if leagues else sorted(schedules["league"].astype(str).unique())
+        when = pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.now().normalize()
+        season = str(season or season_for_date(when))
+
+        done = 0
+        for league in leagues:
+            dates = {when}
+            if all_matchdays:
+                fixtures = schedules[(schedules["league"].astype(str) == league)
+                                     & (schedules["season"].astype(str) == season)]
+                # The table only changes on match dates: project the day after each
+                # one (same-day kickoffs are not counted as played), plus the start
+                starts = pd.to_datetime(fixtures["date"]).dt.normalize()
+                dates |= {d for d in starts + pd.Timedelta(days=1) if d < when}
+                if len(starts):
+                    dates.add(starts.min())
+            for date in sorted(dates):
+                try:
+                    if self.project(league, season, as_of=date, n_sims=n_sims, model=model) is not None:
+                        done += 1
+                except Exception as e:
+                    print(f"⚠️  Season projection failed for {league} ({date.date()}): {e}")
+        return done
+
+    def _submit(self, key: tuple, task):
+        """Run ``task`` on the background thread unless ``key`` is already queued."""
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="season-sim")
+            executor = self._executor
+
+        def run():
+            try:
+                task()
+            except Exception as e:
+                print(f"⚠️  Background season projection failed: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        executor.submit(run)
+
+    def schedule(self, league: str, as_of=None):
+        """Queue one projection on the background thread (no-op if already queued)."""
+        when = None if as_of is None else str(pd.Timestamp(as_of).date())
+        self._submit((league, when), lambda: self.project(league, as_of=as_of, n_workers=1))
+
+    def warm_up(self, leagues: Optional[Iterable[str]] = None):
+        """Queue today's projection for every cached league (or ``leagues``)."""
+        def run():
+            names = list(leagues) if leagues else sorted(load_schedules(self.store)["league"].astype(str).unique())
+            for league in names:
+                try:
+                    self.project(league, n_workers=1)
+                except Exception as e:
+                    print(f"⚠️  Season projection failed for {league}: {e}")
+
+        self._submit(("warm_up",), run)
+
+    def shutdown(self):
+        """Drop queued background projections; a running one finishes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def team_projection(self, team: str, league: str, as_of=None) -> Optional[Dict[str, Any]]:
+        """
+        One team's row of a precomputed projection as a plain dict for agent features.
+
+        Only cached projections are read; a missing one is queued on the
+        background thread and None is returned until it is ready.
+
+        Args:
+            team: Team name (FBref or common alias)
+            league: League code
+            as_of: Kickoff date
+
+        Returns:
+            Dictionary with matchday, title/top4/relegation probabilities and
+            expected points/position, or None if unavailable
+        """
+        projection = self.project(league, as_of=as_of, build=False)
+        if projection is None:
+            self.schedule(league, as_of)
+            return None
+        if projection.empty:
+            return None
+        name = TeamResolver(projection["team"]).resolve(team)
+        if name is None:
+            return None
+        row = projection.set_index("team").loc[name]
+        return {
+            "matchday": projection.attrs.get("matchday"),
+            "title_prob": round(float(row["title"]), 4),
+            "top4_prob": round(float(row["top4"]), 4),
+            "relegation_prob": round(float(row["relegation"]), 4),
+            "expected_points": float(row["expected_points"]),
+            "expected_position": float(row["expected_position"]),
+        }
+
+
+# --- INSTANTIATE ---
+season_simulator = SeasonSimulator()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo standings projection")
+    parser.add_argument("league", nargs="?", default=None,
+                        help="League code, e.g. 'ENG-Premier League' (all cached leagues with --precompute)")
+    parser.add_argument("--season", default=None, help="Season key (default: season of --as-of)")
+    parser.add_argument("--as-of", default=None, help="Results before this date count as played")
+    parser.add_argument("--sims", type=int, default=DEFAULT_SIMULATIONS, help="Simulated seasons")
+    parser.add_argument("--model", choices=MODELS, default="poisson", help="Match model")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--precompute", action="store_true", help="Store projections for the server")
+    parser.add_argument("--all-matchdays", action="store_true",
+                        help="With --precompute, also every earlier matchday of the season")
+    args = parser.parse_args()
+
+    simulator = SeasonSimulator(n_workers=args.workers)
+    if args.precompute:
+        leagues = [args.league] if args.league else None
+        done = simulator.precompute(leagues, args.season, args.as_of, args.all_matchdays, args.sims, args.model)
+        print(f"✅ {done} season projections stored")
+        return
+    if not args.league:
+        parser.error("league is required without --precompute")
+    projection = simulator.project(args.league, args.season, args.as_of, args.sims, args.model)
+    if projection is None:
+        print(f"❌ No cached schedule for {args.league}")
+        return
+    pd.set_option("display.width", 160)
+    print(projection.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
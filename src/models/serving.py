@@ -0,0 +1,187 @@
+"""
+Request-path serving for the baseline ML models.
+
+The ensemble is loaded once per process (in a background thread at server
+start) from the latest version in the ``ModelRegistry``. Serving never
+trains: versions are published by ``python -m src.models.refresh``, and
+until one matches the current feature definition the baseline prior is
+simply left out. ``reload`` swaps in a version published later by a refresh; a
+background check calls it every BASELINE_RELOAD_INTERVAL seconds (default
+300, 0 disables).
+Fixtures are scored with features assembled from the in-memory data indexes,
+either one at a time (``predict``) or coalesced across concurrent requests
+by a ``MicroBatcher`` (``predict_async``).
+"""
+
+import asyncio
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.data.feature_store import FEATURE_COLUMNS, FeatureStore, feature_store, feature_version
+from src.models.baseline import BaselinePredictor
+from src.models.batching import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, MicroBatcher
+from src.models.registry import MODEL_DIR, ModelRegistry
+
+MAX_BATCH_SIZE = int(os.getenv("BASELINE_MAX_BATCH_SIZE", DEFAULT_MAX_BATCH_SIZE))
+MAX_WAIT_MS = float(os.getenv("BASELINE_MAX_WAIT_MS", DEFAULT_MAX_WAIT_MS))
+RELOAD_INTERVAL = float(os.getenv("BASELINE_RELOAD_INTERVAL", 300))
+
+
+class BaselineService:
+    """
+    Preloaded ``BaselinePredictor`` answering one fixture at a time.
+    """
+
+    def __init__(self, store: FeatureStore = feature_store, model_type: str = 'ensemble',
+                 model_dir: Path = MODEL_DIR, max_batch_size: int = MAX_BATCH_SIZE,
+                 max_wait_ms: float = MAX_WAIT_MS, reload_interval: float = RELOAD_INTERVAL):
+        self.store = store
+        self.model_type = model_type
+        self.registry = ModelRegistry(Path(model_dir))
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.reload_interval = reload_interval
+        self.model: Optional[BaselinePredictor] = None
+        self.version: Optional[str] = None
+        self.batcher: Optional[MicroBatcher] = None
+        self._features = np.empty(len(FEATURE_COLUMNS), dtype=np.float32)
+        self._lock = threading.Lock()
+        self._loading: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self.model is not None
+
+    def _artifact_matches(self) -> bool:
+        manifest = self.registry.manifest()
+        return bool(manifest) and manifest.get('feature_version') == feature_version() \
+            and manifest.get('model_type') == self.model_type
+
+    def load(self) -> bool:
+        """Load the registry's latest ensemble and prepare the fast path."""
+        with self._lock:
+            if self.model is not None:
+                return True
+            try:
+                if not self._artifact_matches():
+                    print("⚠️  No baseline model for the current features; "
+                          "publish one with `python -m src.models.refresh`")
+                    return False
+                start = time.time()
+                model = self.registry.load()
+                self._activate(model, self.registry.latest())
+                print(f"✅ Baseline model loaded ({self.version}, "
+                      f"{model.training_info.get('n_samples')} matches, {time.time() - start:.1f}s)")
+                return True
+            except Exception as e:
+                print(f"⚠️  Baseline model unavailable: {str(e)}")
+                return False
+
+    def reload(self) -> bool:
+        """Swap in the registry's latest version if it is newer than the one being served."""
+        latest = self.registry.latest()
+        if latest is None or latest == self.version or not self._artifact_matches():
+            return False
+        try:
+            model = self.registry.load(latest)
+            with self._lock:
+                self._activate(model, latest)
+            print(f"✅ Baseline model reloaded ({latest})")
+            return True
+        except Exception as e:
+            print(f"⚠️  Baseline reload failed: {str(e)}")
+            return False
+
+    def _activate(self, model: BaselinePredictor, version: Optional[str]):
+        model.prepare_fast_inference()
+        self.store.prepare_online()
+        previous = self.batcher
+        self.batcher = MicroBatcher(model.predict_proba_array, len(FEATURE_COLUMNS),
+                                    self.max_batch_size, self.max_wait_ms)
+        self.model = model
+        self.version = version
+        if previous is not None:
+            previous.close()  # scores what is already queued, then its thread exits
+
+    def warm_up(self):
+        """Start loading in a background thread so server start is not blocked."""
+        if self._loading is None and self.model is None:
+            self._loading = threading.Thread(target=self._serve, name="baseline-warm-up", daemon=True)
+            self._loading.start()
+
+    def _serve(self):
+        """
+        Initial load, then pick up newly published versions every
+        ``reload_interval`` seconds (including the first one, if there was none).
+        """
+        self.load()
+        while self.reload_interval > 0 and not self._stop.wait(self.reload_interval):
+            if self.model is None:
+                self.load()
+            else:
+                self.reload()
+
+    def shutdown(self):
+        """Stop the reload check and the batch worker."""
+        self._stop.set()
+        if self.batcher is not None:
+            self.batcher.close()
+
+    def predict(self, home_team: str, away_team: str, match_date=None) -> Optional[Dict[str, float]]:
+        """
+        Baseline outcome probabilities for a fixture.
+
+        Args:
+            home_team: Home team name
+            away_team: Away team name
+            match_date: Kickoff date; defaults to today
+
+        Returns:
+            Dictionary with home_win/draw/away_win, or None if the model is
+            not loaded yet or the prediction failed
+        """
+        if self.model is None:
+            return None
+        try:
+            with self._lock:
+                features = self.store.match_features(home_team, away_team, match_date, out=self._features)
+                proba = self.model.predict_proba_fast(features)
+            return self._as_dict(proba)
+        except Exception as e:
+            print(f"⚠️  Baseline prediction failed: {str(e)}")
+            return None
+
+    async def predict_async(self, home_team: str, away_team: str, match_date=None) -> Optional[Dict[str, float]]:
+        """
+        Like ``predict``, but the model call joins a micro-batch with other
+        concurrent requests.
+        """
+        if self.model is None:
+            return None
+        try:
+            # Feature assembly is blocking; keep it off the event loop so concurrent
+            # requests reach the batcher together
+            features = await asyncio.to_thread(self.store.match_features, home_team, away_team, match_date)
+            proba = await self.batcher.predict_async(features)
+            return self._as_dict(proba)
+        except Exception as e:
+            print(f"⚠️  Baseline prediction failed: {str(e)}")
+            return None
+
+    @staticmethod
+    def _as_dict(proba: np.ndarray) -> Dict[str, float]:
+        return {
+            "home_win": round(float(proba[0]), 4),
+            "draw": round(float(proba[1]), 4),
+            "away_win": round(float(proba[2]), 4),
+        }
+
+
+# --- INSTANTIATE ---
+baseline_service = BaselineService()
@@ -0,0 +1,180 @@
+"""
+Training driver for the baseline models.
+
+Rolling-origin (expanding window) time-series cross-validation over the
+point-in-time feature store: each fold trains on every season before a test
+season and evaluates on that season, so no fold ever sees the future. Folds
+and hyperparameter combinations are independent, so they are fanned out over
+a process pool with the per-model thread count split across workers.
+
+Usage:
+    python -m src.models.training            # research grid, all CPUs
+    python -m src.models.training --quick    # default parameters only
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, log_loss
+from sklearn.model_selection import ParameterGrid
+
+from src.data.feature_store import FEATURE_COLUMNS, feature_store
+from src.models.baseline import BaselinePredictor
+
+# Small research sweep; keys are routed to XGBoost (xgb__) or LightGBM (lgb__)
+RESEARCH_GRID = {
+    "xgb__max_depth": [4, 7],
+    "xgb__learning_rate": [0.05, 0.1],
+    "lgb__num_leaves": [31, 63],
+}
+
+
+def rolling_origin_splits(groups: Sequence[str], n_folds: Optional[int] = None,
+                          min_train_groups: int = 1) -> List[Tuple[np.ndarray, np.ndarray, str]]:
+    """
+    Expanding-window splits over ordered groups (e.g. season keys).
+
+    Args:
+        groups: Group label per row, rows in chronological order
+        n_folds: Use only the last N test groups (all eligible if None)
+        min_train_groups: Groups that must precede the first test group
+
+    Returns:
+        List of (train_idx, test_idx, test_group)
+    """
+    groups = np.asarray(groups)
+    order = list(dict.fromkeys(groups))
+    test_groups = order[min_train_groups:]
+    if n_folds:
+        test_groups = test_groups[-n_folds:]
+
+    splits = []
+    for test_group in test_groups:
+        position = order.index(test_group)
+        train_mask = np.isin(groups, order[:position])
+        test_mask = groups == test_group
+        splits.append((np.flatnonzero(train_mask), np.flatnonzero(test_mask), str(test_group)))
+    return splits
+
+
+def _split_params(params: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    xgb_params = {k[len("xgb__"):]: v for k, v in params.items() if k.startswith("xgb__")}
+    lgb_params = {k[len("lgb__"):]: v for k, v in params.items() if k.startswith("lgb__")}
+    return xgb_params, lgb_params
+
+
+def _fit_fold(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Train and score one (parameter set, fold) pair. Runs in a worker process."""
+    X, y = task["X"], task["y"]
+    train_idx, test_idx = task["train_idx"], task["test_idx"]
+    xgb_params, lgb_params = _split_params(task["params"])
+
+    start = time.time()
+    model = BaselinePredictor(model_type=task["model_type"], xgb_params=xgb_params,
+                              lgb_params=lgb_params, n_jobs=task["n_jobs"])
+    train_metrics = model.train(X.iloc[train_idx], y[train_idx],
+                                validation_split=task["validation_split"], shuffle=False)
+
+    proba = model.predict_proba(X.iloc[test_idx])
+    y_test = y[test_idx]
+    onehot = np.eye(3)[y_test]
+    return {
+        "params_id": task["params_id"],
+        "params": task["params"],
+        "test_season": task["test_group"],
+        "n_train": len(train_idx),
+        "n_test": len(test_idx),
+        "log_loss": log_loss(y_test, proba, labels=[0, 1, 2]),
+        "accuracy": accuracy_score(y_test, proba.argmax(axis=1)),
+        "brier": float(np.mean(np.sum((proba - onehot) ** 2, axis=1))),
+        "xgboost_best_iteration": train_metrics.get("xgboost_best_iteration"),
+        "lightgbm_best_iteration": train_metrics.get("lightgbm_best_iteration"),
+        "seconds": round(time.time() - start, 2),
+    }
+
+
+def cross_validate(X: pd.DataFrame, y: np.ndarray, groups: Sequence[str],
+                   param_grid: Optional[Dict[str, List[Any]]] = None, n_folds: Optional[int] = None,
+                   model_type: str = "ensemble", validation_split: float = 0.15,
+                   n_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Rolling-origin CV for every parameter combination, in parallel.
+
+    Args:
+        X: Feature frame in chronological order
+        y: Targets (0 home, 1 draw, 2 away)
+        groups: Season key per row; each later season is one test fold
+        param_grid: Grid of ``xgb__*`` / ``lgb__*`` overrides (defaults only if None)
+        n_folds: Limit to the last N seasons as test folds
+        model_type: 'xgboost', 'lightgbm' or 'ensemble'
+        validation_split: Tail of each training window used for early stopping
+        n_workers: Worker processes (all CPUs if None)
+
+    Returns:
+        One row per (parameter set, fold) with log loss, accuracy, Brier
+        score and best iterations
+    """
+    combos = list(ParameterGrid(param_grid)) if param_grid else [{}]
+    splits = rolling_origin_splits(groups, n_folds)
+    n_tasks = len(combos) * len(splits)
+    cpus = os.cpu_count() or 1
+    n_workers = min(n_workers or cpus, n_tasks)
+    threads_per_model = max(1, cpus // n_workers)
+
+    tasks = [
+        {
+            "X": X, "y": y, "train_idx": train_idx, "test_idx": test_idx, "test_group": test_group,
+            "params": params, "params_id": i, "model_type": model_type,
+            "validation_split": validation_split, "n_jobs": threads_per_model,
+        }
+        for i, params in enumerate(combos)
+        for train_idx, test_idx, test_group in splits
+    ]
+
+    print(f"🧪 {len(combos)} parameter sets x {len(splits)} folds on {n_workers} workers "
+          f"({threads_per_model} threads each)")
+    if n_workers == 1:
+        results = [_fit_fold(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_fit_fold, tasks))
+    return pd.DataFrame(results)
+
+
+def summarize(results: pd.DataFrame) -> pd.DataFrame:
+    """Mean and standard deviation of the fold metrics per parameter set, best first."""
+    summary = results.groupby("params_id").agg(
+        log_loss=("log_loss", "mean"), log_loss_std=("log_loss", "std"),
+        accuracy=("accuracy", "mean"), brier=("brier", "mean"), folds=("log_loss", "size"),
+    )
+    summary["params"] = results.groupby("params_id")["params"].first()
+    return summary.sort_values("log_loss")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling-origin CV for the baseline models")
+    parser.add_argument("--quick", action="store_true", help="Default parameters only")
+    parser.add_argument("--folds", type=int, default=None, help="Last N seasons as test folds")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    args = parser.parse_args()
+
+    frame = feature_store.training_frame()
+    X = frame[FEATURE_COLUMNS].reset_index(drop=True)
+    y = frame["target"].to_numpy(dtype=np.int64)
+
+    start = time.time()
+    results = cross_validate(X, y, frame["season"].to_numpy(), None if args.quick else RESEARCH_GRID,
+                             n_folds=args.folds, n_workers=args.workers)
+    pd.set_option("display.width", 160)
+    print(results.drop(columns=["params"]).to_string(index=False))
+    print(summarize(results).to_string())
+    print(f"⏱️  {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Tests for the baseline ensemble's serving paths (src/models/baseline.py)
+"""
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.baseline import BaselinePredictor
+from src.models.registry import ModelRegistry
+from src.models.serving import BaselineService
+
+N_FEATURES = 8
+
+
+def _data(n=800, seed=3):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, N_FEATURES)).astype(np.float32),
+                     columns=[f"f{i}" for i in range(N_FEATURES)])
+    X.iloc[rng.random(n) < 0.05, 2] = np.nan  # missing values reach the boosters as NaN
+    score = X["f0"] - X["f1"] + rng.normal(scale=1.0, size=n)
+    y = np.where(score > 0.5, 0, np.where(score < -0.5, 2, 1))
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def trained():
+    X, y = _data()
+    predictor = BaselinePredictor(xgb_params={"n_estimators": 60}, lgb_params={"n_estimators": 60}, n_jobs=1)
+    predictor.train(X, y, shuffle=False)
+    return predictor, X
+
+
+def test_fast_paths_match_predict_proba(trained):
+    predictor, X = trained
+    reference = predictor.predict_proba(X)
+    batched = predictor.predict_proba_array(X.to_numpy())
+    single = np.stack([predictor.predict_proba_fast(row) for row in X.to_numpy()[:200]])
+
+    assert batched.shape == (len(X), 3)
+    np.testing.assert_allclose(batched.sum(axis=1), 1.0, atol=1e-6)
+    # float32 scaling can differ from the scaler by an ulp, which may flip a split for a
+    # value sitting exactly on a threshold; nearly every row must agree to float precision
+    close = np.isclose(batched, reference, atol=1e-5).all(axis=1)
+    assert close.mean() > 0.99
+    np.testing.assert_allclose(single, batched[:200], atol=1e-6)
+
+
+@pytest.mark.parametrize("model_type", ["xgboost", "lightgbm"])
+def test_fast_paths_for_single_models(model_type):
+    X, y = _data(400)
+    predictor = BaselinePredictor(model_type=model_type, xgb_params={"n_estimators": 30},
+                                  lgb_params={"n_estimators": 30}, n_jobs=1)
+    predictor.train(X, y, shuffle=False)
+    close = np.isclose(predictor.predict_proba_array(X.to_numpy()), predictor.predict_proba(X), atol=1e-5)
+    assert close.all(axis=1).mean() > 0.99
+
+
+def test_save_load_round_trip(trained):
+    predictor, X = trained
+    path = predictor.save(Path(tempfile.mkdtemp()) / "model", metadata={"feature_version": "test"})
+    loaded = BaselinePredictor.load(path)
+
+    assert loaded.feature_names == predictor.feature_names
+    assert loaded.training_info["metrics"] == predictor.training_info["metrics"]
+    assert BaselinePredictor.read_manifest(path)["feature_version"] == "test"
+    np.testing.assert_allclose(loaded.predict_proba(X), predictor.predict_proba(X), atol=1e-6)
+    np.testing.assert_allclose(loaded.predict_proba_array(X.to_numpy()), predictor.predict_proba_array(X.to_numpy()),
+                               atol=1e-6)
+
+
+def test_updated_model_round_trip():
+    X, y = _data(500)
+    predictor = BaselinePredictor(xgb_params={"n_estimators": 30}, lgb_params={"n_estimators": 30}, n_jobs=1)
+    predictor.train(X, y, shuffle=False)
+    X_new, y_new = _data(60, seed=11)
+    predictor.update(X_new, y_new, n_rounds=5)  # native boosters from here on
+
+    loaded = BaselinePredictor.load(predictor.save(Path(tempfile.mkdtemp()) / "model"))
+    np.testing.assert_allclose(loaded.predict_proba(X_new), predictor.predict_proba(X_new), atol=1e-6)
+    assert len(loaded.training_info["updates"]) == 1
+
+
+def test_service_loads_published_versions_and_never_trains(trained, monkeypatch):
+    predictor, X = trained
+    monkeypatch.setattr("src.models.serving.feature_version", lambda: "test")
+    root = Path(tempfile.mkdtemp())
+
+    service = BaselineService(model_dir=root, reload_interval=0)
+    assert not service.load()  # nothing published: no prior, and no training either
+    assert ModelRegistry(root).versions() == []
+
+    version = ModelRegistry(root).publish(predictor, {"feature_version": "test"})
+    monkeypatch.setattr(service.store, "prepare_online", lambda: None)
+    assert service.load() and service.version == version
+    np.testing.assert_allclose(service.model.predict_proba_fast(X.to_numpy()[0]), predictor.predict_proba(X)[0],
+                               atol=1e-6)
+    service.shutdown()
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,82 @@
+"""
+Batch precompute must build the same agent prompts as the analysis endpoint,
+otherwise its cached replies are never hit (w5_engine/batch_precompute.py)
+"""
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.data.loader import agent_data_packet, real_data_loader
+from w5_engine.batch_precompute import BatchPrecompute, endpoint_request
+from w5_engine.response_cache import ResponseCache
+
+
+def fake_match_context(home_team, away_team, *args, **kwargs):
+    """Loader stand-in whose output depends on every argument, like the real one."""
+    return {
+        "home_team": home_team,
+        "away_team": away_team,
+        "quantitative_features": {"h2h_overall_games": 12, "league_leader_points": 50,
+                                  "home_form": f"form-{home_team}-{kwargs.get('match_date')}"},
+        "qualitative_context": {"home_venue": f"venue-{kwargs.get('home_team_id')}",
+                                "away_venue": f"venue-{kwargs.get('away_team_id')}",
+                                "weather": f"weather-{kwargs.get('event_id')}-{kwargs.get('league_id')}"},
+    }
+
+
+@pytest.fixture
+def precompute(monkeypatch):
+    monkeypatch.setattr(real_data_loader, "fetch_full_match_context", fake_match_context)
+    root = Path(tempfile.mkdtemp())
+    return BatchPrecompute(backend="file", cache=ResponseCache(root / "cache.sqlite3"), root=root)
+
+
+def live_keys(precompute, request):
+    """Cache keys of the endpoint's agents for a MatchRequest (mirrors main.run_consensus)."""
+    match_context = real_data_loader.fetch_full_match_context(
+        home_team=request["home_team_name"],
+        away_team=request["away_team_name"],
+        event_id=request["event_id"],
+        league_id=request["league_id"],
+        home_team_id=request["home_team_id"],
+        away_team_id=request["away_team_id"],
+        match_date=request["match_date"],
+    )
+    packet = agent_data_packet(request["home_team_name"], request["away_team_name"], match_context)
+    enriched = precompute.engine.prepare_match_data(packet)
+    return {agent.build_request(enriched)[0] for agent in precompute.agents}
+
+
+def test_endpoint_request_uses_catalog_and_team_ids():
+    row = pd.Series({"league": "ENG-Premier League", "season": "2324", "date": pd.Timestamp("2024-03-02"),
+                     "home_team": "Arsenal", "away_team": "Manchester Utd"})
+    assert endpoint_request(row) == {
+        "home_team": "Arsenal", "away_team": "Manchester Utd", "event_id": None, "league_id": 39,
+        "home_team_id": 42, "away_team_id": 33, "match_date": "2024-03-02",
+    }
+
+
+def test_precomputed_keys_equal_live_keys(precompute):
+    if not precompute.agents:
+        pytest.skip("no LLM agents configured")
+    fixtures = pd.DataFrame([{
+        "league": "ENG-Premier League", "season": "2324", "date": pd.Timestamp("2024-03-02"),
+        "home_team": "Arsenal", "away_team": "Chelsea", "event_id": 4506000,
+    }])
+    live = live_keys(precompute, {
+        "event_id": 4506000, "home_team_id": 42, "away_team_id": 49, "league_id": 39,
+        "home_team_name": "Arsenal", "away_team_name": "Chelsea", "match_date": "2024-03-02",
+    })
+    precomputed = {r["custom_id"] for r in precompute.build_requests(fixtures)}
+    assert precomputed == live
+
+    # A different event (or any other argument) changes the keys
+    other = fixtures.assign(event_id=4506001)
+    assert not {r["custom_id"] for r in precompute.build_requests(other)} & live
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,130 @@
+"""
+Tests for the compressed, content-addressed page store (src/data/cache_store.py)
+"""
+import tempfile
+from pathlib import Path
+
+import pytest
+
+import src.data.cache_store as cache_store_module
+from src.data.cache_store import DICT_MIN_SAMPLES, CacheStore
+
+
+def _page(i: int) -> bytes:
+    rows = "".join(f"<tr><td>Team {i}-{j}</td><td>{(i * 7 + j) % 31}</td></tr>" for j in range(40))
+    return (f"<html><head><title>Schedule {i}</title></head><body><table id=\"sched_{i}\">"
+            f"{rows}</table></body></html>").encode("utf-8")
+
+
+def _store(pages: int) -> CacheStore:
+    root = Path(tempfile.mkdtemp())
+    for i in range(pages):
+        (root / f"schedule_{i}.html").write_bytes(_page(i))
+    return CacheStore(root)
+
+
+def _objects(store: CacheStore):
+    return sorted(p.name for p in (store.store_dir / "objects").glob("*/*"))
+
+
+@pytest.fixture
+def no_zstd(monkeypatch):
+    monkeypatch.setattr(cache_store_module, "zstd", None)
+
+
+def test_pack_read_round_trip_with_dictionary():
+    pytest.importorskip("zstandard")
+    store = _store(DICT_MIN_SAMPLES + 4)
+    stats = store.pack()
+    assert stats["packed_files"] == DICT_MIN_SAMPLES + 4
+    assert not list(store.root.glob("*.html"))  # originals removed
+
+    index = store._load_index()
+    assert index["active_dict"] is not None
+    assert all(e["codec"] == "zstd" and e["dict"] == index["active_dict"] for e in index["files"].values())
+
+    # A fresh instance (another process) reads the packed pages back unchanged
+    reader = CacheStore(store.root)
+    for i in range(DICT_MIN_SAMPLES + 4):
+        assert reader.read_bytes(f"schedule_{i}.html") == _page(i)
+    assert reader.exists("schedule_0.html") and not reader.exists("missing.html")
+    assert reader.names("schedule_1*.html") == ["schedule_1.html", "schedule_10.html", "schedule_11.html"]
+    with pytest.raises(FileNotFoundError):
+        reader.read_bytes("missing.html")
+
+
+def test_few_pages_are_packed_without_a_dictionary():
+    pytest.importorskip("zstandard")
+    store = _store(DICT_MIN_SAMPLES - 1)
+    store.pack(remove_originals=False)
+    entries = store._load_index()["files"].values()
+    assert all(e["codec"] == "zstd" and e["dict"] is None for e in entries)
+    assert store.read_bytes("schedule_0.html") == _page(0)
+
+
+def test_gzip_fallback_without_zstandard(no_zstd):
+    store = _store(DICT_MIN_SAMPLES + 2)
+    store.pack()
+    index = store._load_index()
+    assert index["active_dict"] is None
+    assert {e["codec"] for e in index["files"].values()} == {"gzip"}
+    assert CacheStore(store.root).read_bytes("schedule_3.html") == _page(3)
+
+
+def test_plain_file_wins_and_duplicates_share_a_blob(no_zstd):
+    store = _store(2)
+    (store.root / "copy.html").write_bytes(_page(0))
+    store.pack(remove_originals=False)
+    assert len(_objects(store)) == 2
+    assert store.stats()["unique_blobs"] == 2
+
+    (store.root / "schedule_0.html").write_bytes(b"fresh download")
+    assert store.read_bytes("schedule_0.html") == b"fresh download"
+
+
+def test_existing_object_compressed_differently_is_not_reused(monkeypatch):
+    pytest.importorskip("zstandard")
+    store = _store(0)
+    monkeypatch.setattr(cache_store_module, "zstd", None)
+    store.write_bytes("a.html", _page(1))
+    store.write_bytes("a.html", _page(2))  # the gzip blob of page 1 stays on disk, unreferenced
+    monkeypatch.undo()
+
+    entry = store.write_bytes("b.html", _page(1))
+    assert entry["codec"] == "zstd"
+    assert store.read_bytes("b.html") == _page(1)
+    assert store.read_bytes("a.html") == _page(2)
+
+
+def test_materialize_restores_plain_files(no_zstd):
+    store = _store(3)
+    store.pack()
+    (store.root / "schedule_1.html").write_bytes(b"newer")
+    assert store.materialize(["schedule_0.html", "schedule_1.html", "missing.html"]) == 1
+    assert (store.root / "schedule_0.html").read_bytes() == _page(0)
+    assert (store.root / "schedule_1.html").read_bytes() == b"newer"  # plain files are never overwritten
+    assert not (store.root / "missing.html").exists()
+
+
+def test_gc_drops_unreferenced_blobs_and_dictionaries():
+    pytest.importorskip("zstandard")
+    store = _store(DICT_MIN_SAMPLES + 2)
+    store.pack()
+    first_dict = store._load_index()["active_dict"]
+    before = set(_objects(store))
+
+    # Every page re-downloaded with new content and packed with a new dictionary
+    for i in range(DICT_MIN_SAMPLES + 2):
+        (store.root / f"schedule_{i}.html").write_bytes(_page(i + 100))
+    store.pack(train_dict=True)
+    index = store._load_index()
+    assert index["active_dict"] != first_dict
+    assert not before & set(_objects(store))
+    assert len(_objects(store)) == DICT_MIN_SAMPLES + 2
+    assert [p.name for p in (store.store_dir / "dicts").glob("*")] == [index["active_dict"]]
+    assert store.read_bytes("schedule_0.html") == _page(100)
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,90 @@
+"""
+Tests for the debate rebuttal rounds and their stop conditions (w5_engine/debate.py)
+"""
+import asyncio
+
+from w5_engine.debate import ConsensusEngine
+
+
+def _position(home, draw, away, reasoning="form"):
+    return {"home_win": home, "draw": draw, "away_win": away, "confidence": 0.6, "reasoning": reasoning}
+
+
+class ScriptedAgent:
+    """Stands in for an LLMAgent: replies to each debate round with the next scripted position."""
+
+    def __init__(self, persona, provider, revisions=()):
+        self.persona = persona
+        self.provider = provider
+        self.revisions = list(revisions)
+        self.calls = 0
+
+    async def debate_async(self, match_data, turns):
+        self.calls += 1
+        return dict(self.revisions.pop(0)) if self.revisions else None
+
+
+def _debate(agents, openings, rounds=4):
+    engine = ConsensusEngine(debate_rounds=rounds)
+    engine.agents = agents
+    results = [dict(res, agent=agent.persona) for agent, res in zip(agents, openings)]
+    return asyncio.run(engine._debate_async({"home_team": "Arsenal", "away_team": "Chelsea"}, results))
+
+
+def test_agents_that_agree_stop_before_any_rebuttal():
+    agents = [ScriptedAgent("statistician", "deterministic"), ScriptedAgent("tactician", "openai")]
+    _, debate = _debate(agents, [_position(0.5, 0.3, 0.2), _position(0.55, 0.25, 0.2)])
+    assert debate == {"rounds": 1, "stop_reason": "converged"}
+    assert agents[1].calls == 0
+
+
+def test_zero_probabilities_count_towards_convergence():
+    # A confident 0.0 is a real probability, not a missing one
+    agents = [ScriptedAgent("statistician", "deterministic"), ScriptedAgent("tactician", "openai")]
+    _, debate = _debate(agents, [_position(0.9, 0.05, 0.05), _position(0.9, 0.1, 0.0)])
+    assert debate["stop_reason"] == "converged"
+
+
+def test_converging_after_a_rebuttal_round():
+    agents = [ScriptedAgent("statistician", "deterministic"),
+              ScriptedAgent("tactician", "openai", [_position(0.52, 0.28, 0.2)])]
+    results, debate = _debate(agents, [_position(0.5, 0.3, 0.2), _position(0.8, 0.1, 0.1)])
+    assert debate == {"rounds": 2, "stop_reason": "converged"}
+    assert results[1]["home_win"] == 0.52 and results[1]["agent"] == "tactician"
+
+
+def test_positions_that_stop_moving_are_settled():
+    agents = [ScriptedAgent("statistician", "deterministic"),
+              ScriptedAgent("tactician", "openai", [_position(0.79, 0.11, 0.1), _position(0.5, 0.3, 0.2)])]
+    _, debate = _debate(agents, [_position(0.4, 0.3, 0.3), _position(0.8, 0.1, 0.1)])
+    assert debate == {"rounds": 2, "stop_reason": "settled"}
+    assert agents[1].calls == 1
+
+
+def test_fallback_agents_sit_out_the_spread():
+    # The sentiment analyst fell back to the data-only path far from the others; it does not
+    # debate, and it does not keep the debaters from converging
+    agents = [ScriptedAgent("statistician", "deterministic"), ScriptedAgent("tactician", "openai"),
+              ScriptedAgent("sentiment_analyst", "anthropic")]
+    fallback = _position(0.1, 0.1, 0.8, reasoning="LLM unavailable, data-only fallback. h2h")
+    _, debate = _debate(agents, [_position(0.5, 0.3, 0.2), _position(0.52, 0.28, 0.2), fallback])
+    assert debate["stop_reason"] == "converged"
+    assert agents[2].calls == 0
+
+
+def test_round_limit_and_no_debaters():
+    agents = [ScriptedAgent("statistician", "deterministic"),
+              ScriptedAgent("tactician", "openai", [_position(0.7, 0.2, 0.1)])]
+    _, debate = _debate(agents, [_position(0.3, 0.3, 0.4), _position(0.9, 0.05, 0.05)], rounds=2)
+    assert debate == {"rounds": 2, "stop_reason": "max_rounds"}
+
+    parse_error = _position(0.33, 0.34, 0.33, reasoning="JSON Parse Error")
+    _, debate = _debate(agents, [_position(0.3, 0.3, 0.4), parse_error])
+    assert debate == {"rounds": 1, "stop_reason": "no_debaters"}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
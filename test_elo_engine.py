@@ -0,0 +1,124 @@
+"""
+Tests for the array-backed ELO engine and its as-of-date history (src/models/elo.py)
+"""
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.elo import EloEngine, EloHistory
+
+
+def sequential_elo(home_teams, away_teams, results, k=32.0, home_advantage=100.0, initial=1500.0):
+    """Textbook one-match-at-a-time ELO over a dict, the reference for the layered replay."""
+    ratings, home_pre, away_pre = {}, [], []
+    for home, away, result in zip(home_teams, away_teams, results):
+        rh, ra = ratings.get(home, initial), ratings.get(away, initial)
+        home_pre.append(rh)
+        away_pre.append(ra)
+        expected = 1.0 / (1.0 + 10.0 ** ((ra - rh - home_advantage) / 400.0))
+        delta = k * ((1.0, 0.5, 0.0)[result] - expected)
+        ratings[home], ratings[away] = rh + delta, ra - delta
+    return np.array(home_pre), np.array(away_pre), ratings
+
+
+def _random_matches(n=600, teams=24, seed=7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    home = rng.integers(0, teams, n)
+    away = (home + rng.integers(1, teams, n)) % teams
+    return pd.DataFrame({
+        "date": pd.Timestamp("2020-08-01") + pd.to_timedelta(np.sort(rng.integers(0, 900, n)), unit="D"),
+        "home_team": [f"Team {i}" for i in home],
+        "away_team": [f"Team {i}" for i in away],
+        "target": rng.integers(0, 3, n),
+    })
+
+
+def _cached_matches() -> pd.DataFrame:
+    from src.data.feature_store import feature_store
+    try:
+        frame = feature_store.training_frame()
+    except Exception as e:
+        pytest.skip(f"feature store unavailable: {e}")
+    if frame.empty:
+        pytest.skip("no cached fixtures")
+    return frame.sort_values("date", kind="stable")
+
+
+def _assert_matches_sequential(matches: pd.DataFrame):
+    engine = EloEngine()
+    home_pre, away_pre = engine.replay(matches["home_team"], matches["away_team"], matches["target"])
+    ref_home, ref_away, ref_ratings = sequential_elo(matches["home_team"], matches["away_team"],
+                                                     matches["target"].astype(int))
+    np.testing.assert_allclose(home_pre, ref_home, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(away_pre, ref_away, rtol=0, atol=1e-9)
+    final = engine.ratings()
+    assert final.keys() == ref_ratings.keys()
+    np.testing.assert_allclose([final[t] for t in ref_ratings], list(ref_ratings.values()), rtol=0, atol=1e-9)
+
+
+def test_layered_replay_matches_sequential_loop():
+    _assert_matches_sequential(_random_matches())
+
+
+def test_layered_replay_matches_sequential_loop_on_cached_fixtures():
+    _assert_matches_sequential(_cached_matches())
+
+
+def test_incremental_updates_continue_a_replay():
+    matches = _random_matches(200)
+    engine = EloEngine()
+    engine.replay(matches["home_team"][:150], matches["away_team"][:150], matches["target"][:150])
+    for row in matches.iloc[150:].itertuples():
+        engine.update(row.home_team, row.away_team, int(row.target))
+    _, _, ref = sequential_elo(matches["home_team"], matches["away_team"], matches["target"].astype(int))
+    assert engine.rating("Team 3") == pytest.approx(ref["Team 3"])
+    assert engine.rating("Unseen FC") == 1500.0
+
+
+def _history(matches: pd.DataFrame, every: int) -> EloHistory:
+    return EloEngine().replay_history(matches["date"], matches["home_team"], matches["away_team"],
+                                      matches["target"], checkpoint_every=every)
+
+
+@pytest.mark.parametrize("every", [1, 7, 64, 10000])
+def test_history_rebuilds_ratings_from_checkpoints_and_deltas(every):
+    matches = _random_matches(400)
+    history = _history(matches, every)
+    assert len(history) == 400
+    assert len(history.checkpoints) == 400 // every + 1
+
+    for as_of in pd.to_datetime(["2020-07-01", "2020-08-01", "2021-03-15", "2021-11-02", "2030-01-01"]):
+        before = matches[matches["date"] < as_of]  # matches on the day itself excluded
+        _, _, ref = sequential_elo(before["home_team"], before["away_team"], before["target"].astype(int))
+        ratings = history.ratings_dict(as_of)
+        for team in ("Team 0", "Team 5", "Team 23"):
+            expected = ref.get(team, 1500.0)
+            assert ratings[team] == pytest.approx(expected, abs=1e-9)
+            assert history.rating(team, as_of) == pytest.approx(expected, abs=1e-9)
+    assert history.rating("Unseen FC", "2021-01-01") is None
+
+
+def test_history_save_load_round_trip_is_memory_mapped():
+    matches = _random_matches(300)
+    history = _history(matches, 32)
+    path = history.save(Path(tempfile.mkdtemp()) / "elo_history")
+    loaded = EloHistory.load(path)
+
+    assert isinstance(loaded.deltas, np.memmap) and isinstance(loaded.checkpoints, np.memmap)
+    assert loaded.teams == history.teams and loaded.checkpoint_every == 32
+    for as_of in ("2020-09-01", "2021-06-30", "2023-01-01"):
+        np.testing.assert_array_equal(loaded.ratings_as_of(as_of), history.ratings_as_of(as_of))
+    assert EloHistory.load(path, mmap=False).rating("Team 1", "2021-06-30") == history.rating("Team 1", "2021-06-30")
+
+    # Missing directories and other format versions are not loaded
+    assert EloHistory.load(path.with_name("missing")) is None
+    (path / "meta.json").write_text('{"format_version": -1}', encoding="utf-8")
+    assert EloHistory.load(path) is None
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
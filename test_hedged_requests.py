@@ -0,0 +1,99 @@
+"""
+Tests for hedged LLM requests: soft-deadline hedge, failover, hard deadline
+and cancellation (w5_engine/providers.py)
+"""
+import asyncio
+
+from w5_engine.providers import ProviderPool, RequestPolicy
+
+VALID = '{"home_win": 0.5, "draw": 0.3, "away_win": 0.2}'
+ROUTES = [("anthropic", "claude"), ("google", "gemini")]
+
+
+class FakeRoutes:
+    """``complete`` stand-in; each provider is (delay in seconds, reply or exception)."""
+
+    def __init__(self, **behaviour):
+        self.behaviour = behaviour
+        self.started, self.cancelled = [], []
+
+    async def complete(self, provider, model, system, user, **kwargs):
+        delay, outcome = self.behaviour[provider]
+        self.started.append((provider, asyncio.get_running_loop().time()))
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(provider)
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _hedged(fake, soft=0.05, hard=0.5, validate=lambda text: text.startswith("{")):
+    pool = ProviderPool()
+    pool.complete = fake.complete
+    policy = RequestPolicy("openai", "gpt", soft_deadline=soft, hard_deadline=hard, alternates=ROUTES)
+
+    async def main():
+        start = asyncio.get_running_loop().time()
+        text = await pool.hedged("system", "user", policy, validate=validate)
+        await asyncio.sleep(0)  # let cancelled tasks unwind
+        return text, asyncio.get_running_loop().time() - start
+
+    text, elapsed = asyncio.run(main())
+    return text, elapsed, pool.stats()
+
+
+def test_fast_primary_needs_no_hedge():
+    fake = FakeRoutes(openai=(0.0, VALID), anthropic=(0.0, VALID), google=(0.0, VALID))
+    text, _, stats = _hedged(fake)
+    assert text == VALID
+    assert [p for p, _ in fake.started] == ["openai"]
+    assert stats["hedges"] == stats["alternate_wins"] == 0
+
+
+def test_hedge_fires_at_the_soft_deadline_and_the_loser_is_cancelled():
+    fake = FakeRoutes(openai=(1.0, VALID), anthropic=(0.01, VALID.replace("0.5", "0.6")), google=(0.0, VALID))
+    text, elapsed, stats = _hedged(fake, soft=0.05)
+    assert '"home_win": 0.6' in text
+    (_, t0), (hedge, t1) = fake.started
+    assert hedge == "anthropic"
+    assert 0.05 <= t1 - t0 < 0.2
+    assert elapsed < 0.5
+    assert fake.cancelled == ["openai"]
+    assert (stats["hedges"], stats["alternate_wins"], stats["failovers"]) == (1, 1, 0)
+
+
+def test_errors_and_invalid_replies_fail_over_immediately():
+    fake = FakeRoutes(openai=(0.0, RuntimeError("rate limited")), anthropic=(0.0, "not json"),
+                      google=(0.0, VALID))
+    text, elapsed, stats = _hedged(fake, soft=1.0, hard=2.0)
+    assert text == VALID
+    assert [p for p, _ in fake.started] == ["openai", "anthropic", "google"]
+    assert elapsed < 0.5  # no waiting for the soft deadline between failovers
+    assert (stats["failovers"], stats["hedges"], stats["alternate_wins"]) == (2, 0, 1)
+
+
+def test_hard_deadline_returns_none_and_cancels_everything():
+    fake = FakeRoutes(openai=(5.0, VALID), anthropic=(5.0, VALID), google=(5.0, VALID))
+    text, elapsed, stats = _hedged(fake, soft=0.05, hard=0.2)
+    assert text is None
+    assert 0.2 <= elapsed < 1.0
+    assert sorted(fake.cancelled) == ["anthropic", "google", "openai"]
+    assert (stats["hedges"], stats["deadline_misses"], stats["exhausted"]) == (2, 1, 0)
+
+
+def test_every_route_failing_returns_none():
+    fake = FakeRoutes(openai=(0.0, ValueError("bad")), anthropic=(0.0, ValueError("bad")),
+                      google=(0.0, "nope"))
+    text, _, stats = _hedged(fake)
+    assert text is None
+    assert (stats["failovers"], stats["exhausted"], stats["deadline_misses"]) == (2, 1, 0)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,117 @@
+"""
+Tests for the tolerant parsing of agent JSON replies (w5_engine/json_repair.py)
+"""
+from w5_engine.json_repair import extract_object, parse_prediction, parse_predictions, repair
+
+
+def test_plain_json():
+    result = parse_prediction('{"home_win": 0.5, "draw": 0.3, "away_win": 0.2, "confidence": 0.7, "reasoning": "x"}')
+    assert result == {"home_win": 0.5, "draw": 0.3, "away_win": 0.2, "confidence": 0.7, "reasoning": "x"}
+
+
+def test_prose_and_code_fences():
+    text = 'Here is my view:\n```json\n{"home_win": 0.6, "draw": 0.25, "away_win": 0.15}\n```\nGood luck!'
+    result = parse_prediction(text)
+    assert result["home_win"] == 0.6 and result["away_win"] == 0.15
+    assert result["confidence"] == 0.5  # default
+    assert result["reasoning"] == ""
+
+
+def test_python_style_dict():
+    result = parse_prediction("{'home_win': 0.4, 'draw': 0.3, 'away_win': 0.3, 'confidence': None, "
+                              "'reasoning': 'it\\'s close', 'final': True,}")
+    assert result["home_win"] == 0.4
+    assert result["reasoning"] == "it's close"
+
+
+def test_unquoted_keys_trailing_comma_smart_quotes():
+    result = parse_prediction('{home_win: 0.5, draw: 0.2, away_win: 0.3, reasoning: “form”,}')
+    assert result["draw"] == 0.2
+    assert result["reasoning"] == "form"
+
+
+def test_percentages_and_normalization():
+    result = parse_prediction('{"home_win": 50, "draw": 30, "away_win": 20, "confidence": 80}')
+    assert (result["home_win"], result["draw"], result["away_win"]) == (0.5, 0.3, 0.2)
+    assert result["confidence"] == 0.8
+
+    result = parse_prediction('{"home_win": "45%", "draw": "25%", "away_win": "30%"}')
+    assert (result["home_win"], result["draw"], result["away_win"]) == (0.45, 0.25, 0.3)
+
+    # Probabilities that do not sum to 1 are rescaled
+    result = parse_prediction('{"home_win": 0.5, "draw": 0.5, "away_win": 1.0}')
+    assert (result["home_win"], result["draw"], result["away_win"]) == (0.25, 0.25, 0.5)
+
+
+def test_key_aliases_and_nesting():
+    result = parse_prediction('{"confidence": 0.9, "prediction": {"home": 0.2, "draw_probability": 0.3, '
+                              '"away_win_prob": 0.5}, "rationale": "away form"}')
+    assert (result["home_win"], result["draw"], result["away_win"]) == (0.2, 0.3, 0.5)
+    assert result["confidence"] == 0.9
+    assert result["reasoning"] == "away form"
+
+
+def test_truncated_reply():
+    # Cut off by the output token limit in the middle of the reasoning string
+    result = parse_prediction('{"home_win": 0.45, "draw": 0.3, "away_win": 0.25, "confidence": 0.6, '
+                              '"reasoning": "Home side unbeaten in')
+    assert result["home_win"] == 0.45
+    assert result["reasoning"].startswith("Home side unbeaten")
+
+    # Cut off after a dangling key: the incomplete member is dropped
+    result = parse_prediction('{"home_win": 0.45, "draw": 0.3, "away_win": 0.25, "confid')
+    assert result["away_win"] == 0.25
+
+
+def test_unusable_replies():
+    assert parse_prediction(None) is None
+    assert parse_prediction("") is None
+    assert parse_prediction("no json here") is None
+    assert parse_prediction('{"home_win": 0.5, "draw": 0.5}') is None
+    assert parse_prediction('{"home_win": -1, "draw": 0.5, "away_win": 0.5}') is None
+    assert parse_prediction('{"home_win": 0, "draw": 0, "away_win": 0}') is None
+
+
+def test_braces_in_prose_before_the_object():
+    result = parse_prediction('I think {maybe} {"home_win": 0.5, "draw": 0.3, "away_win": 0.2}')
+    assert (result["home_win"], result["draw"], result["away_win"]) == (0.5, 0.3, 0.2)
+
+    # Also when the object is cut off at the end
+    result = parse_prediction('Scale {0-1}: {"home_win": 0.4, "draw": 0.4, "away_win": 0.2, "reasoning": "ti')
+    assert result["away_win"] == 0.2 and result["reasoning"] == "ti"
+
+
+def test_extract_object_respects_strings():
+    text = 'noise {"a": "brace } inside", "b": {"c": 1}} trailing }'
+    assert extract_object(text) == '{"a": "brace } inside", "b": {"c": 1}}'
+    assert extract_object('{"a": 1, "b": [') == '{"a": 1, "b": ['
+    assert repair('{"a": 1, "b": [') == {"a": 1, "b": []}
+
+
+def test_packed_replies():
+    text = ('{"results": [{"id": 2, "home_win": 0.1, "draw": 0.2, "away_win": 0.7}, '
+            '{"id": 1, "home_win": 0.6, "draw": 0.2, "away_win": 0.2}, '
+            '{"id": 3, "home_win": "bad"}, '
+            '{"id": 4, "home_win": 0.3, "draw": 0.3, "away_win": 0.4, "reasoning": "cut off')
+    results = parse_predictions(text, 4)
+    assert results[0]["home_win"] == 0.6
+    assert results[1]["away_win"] == 0.7
+    assert results[2] is None
+    assert results[3]["away_win"] == 0.4
+
+
+def test_packed_replies_without_ids():
+    text = ('[{"home_win": 0.5, "draw": 0.25, "away_win": 0.25}, '
+            '{"home_win": 0.2, "draw": 0.3, "away_win": 0.5}]')
+    results = parse_predictions(text, 3)
+    assert results[0]["home_win"] == 0.5
+    assert results[1]["away_win"] == 0.5
+    assert results[2] is None
+    assert parse_predictions(None, 2) == [None, None]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
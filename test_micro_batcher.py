@@ -0,0 +1,140 @@
+"""
+Tests for the baseline micro-batcher's cancel, error and shutdown paths (src/models/batching.py)
+"""
+import asyncio
+import threading
+from concurrent.futures import CancelledError
+
+import numpy as np
+
+from src.models.batching import MicroBatcher
+
+N_FEATURES = 3
+
+
+class GatedModel:
+    """Doubles its input; the first call blocks until released so rows pile up behind it."""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.batches = []
+
+    def __call__(self, X):
+        self.batches.append(X[:, 0].tolist())
+        self.entered.set()
+        self.release.wait(5)
+        if (X == -1).any():
+            raise ValueError("bad row")
+        return X * 2
+
+
+def _row(value):
+    return np.full(N_FEATURES, value, dtype=np.float32)
+
+
+def test_rows_queued_together_are_scored_in_one_batch():
+    model = GatedModel()
+    model.release.set()
+    batcher = MicroBatcher(model, N_FEATURES, max_batch_size=8, max_wait_ms=50)
+    futures = [batcher.submit(_row(i)) for i in range(5)]
+    assert [f.result(5)[0] for f in futures] == [0, 2, 4, 6, 8]
+    assert batcher.stats()["rows"] == 5
+    assert batcher.stats()["max_batch"] > 1
+    batcher.close()
+
+
+def test_cancelled_rows_are_skipped_and_the_worker_survives():
+    model = GatedModel()
+    batcher = MicroBatcher(model, N_FEATURES, max_batch_size=8, max_wait_ms=1)
+    first = batcher.submit(_row(1))
+    assert model.entered.wait(5)  # the worker is now busy with the first batch
+
+    cancelled = batcher.submit(_row(2))
+    kept = batcher.submit(_row(3))
+    assert cancelled.cancel()
+    model.release.set()
+
+    assert first.result(5)[0] == 2
+    assert kept.result(5)[0] == 6
+    assert cancelled.cancelled()
+    try:
+        cancelled.result(0)
+        assert False, "cancelled future resolved"
+    except CancelledError:
+        pass
+    assert model.batches[1] == [3.0]  # the cancelled row was never scored
+
+    # Still serving afterwards
+    assert batcher.predict(_row(4), timeout=5)[0] == 8
+    batcher.close()
+
+
+def test_async_callers_that_give_up_do_not_break_the_worker():
+    model = GatedModel()
+    batcher = MicroBatcher(model, N_FEATURES, max_wait_ms=1)
+
+    async def main():
+        blocked = asyncio.ensure_future(batcher.predict_async(_row(1)))
+        await asyncio.get_running_loop().run_in_executor(None, model.entered.wait, 5)
+        timed_out = asyncio.ensure_future(batcher.predict_async(_row(2)))
+        try:
+            await asyncio.wait_for(timed_out, 0.05)
+            assert False, "wait_for did not time out"
+        except asyncio.TimeoutError:
+            pass
+        model.release.set()
+        assert (await blocked)[0] == 2
+        return (await batcher.predict_async(_row(5)))[0]
+
+    assert asyncio.run(main()) == 10
+    assert 2.0 not in sum(model.batches, [])
+    batcher.close()
+
+
+def test_model_errors_reach_every_caller_of_the_batch():
+    model = GatedModel()
+    batcher = MicroBatcher(model, N_FEATURES, max_batch_size=8, max_wait_ms=1)
+    first = batcher.submit(_row(1))
+    assert model.entered.wait(5)
+    bad, good = batcher.submit(_row(-1)), batcher.submit(_row(3))
+    model.release.set()
+
+    assert first.result(5)[0] == 2
+    for future in (bad, good):
+        try:
+            future.result(5)
+            assert False, "error was not propagated"
+        except ValueError as e:
+            assert str(e) == "bad row"
+
+    # The worker thread is still alive and scores the next batch
+    assert batcher.predict(_row(4), timeout=5)[0] == 8
+    batcher.close()
+
+
+def test_close_scores_queued_rows_then_refuses_new_ones():
+    model = GatedModel()
+    batcher = MicroBatcher(model, N_FEATURES, max_batch_size=2, max_wait_ms=1)
+    first = batcher.submit(_row(1))
+    assert model.entered.wait(5)
+    queued = [batcher.submit(_row(i)) for i in (2, 3, 4)]
+    batcher.close()
+    model.release.set()
+
+    assert first.result(5)[0] == 2
+    assert [f.result(5)[0] for f in queued] == [4, 6, 8]
+    batcher._thread.join(5)
+    assert not batcher._thread.is_alive()
+    try:
+        batcher.submit(_row(5))
+        assert False, "closed batcher accepted a row"
+    except RuntimeError:
+        pass
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
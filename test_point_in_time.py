@@ -0,0 +1,113 @@
+"""
+Point-in-time tests for the feature store: a fixture's features may only use
+results from before its kickoff date (src/data/feature_store.py, h2h_index.py,
+models/elo.py)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.feature_store import (FEATURE_COLUMNS, _elo_engine, _h2h_features, _season_to_date,
+                                    feature_store)
+from src.data.h2h_index import H2HIndex
+
+# Two pairs meeting on 1, 8 and 15 Jan; every matchday has two fixtures on the same date
+RESULTS = [
+    ("2024-01-01", "Arsenal", "Chelsea", 2, 0),
+    ("2024-01-01", "Everton", "Fulham", 1, 1),
+    ("2024-01-08", "Chelsea", "Arsenal", 1, 1),
+    ("2024-01-08", "Fulham", "Everton", 0, 3),
+    ("2024-01-15", "Arsenal", "Chelsea", 0, 1),
+    ("2024-01-15", "Everton", "Fulham", 2, 2),
+]
+
+
+def _matches(results=RESULTS) -> pd.DataFrame:
+    frame = pd.DataFrame(results, columns=["date", "home_team", "away_team", "home_goals", "away_goals"])
+    frame["date"] = pd.to_datetime(frame["date"])
+    frame["league"] = "ENG-Premier League"
+    frame["season"] = "2324"
+    frame["played"] = True
+    hg, ag = frame["home_goals"], frame["away_goals"]
+    frame["target"] = np.select([hg > ag, hg == ag], [0, 1], 2)
+    return frame
+
+
+def _with_changed_future(cutoff: str) -> pd.DataFrame:
+    """Same fixtures, every result from ``cutoff`` on flipped to a heavy away win."""
+    changed = [(d, h, a, 0, 5) if d >= cutoff else (d, h, a, hg, ag) for d, h, a, hg, ag in RESULTS]
+    return _matches(changed)
+
+
+@pytest.mark.parametrize("cutoff", ["2024-01-08", "2024-01-15"])
+def test_training_features_ignore_later_results(cutoff):
+    original, changed = _matches(), _with_changed_future(cutoff)
+    upto = (original["date"] <= cutoff).to_numpy()  # fixtures on the cutoff day itself included
+
+    for build in (_season_to_date, _h2h_features):
+        pd.testing.assert_frame_equal(build(original)[upto], build(changed)[upto])
+
+    before = _elo_engine().replay(original["home_team"], original["away_team"], original["target"])
+    after = _elo_engine().replay(changed["home_team"], changed["away_team"], changed["target"])
+    for b, a in zip(before, after):
+        np.testing.assert_array_equal(np.asarray(b)[upto], np.asarray(a)[upto])
+
+
+def test_season_to_date_counts_only_earlier_fixtures():
+    features = _season_to_date(_matches())
+    assert features["home_season_played"].tolist() == [0, 0, 1, 1, 2, 2]
+    assert np.isnan(features.loc[0, "home_season_ppm"])
+    assert features.loc[4, "home_season_ppm"] == pytest.approx(4 / 2)  # Arsenal: W, D before 15 Jan
+
+
+def test_h2h_features_count_only_earlier_meetings():
+    features = _h2h_features(_matches())
+    assert features["h2h_games"].tolist() == [0, 0, 1, 1, 2, 2]
+    # Arsenal at home on 15 Jan: one earlier win and one draw against Chelsea
+    assert features.loc[4, "h2h_home_win_rate"] == pytest.approx(0.5)
+    assert features.loc[4, "h2h_draw_rate"] == pytest.approx(0.5)
+
+
+def test_h2h_index_as_of_excludes_the_match_day():
+    index = H2HIndex().build(_matches())
+    assert index.stats("Arsenal", "Chelsea", as_of="2024-01-01") is None
+    assert index.stats("Arsenal", "Chelsea", as_of="2024-01-08")["overall_games"] == 1
+    assert index.stats("Arsenal", "Chelsea", as_of="2024-01-09")["overall_games"] == 2
+    assert index.stats("Arsenal", "Chelsea")["overall_games"] == 3
+
+    # A result folded in later only counts from the day after it was played
+    index.add_result("Arsenal", "Chelsea", 3, 0, "2024-02-01")
+    assert index.stats("Arsenal", "Chelsea", as_of="2024-02-01")["overall_games"] == 3
+    assert index.stats("Arsenal", "Chelsea", as_of="2024-02-02")["team1_wins"] == 2
+
+
+def test_elo_history_as_of_excludes_the_match_day():
+    matches = _matches()
+    history = _elo_engine().replay_history(matches["date"], matches["home_team"], matches["away_team"],
+                                           matches["target"])
+    home_pre, _ = _elo_engine().replay(matches["home_team"], matches["away_team"], matches["target"])
+    for i, row in matches.iterrows():
+        assert history.rating(row["home_team"], row["date"]) == pytest.approx(home_pre[i])
+    assert history.rating("Arsenal", "2024-01-01") == pytest.approx(1500.0)
+
+
+def test_online_features_match_the_training_frame():
+    """``match_features`` at kickoff reproduces the training row (needs the local data cache)."""
+    try:
+        frame = feature_store.training_frame()
+    except Exception as e:
+        pytest.skip(f"feature store unavailable: {e}")
+    if frame.empty:
+        pytest.skip("no cached fixtures")
+
+    for i in np.linspace(0, len(frame) - 1, 25).astype(int):
+        row = frame.iloc[i]
+        online = feature_store.match_features(row["home_team"], row["away_team"], as_of=row["date"])
+        # Form features are served rounded to 2 decimals; elo_diff is a float32 difference
+        np.testing.assert_allclose(online, row[FEATURE_COLUMNS].to_numpy(dtype=np.float32), rtol=1e-5,
+                                   atol=0.01, err_msg=f"{row['date']:%Y-%m-%d} {row['home_team']}")
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
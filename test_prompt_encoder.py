@@ -0,0 +1,110 @@
+"""
+Tests for the compact, token-budgeted agent prompts (w5_engine/prompt_encoder.py)
+"""
+import json
+
+from w5_engine.prompt_encoder import (PACK_INSTRUCTION, RESPONSE_INSTRUCTION, PromptEncoder, count_tokens)
+
+MATCH = {
+    "home_team": "Arsenal",
+    "away_team": "Chelsea",
+    "quantitative_features": {
+        "h2h_overall_games": 40,
+        "h2h_team1_wins": 18,
+        "h2h_team2_wins": 12,
+        "h2h_draws": 10,
+        "home_form": "WWDLW",
+        "away_form": "Form Data Unavailable",
+        "league_leader_points": 50.0,
+        "standings_summary": [
+            {"rank": 1, "team": "Arsenal", "points": 50},
+            {"rank": 2, "team": "Man City", "points": 48.333},
+        ],
+        "away_days_since_last_match": None,
+    },
+    "qualitative_context": {
+        "home_venue": "Emirates Stadium",
+        "home_capacity": 60704,
+        "weather": "Unknown",
+        "excitement_rating": 7.456,
+    },
+}
+
+
+def _stats(prompt):
+    line = next(l for l in prompt.splitlines() if l.startswith("Stats: "))
+    return json.loads(line[len("Stats: "):])
+
+
+def test_compact_drops_empties_rounds_and_shortens_keys():
+    encoder = PromptEncoder()
+    out = encoder.compact({"home_form": "WWD", "away_form": "N/A", "x": None, "y": [], "z": 1.23456,
+                           "w": 2.0, "v": {"inner": ""}})
+    assert out == {"h_form": "WWD", "w": 2, "z": 1.23}
+
+
+def test_compact_row_lists_have_one_header():
+    encoder = PromptEncoder()
+    rows = [{"rank": 1, "team": "Arsenal", "points": 50},
+            {"rank": 2, "team": "Man City", "points": 48.333, "form": "WWD"},
+            {"team": "Spurs, London", "points": None}]
+    assert encoder.compact(rows) == "rank,team,pts,form|1,Arsenal,50,;2,Man City,48.33,WWD;,Spurs  London,,"
+
+
+def test_build_is_stable_and_complete_within_budget():
+    encoder = PromptEncoder()
+    prompt = encoder.build(MATCH)
+    assert prompt == encoder.build(json.loads(json.dumps(MATCH)))
+    assert prompt.startswith("Match: Arsenal (h) vs Chelsea (a).")
+    assert prompt.endswith(RESPONSE_INSTRUCTION)
+    stats = _stats(prompt)
+    assert stats["h2h_n"] == 40 and stats["h_form"] == "WWDLW"
+    assert "a_form" not in stats and "a_rest_days" not in stats
+    assert stats["top6"] == "rank,team,pts|1,Arsenal,50;2,Man City,48.33"
+    assert "Unknown" not in prompt
+    assert count_tokens(prompt) <= encoder.budget(None)
+
+
+def test_tight_budget_drops_low_priority_fields_first():
+    encoder = PromptEncoder()
+    full = encoder.build(MATCH)
+    budget = count_tokens(full) - 15
+    prompt = encoder.build(MATCH, budget=budget)
+    assert count_tokens(prompt) <= budget
+    stats = _stats(prompt)
+    # Priority 5 (standings summary) goes before form and head to head
+    assert "top6" not in stats
+    assert stats["h_form"] == "WWDLW" and stats["h2h_n"] == 40
+    assert prompt.endswith(RESPONSE_INSTRUCTION)
+
+
+def test_rebuttal_lists_other_positions():
+    encoder = PromptEncoder()
+    text = encoder.rebuttal([{"agent": "Tactician", "home_win": 0.5123, "draw": 0.25, "away_win": 0.2377,
+                              "confidence": 0.7, "reasoning": ""}], round_number=2)
+    lines = text.splitlines()
+    assert lines[0] == "Round 2. Other agents:"
+    assert json.loads(lines[1].split(": ", 1)[1]) == {"h": 0.51, "d": 0.25, "a": 0.24, "conf": 0.7}
+
+
+def test_pack_respects_size_and_budget():
+    encoder = PromptEncoder()
+    datas = [dict(MATCH, home_team=f"Team {i}") for i in range(5)]
+    packs = encoder.pack(datas, size=2)
+    assert [indices for indices, _ in packs] == [[0, 1], [2, 3], [4]]
+    for indices, text in packs:
+        assert text.startswith("#1 Match: Team")
+        assert text.endswith(PACK_INSTRUCTION)
+        assert RESPONSE_INSTRUCTION not in text
+
+    single = count_tokens(encoder.build(datas[0], instruction=False))
+    packs = encoder.pack(datas, size=8, budget=count_tokens(PACK_INSTRUCTION) + 2 * (single + 2))
+    assert all(len(indices) <= 2 for indices, _ in packs)
+    assert sorted(i for indices, _ in packs for i in indices) == list(range(5))
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
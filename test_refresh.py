@@ -0,0 +1,80 @@
+"""
+Tests for the nightly baseline refresh: full retrain, warm-start updates and
+the drift check (src/models/refresh.py)
+"""
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.feature_store import FEATURE_COLUMNS
+from src.models.refresh import drift_check, refresh, train_full
+from src.models.registry import ModelRegistry
+
+
+class FrameStore:
+    """Feature store stand-in serving a fixed training frame."""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+
+    def training_frame(self) -> pd.DataFrame:
+        return self.frame
+
+
+def _frame(n=900, seed=5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(rng.normal(size=(n, len(FEATURE_COLUMNS))).astype(np.float32), columns=FEATURE_COLUMNS)
+    score = frame[FEATURE_COLUMNS[0]] - frame[FEATURE_COLUMNS[1]] + rng.normal(size=n)
+    frame["target"] = np.where(score > 0.5, 0, np.where(score < -0.5, 2, 1))
+    frame["date"] = pd.Timestamp("2021-08-01") + pd.to_timedelta(np.arange(n), unit="D")
+    frame["season"] = np.repeat(["2122", "2223", "2324"], n // 3)
+    return frame
+
+
+def test_full_retrain_fits_every_row_and_records_a_holdout_reference():
+    frame = _frame()
+    model, metadata = train_full(FrameStore(frame))
+
+    assert model.training_info["n_samples"] == len(frame)
+    assert int(model.scaler.n_samples_seen_) == len(frame)  # refit on all rows, newest season included
+    metrics = model.training_info["metrics"]
+    assert model.training_info["refit_rounds"]["xgboost"] == metrics["xgboost_best_iteration"] + 1
+    assert model._xgb_booster().num_boosted_rounds() == metrics["xgboost_best_iteration"] + 1
+    assert metadata["holdout_season"] == "2324"
+    assert metrics["holdout_log_loss"] > 0
+    assert metadata["last_match_date"] == frame["date"].max().strftime("%Y-%m-%d")
+
+
+def test_refresh_updates_and_carries_the_reference():
+    frame = _frame()
+    registry = ModelRegistry(Path(tempfile.mkdtemp()))
+    store = FrameStore(frame.iloc[:-120])
+    assert refresh(registry, store)["action"] == "full"
+    reference = registry.manifest()["metrics"]["holdout_log_loss"]
+    assert refresh(registry, store)["action"] == "none"
+
+    store.frame = frame
+    result = refresh(registry, store, n_rounds=3)
+    assert result["action"] == "update", result
+    manifest = registry.manifest()
+    assert manifest["last_match_date"] == frame["date"].max().strftime("%Y-%m-%d")
+    assert manifest["metrics"]["holdout_log_loss"] == reference
+
+
+def test_drift_check():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 3, 400)
+    confident_wrong = np.full((400, 3), 0.05)
+    confident_wrong[np.arange(400), (y + 1) % 3] = 0.9
+    assert drift_check(y, confident_wrong, reference=1.0)
+    assert drift_check(y, np.full((400, 3), 1 / 3), reference=1.0) is None
+    assert drift_check(y[:50], confident_wrong[:50], reference=1.0) is None  # too few rows
+    assert drift_check(y, confident_wrong, reference=None) is None
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,82 @@
+"""
+Tests for the SQLite LLM response cache (w5_engine/response_cache.py)
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from w5_engine.response_cache import ResponseCache
+
+
+def _cache(**kwargs) -> ResponseCache:
+    return ResponseCache(Path(tempfile.mkdtemp()) / "llm_cache.sqlite3", **kwargs)
+
+
+def test_key_depends_on_every_request_field():
+    base = ("openai", "gpt-4o-mini", 0.2, "system", "user")
+    key = ResponseCache.key(*base)
+    assert key == ResponseCache.key(*base)
+    for i, changed in enumerate(("anthropic", "gpt-4o", 0.3, "system!", "user!")):
+        assert ResponseCache.key(*base[:i], changed, *base[i + 1:]) != key
+
+
+def test_put_get_and_stats():
+    cache = _cache()
+    key = ResponseCache.key("openai", "gpt-4o-mini", 0.2, "s", "u")
+    assert cache.get(key) is None
+    cache.put(key, '{"home_win": 0.5}')
+    assert cache.has(key)
+    assert cache.get(key) == '{"home_win": 0.5}'
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"], stats["entries"]) == (1, 1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_entries_expire():
+    cache = _cache(ttl=0.2)
+    cache.put("default", "a")
+    cache.put("short", "b", ttl=0.05)
+    cache.put("long", "c", ttl=60)
+    time.sleep(0.1)
+    assert cache.get("short") is None and not cache.has("short")
+    assert cache.get("default") == "a"
+    time.sleep(0.15)
+    assert cache.get("default") is None
+    assert cache.get("long") == "c"  # a per-entry TTL outlives the cache TTL
+    assert cache.stats()["expired"] == 2
+
+
+def test_disabled_cache_stores_nothing():
+    cache = _cache(ttl=0)
+    cache.put("key", "value")
+    assert cache.get("key") is None
+    assert not cache.has("key")
+    assert not cache.path.exists()
+
+
+def test_size_cap_evicts_least_recently_used():
+    cache = _cache(max_bytes=1000)
+    for i in range(4):
+        cache.put(f"k{i}", "x" * 200)
+    assert cache.get("k0") == "x" * 200  # k0 is now the most recently used
+    cache.put("k4", "x" * 200)
+    cache.put("k5", "x" * 200)
+    assert cache.has("k0")
+    assert not cache.has("k1")
+    assert cache.stats()["bytes"] <= 1000
+    assert cache.stats()["evictions"] >= 1
+
+
+def test_entries_survive_reopening():
+    cache = _cache()
+    cache.put("key", "value")
+    assert ResponseCache(cache.path).get("key") == "value"
+    cache.clear()
+    assert cache.get("key") is None
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,107 @@
+"""
+Tests for the Monte Carlo season simulator (src/models/season_sim.py)
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.models.season_sim as season_sim_module
+from src.models.season_sim import ELO_SCORELINES, SeasonSimulator, current_table, simulate
+
+TEAMS = ["Arsenal", "Chelsea", "Everton", "Fulham"]
+LEAGUE, SEASON = "ENG-Premier League", "2425"
+
+
+class FakeStore:
+    """Cache store stand-in: one schedule page whose fingerprint changes on re-download."""
+
+    def __init__(self):
+        self.version = 0
+
+    def names(self, pattern: str):
+        return ["schedule_test.html"]
+
+    def fingerprint(self, names):
+        return f"v{self.version}"
+
+
+def _schedule(seed=1) -> pd.DataFrame:
+    """Double round robin of four teams over six weeks, every result in."""
+    rng = np.random.default_rng(seed)
+    pairs = [(h, a) for h in TEAMS for a in TEAMS if h != a]
+    rows = [{"league": LEAGUE, "season": SEASON, "week": i // 2 + 1,
+             "date": pd.Timestamp("2024-08-10") + pd.Timedelta(weeks=i // 2),
+             "home_team": h, "away_team": a, "home_goals": int(rng.integers(0, 4)),
+             "away_goals": int(rng.integers(0, 4)), "played": True}
+            for i, (h, a) in enumerate(pairs)]
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def simulator(monkeypatch):
+    schedule = _schedule()
+    loads = []
+
+    def load_schedules(store):
+        loads.append(store.version)
+        return schedule
+
+    monkeypatch.setattr(season_sim_module, "load_schedules", load_schedules)
+    sim = SeasonSimulator(store=FakeStore(), n_sims=500, model="elo", n_workers=1)
+    sim.loads = loads
+    return sim
+
+
+def test_finished_season_yields_the_final_table(simulator):
+    plan = simulator._plan(LEAGUE, SEASON, "2025-06-01", None, None)
+    assert plan["matchday"] == 6 and plan["is_played"].all()
+
+    projection = simulator._simulate(plan, n_workers=1)
+    points, gd, gf, _ = current_table(_schedule(), TEAMS)
+    final = [TEAMS[i] for i in np.lexsort((-gf, -gd, -points))]
+    assert projection["team"].tolist() == final
+    assert projection["expected_position"].tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert projection["title"].tolist() == [1.0, 0.0, 0.0, 0.0]
+    assert projection["expected_points"].tolist() == sorted(points.tolist(), reverse=True)
+    # No randomness when nothing is left to play
+    pd.testing.assert_frame_equal(projection, simulator._simulate(plan, n_workers=1))
+
+
+def test_plan_memoizes_the_season_slice_until_the_schedule_changes(simulator):
+    early = simulator._plan(LEAGUE, SEASON, "2024-08-20", None, None)
+    late = simulator._plan(LEAGUE, SEASON, "2025-06-01", None, None)
+    assert simulator.loads == [0]
+    assert early["matchday"] == 2 and int(early["is_played"].sum()) == 4
+    assert late["key"] == (LEAGUE, SEASON, 6, 12, "elo", 500)
+    assert simulator._plan(LEAGUE, "1920", None, None, None) is None
+
+    simulator.store.version = 1  # a schedule page was re-downloaded
+    simulator._plan(LEAGUE, SEASON, "2024-08-20", None, None)
+    assert simulator.loads == [0, 0, 1]
+
+
+def test_fixed_seed_simulation_probabilities_sum_to_one():
+    schedule = _schedule()
+    played, remaining = schedule.iloc[:6], schedule.iloc[6:]
+    points, gd, gf, _ = current_table(played, TEAMS)
+    probs = np.tile([0.45, 0.27, 0.28], (len(remaining), 1))
+
+    def run(seed):
+        return simulate(TEAMS, (points, gd, gf), remaining, probs, *ELO_SCORELINES,
+                        n_sims=2_000, seed=seed, n_workers=1, chunk_size=700)
+
+    counts, mean_points = run(seed=3)
+    position_probs = counts / 2_000
+    np.testing.assert_allclose(position_probs.sum(axis=1), 1.0)  # every team finishes somewhere
+    np.testing.assert_allclose(position_probs.sum(axis=0), 1.0)  # every position is taken once
+    assert (mean_points >= points).all() and (mean_points <= points + 3 * 3).all()
+
+    again, again_points = run(seed=3)
+    np.testing.assert_array_equal(again, counts)
+    np.testing.assert_array_equal(again_points, mean_points)
+    assert not np.array_equal(run(seed=4)[0], counts)
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
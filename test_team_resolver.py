@@ -0,0 +1,43 @@
+"""
+Tests for mapping free-form team names onto cached FBref squad names (src/data/fbref_cache.py)
+"""
+from src.data.fbref_cache import TeamResolver, normalize_team_name
+
+SQUADS = ["Arsenal", "Aston Villa", "Atlético Madrid", "Leeds United", "Manchester City", "Manchester Utd",
+          "Norwich City", "Nott'ham Forest", "Real Madrid", "Real Sociedad", "Sevilla", "Villarreal",
+          "West Ham", "Wolves"]
+
+
+def test_normalize_strips_accents_punctuation_and_suffixes():
+    assert normalize_team_name("Atlético Madrid") == "atletico madrid"
+    assert normalize_team_name("Brighton & Hove Albion FC") == "brighton and hove albion"
+
+
+def test_aliases_and_exact_names():
+    resolver = TeamResolver(SQUADS)
+    assert resolver.resolve("Man City") == "Manchester City"
+    assert resolver.resolve("Manchester United") == "Manchester Utd"
+    assert resolver.resolve("Wolverhampton Wanderers") == "Wolves"
+    assert resolver.resolve("ARSENAL FC") == "Arsenal"
+    assert resolver.resolve("Atletico Madrid") == "Atlético Madrid"
+
+
+def test_partial_names_match_whole_words_of_one_squad():
+    resolver = TeamResolver(SQUADS)
+    assert resolver.resolve("Sociedad") == "Real Sociedad"
+    assert resolver.resolve("Villa") == "Aston Villa"  # not Sevilla or Villarreal
+    assert resolver.resolve("Forest") == "Nott'ham Forest"
+    assert resolver.resolve("Aston Villa Football Club") == "Aston Villa"
+
+
+def test_generic_or_ambiguous_names_resolve_to_nothing():
+    resolver = TeamResolver(SQUADS)
+    for name in ("Real", "United", "City", "Manchester", "Ham", "Madrid", "Bayern Munich", "", None):
+        assert resolver.resolve(name) is None, name
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -1,48 +1,200 @@
-import os
-from typing import Dict, Any
 import json
+import asyncio
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from .providers import API_KEY_ENV, DEFAULT_TEMPERATURE, RequestPolicy, provider_pool
+from .json_repair import parse_prediction, parse_predictions
+from .prompt_encoder import DEFAULT_PACK_SIZE, PACK_TOKEN_BUDGET, prompt_encoder
+from .response_cache import response_cache
+
+PROVIDERS = tuple(API_KEY_ENV)
+
+# Output token limits: the reply is one small JSON object with a capped reasoning string
+PERSONA_MAX_TOKENS = {
+    'tactician': 200,
+    'sentiment_analyst': 160,
+}
+DEFAULT_MAX_OUTPUT_TOKENS = 200
+REASONING_MAX_CHARS = 320
+POSITION_KEYS = ('home_win', 'draw', 'away_win', 'confidence', 'reasoning')
+PREFIX_KEY_CHARS = 32
+FALLBACK_NOTE = "LLM unavailable, data-only fallback."
+PARSE_ERROR_RESULT = {"home_win": 0.33, "draw": 0.34, "away_win": 0.33, "confidence": 0, "reasoning": "JSON Parse Error"}
+
 class LLMAgent:
-    def __init__(self, persona_type: str, provider: str = 'openai', model_name: str = 'gpt-4o-mini'):
+    def __init__(self, persona_type: str, provider: str = 'openai', model_name: str = 'gpt-4o-mini',
+                 policy: Optional[RequestPolicy] = None):
         self.persona = persona_type
         self.provider = provider
         self.model = model_name
-        self.client = self._init_client()
+        self.temperature = DEFAULT_TEMPERATURE
+        self.max_tokens = PERSONA_MAX_TOKENS.get(persona_type, DEFAULT_MAX_OUTPUT_TOKENS)
+        # Soft/hard deadlines and the hedge / failover chain (no LLM calls for 'deterministic')
+        self.policy = policy or (None if provider == 'deterministic' else RequestPolicy(provider, model_name))
 
-    def _init_client(self):
-        # 1. DETERMINISTIC (No Client needed)
+    def analyze(self, match_data: Dict[str, Any], blind_mode: bool = True,
+                cache_prefix: bool = False) -> Dict[str, Any]:
+        # Logic Path
         if self.provider == 'deterministic':
-            return None
+            return self._analyze_with_data(match_data)
 
-        # 2. OPENAI
-        if self.provider == 'openai':
-            from openai import OpenAI
-            api_key = os.getenv('OPENAI_API_KEY')
-            if not api_key: print(f"⚠️ {self.persona}: OPENAI_API_KEY missing")
-            return OpenAI(api_key=api_key)
-        
-        # 3. ANTHROPIC
-        elif self.provider == 'anthropic':
-            from anthropic import Anthropic
-            api_key = os.getenv('ANTHROPIC_API_KEY')
-            if not api_key: print(f"⚠️ {self.persona}: ANTHROPIC_API_KEY missing")
-            return Anthropic(api_key=api_key)
-            
-        return None
-
-    def analyze(self, match_data: Dict[str, Any], blind_mode: bool = True) -> Dict[str, Any]:
+        # AI Path: same hedged request flow, run on the provider pool's event loop
+        return provider_pool.run_sync(self.analyze_async(match_data, blind_mode, cache_prefix))
+
+    async def analyze_async(self, match_data: Dict[str, Any], blind_mode: bool = True,
+                            cache_prefix: bool = False) -> Dict[str, Any]:
+        """
+        Awaitable ``analyze``: LLM calls go through the shared async provider pool.
+
+        ``cache_prefix`` marks the prompt for provider-side prompt caching, for
+        when debate rounds will resend it; the provider layer drops the marker
+        while the prompt is shorter than the provider's caching minimum.
+        """
         # Logic Path
         if self.provider == 'deterministic':
             return self._analyze_with_data(match_data)
 
         # AI Path
+        cache_key, system_prompt, user_prompt = self.build_request(match_data)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return self._parse_json(cached)
+        prefix_key = cache_key[:PREFIX_KEY_CHARS] if cache_prefix else None
+        response_text = await self._query_model_async(system_prompt, user_prompt, prefix_key=prefix_key)
+        if response_text is None:
+            # No provider answered by the hard deadline: fall back to the data-only analysis
+            result = self._analyze_with_data(match_data)
+            result['reasoning'] = f"{FALLBACK_NOTE} {result['reasoning']}"
+            return result
+        return self._remember(cache_key, response_text)
+
+    async def debate_async(self, match_data: Dict[str, Any],
+                           turns: Sequence[Tuple[str, str]]) -> Optional[Dict[str, Any]]:
+        """
+        Revised position for a debate round.
+
+        The conversation is the opening prompt followed by ``turns``; only the
+        last message (the other agents' latest positions) is new, so the rest
+        is a stable, provider-cached prefix.
+
+        Args:
+            match_data: Match context, as for ``analyze``
+            turns: (own previous position, rebuttal message) per round so far
+
+        Returns:
+            The revised result, or None if no provider answered in time (the
+            previous position stands)
+        """
+        if self.provider == 'deterministic':
+            return self._analyze_with_data(match_data)
+
+        opening_key, system_prompt, user_prompt = self.build_request(match_data)
+        conversation = "\x1e".join([user_prompt] + [text for turn in turns for text in turn])
+        cache_key = self._cache_key(system_prompt, conversation)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return self._parse_json(cached)
+        response_text = await self._query_model_async(system_prompt, user_prompt, turns=list(turns),
+                                                      prefix_key=opening_key[:PREFIX_KEY_CHARS])
+        if response_text is None:
+            return None
+        return self._remember(cache_key, response_text)
+
+    @staticmethod
+    def is_llm_position(result: Dict[str, Any]) -> bool:
+        """False for the parse-error and data-only fallbacks (nothing to debate)."""
+        reasoning = result.get('reasoning') or ''
+        return reasoning != PARSE_ERROR_RESULT['reasoning'] and not reasoning.startswith(FALLBACK_NOTE)
+
+    @staticmethod
+    def position_text(result: Dict[str, Any]) -> str:
+        """A result as the assistant turn replayed in later debate rounds."""
+        return json.dumps({key: result.get(key) for key in POSITION_KEYS}, separators=(',', ':'),
+                          ensure_ascii=False)
+
+    def analyze_many(self, match_datas: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+        """Blocking ``analyze_many_async``, run on the provider pool's event loop."""
+        if self.provider == 'deterministic':
+            return [self._analyze_with_data(match_data) for match_data in match_datas]
+        return provider_pool.run_sync(self.analyze_many_async(match_datas, **kwargs))
+
+    async def analyze_many_async(self, match_datas: List[Dict[str, Any]], pack_size: int = DEFAULT_PACK_SIZE,
+                                 pack_budget: int = PACK_TOKEN_BUDGET) -> List[Dict[str, Any]]:
+        """
+        Analyze several fixtures with packed prompts (for batch / precompute rounds).
+
+        Cached fixtures are answered from the cache; the rest are packed up to
+        ``pack_size`` per prompt within ``pack_budget`` tokens, sharing one persona
+        prompt and output instruction. Each packed entry is validated on its own and
+        cached under the fixture's single-request key; entries that are missing or
+        invalid fall back to a per-fixture ``analyze_async``.
+
+        Args:
+            match_datas: Match contexts, as for ``analyze``
+            pack_size: Maximum fixtures per request
+            pack_budget: Token budget per packed prompt
+
+        Returns:
+            One result per fixture, in input order
+        """
+        if self.provider == 'deterministic':
+            return [self._analyze_with_data(match_data) for match_data in match_datas]
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(match_datas)
+        misses = []
+        for index, match_data in enumerate(match_datas):
+            cache_key = self.build_request(match_data)[0]
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                results[index] = self._parse_json(cached)
+            else:
+                misses.append((index, cache_key))
+
+        async def run_pack(members, user_prompt):
+            if len(members) == 1:  # nothing to share, keep the single-fixture prompt
+                index, _ = members[0]
+                results[index] = await self.analyze_async(match_datas[index])
+                return
+            predictions = [None] * len(members)
+            if self.provider in PROVIDERS:
+                response_text = await provider_pool.hedged(
+                    self._get_persona_prompt(), user_prompt, self.policy.scaled(len(members)),
+                    validate=lambda text: any(parse_predictions(text, len(members))),
+                    temperature=self.temperature, max_tokens=self.max_tokens * len(members))
+                predictions = parse_predictions(response_text, len(members))
+            retry = []
+            for (index, cache_key), prediction in zip(members, predictions):
+                if prediction is None:
+                    retry.append(index)
+                else:
+                    results[index] = self._remember(cache_key, json.dumps(prediction))
+            for index, result in zip(retry, await asyncio.gather(*(self.analyze_async(match_datas[i])
+                                                                   for i in retry))):
+                results[index] = result
+
+        packs = prompt_encoder.pack([match_datas[index] for index, _ in misses], self.persona,
+                                    pack_size, pack_budget)
+        await asyncio.gather(*(run_pack([misses[i] for i in group], user_prompt) for group, user_prompt in packs))
+        return results
+
+    def build_request(self, match_data: Dict[str, Any]):
+        """(cache key, system prompt, user prompt) for one fixture; also used by batch precompute."""
         system_prompt = self._get_persona_prompt()
         user_prompt = self._build_data_prompt(match_data)
-        response_text = self._query_model(system_prompt, user_prompt)
-        return self._parse_json(response_text)
+        return self._cache_key(system_prompt, user_prompt), system_prompt, user_prompt
+
+    def _cache_key(self, system_prompt: str, user_prompt: str) -> str:
+        return response_cache.key(self.provider, self.model, self.temperature, system_prompt, user_prompt)
+
+    def _remember(self, cache_key: str, response_text: str) -> Dict[str, Any]:
+        """Parse a fresh response and cache it unless it is a parse fallback."""
+        result = self._parse_json(response_text)
+        if response_text != "{}" and result != PARSE_ERROR_RESULT:
+            response_cache.put(cache_key, response_text)
+        return result
 
     def _analyze_with_data(self, match_data: Dict[str, Any]) -> Dict[str, Any]:
         """Deterministic analysis using hard data text summaries."""
@@ -74,6 +226,15 @@ class LLMAgent:
         league_leader_points = stats.get('league_leader_points', 0)
         if league_leader_points > 0:
             reasoning_parts.append(f"League leader has {league_leader_points} points.")
+
+        # Season simulation odds (title / top-4 / relegation)
+        for side, label in (('home', 'Home'), ('away', 'Away')):
+            projection = stats.get('season_projection', {}).get(side)
+            if projection:
+                reasoning_parts.append(
+                    f"{label} season odds: title {projection['title_prob']:.0%}, "
+                    f"top-4 {projection['top4_prob']:.0%}, relegation {projection['relegation_prob']:.0%}."
+                )
         
         return {
             "home_win": round(min(0.95, max(0.05, home_prob)), 2),
@@ -91,42 +252,25 @@ class LLMAgent:
         return "You are a sports analyst."
 
     def _build_data_prompt(self, data):
-        stats = data.get("quantitative_features", {})
-        context = data.get("qualitative_context", {})
-        prompt = f"Match: {data.get('home_team')} vs {data.get('away_team')}. Stats: {stats}. Context: {context}\n\nRespond with a JSON object containing: home_win, draw, away_win (probabilities 0-1), confidence (0-1), and reasoning (string)."
-        return prompt
-
-    def _query_model(self, system_msg, user_msg):
-        try:
-            if self.provider == 'openai':
-                resp = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "system", "content": system_msg}, {"role": "user", "content": user_msg}],
-                    temperature=0.2,
-                    response_format={"type": "json_object"}
-                )
-                return resp.choices[0].message.content
-            
-            elif self.provider == 'anthropic':
-                message = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=1000,
-                    temperature=0.2,
-                    system=system_msg,
-                    messages=[
-                        {"role": "user", "content": user_msg},
-                        {"role": "assistant", "content": "{"} 
-                    ]
-                )
-                return "{" + message.content[0].text
+        # Compact, token-budgeted encoding of the feature dicts (see prompt_encoder)
+        return prompt_encoder.build(data, self.persona)
 
+    async def _query_model_async(self, system_msg, user_msg, **kwargs) -> Optional[str]:
+        """Hedged completion under ``self.policy``; None if nothing valid arrived in time."""
+        if self.provider not in PROVIDERS:
             return "{}"
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            return '{"home_win": 0.33, "draw": 0.34, "away_win": 0.33, "confidence": 0, "reasoning": "AI Provider Error"}'
+        return await provider_pool.hedged(system_msg, user_msg, self.policy, validate=self._is_valid_response,
+                                          temperature=self.temperature, max_tokens=self.max_tokens, **kwargs)
+
+    def _is_valid_response(self, text: str) -> bool:
+        return self._parse_json(text) != PARSE_ERROR_RESULT
 
     def _parse_json(self, text):
-        try:
-            return json.loads(text.replace("```json", "").replace("```", "").strip())
-        except:
-            return {"home_win": 0.33, "draw": 0.34, "away_win": 0.33, "confidence": 0, "reasoning": "JSON Parse Error"}
\ No newline at end of file
+        # Tolerant: first balanced object, repaired and validated against the prediction schema
+        result = parse_prediction(text)
+        if result is None:
+            return dict(PARSE_ERROR_RESULT)
+        reasoning = result["reasoning"]
+        if len(reasoning) > REASONING_MAX_CHARS:
+            result["reasoning"] = reasoning[:REASONING_MAX_CHARS].rsplit(" ", 1)[0] + "…"
+        return result
\ No newline at end of file
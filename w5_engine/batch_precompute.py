@@ -0,0 +1,502 @@
+"""
+Offline batch precompute of agent responses for upcoming fixtures.
+
+Fixtures days away don't need interactive latency. The nightly job builds
+every LLM agent's prompt for the fixtures in the next few days, submits
+them through the providers' batch interfaces (discounted, and outside the
+interactive rate limit) and, once a batch has finished, loads the replies
+into the agent response cache. When the endpoint later analyses the same
+fixture with the same context, each agent is a cache hit: the context is
+built from the same loader arguments (``endpoint_request``: api league id,
+team ids, event id when the fixture feed has one) and the same agent packet.
+
+Backends:
+    provider   OpenAI Batch API / Anthropic Message Batches (Gemini agents are skipped)
+    file       local stand-in: requests are written to
+               <dir>/<batch_id>/requests.jsonl and the batch completes when a
+               results.jsonl ({"custom_id", "text"} per line) appears next to it
+
+With --pack K, up to K fixtures share one request (one persona prompt and
+output instruction, see prompt_encoder.pack); each entry of the packed reply
+is validated and cached under its fixture's own key, and entries that fail
+are left to the interactive per-fixture path.
+
+Submitted batches are tracked in <dir>/batches.json, so submitting and
+collecting can run in separate invocations:
+
+Usage:
+    python -m w5_engine.batch_precompute                       # collect finished, submit next 3 days
+    python -m w5_engine.batch_precompute --days 7 --wait       # submit and poll until loaded
+    python -m w5_engine.batch_precompute --collect-only
+    python -m w5_engine.batch_precompute --pack 8              # 8 fixtures per request
+    python -m w5_engine.batch_precompute --backend file --as-of 2024-03-01
+"""
+
+import io
+import os
+import json
+import hashlib
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from src.data.cache_store import CACHE_DIR
+from src.data.fbref_cache import TEAM_ALIASES, load_schedules
+from src.data.league_catalog import league_catalog
+from .json_repair import parse_prediction, parse_predictions
+from .prompt_encoder import PACK_TOKEN_BUDGET, prompt_encoder
+from .response_cache import ResponseCache, response_cache
+
+BATCH_DIR = Path(os.getenv("LLM_BATCH_DIR", CACHE_DIR / ".llm_batches"))
+DEFAULT_DAYS = 3
+POLL_INTERVAL = 60        # seconds between status checks with --wait
+MIN_RESULT_TTL = 6 * 3600  # cached results stay valid at least this long...
+KICKOFF_GRACE = 24 * 3600  # ...and until a day after kickoff
+
+
+# ============= BACKENDS =============
+
+class FileBatchBackend:
+    """
+    File-based stand-in for a provider batch API (for tests and dry runs).
+    """
+
+    name = "file"
+
+    def __init__(self, root: Path = BATCH_DIR / "file"):
+        self.root = Path(root)
+
+    def submit(self, provider: str, requests: List[Dict[str, Any]]) -> str:
+        batch_id = f"file-{provider}-{time.strftime('%Y%m%d%H%M%S')}-{len(requests)}"
+        folder = self.root / batch_id
+        folder.mkdir(parents=True, exist_ok=True)
+        with open(folder / "requests.jsonl", "w", encoding="utf-8") as f:
+            for request in requests:
+                f.write(json.dumps(request) + "\n")
+        return batch_id
+
+    def status(self, batch_id: str, provider: Optional[str] = None) -> str:
+        """'completed' once results.jsonl exists, else 'in_progress'."""
+        return "completed" if (self.root / batch_id / "results.jsonl").exists() else "in_progress"
+
+    def results(self, batch_id: str, provider: Optional[str] = None) -> Dict[str, str]:
+        out = {}
+        with open(self.root / batch_id / "results.jsonl", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    out[row["custom_id"]] = row["text"]
+        return out
+
+    def requests(self, batch_id: str) -> List[Dict[str, Any]]:
+        with open(self.root / batch_id / "requests.jsonl", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def respond(self, batch_id: str, responder: Callable[[Dict[str, Any]], Optional[str]]):
+        """Complete a batch by answering each request with ``responder`` (test hook)."""
+        rows = [{"custom_id": r["custom_id"], "text": responder(r)} for r in self.requests(batch_id)]
+        tmp = self.root / batch_id / "results.jsonl.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for row in rows:
+                if row["text"] is not None:
+                    f.write(json.dumps(row) + "\n")
+        os.replace(tmp, self.root / batch_id / "results.jsonl")
+
+
+class ProviderBatchBackend:
+    """
+    OpenAI Batch API and Anthropic Message Batches.
+    """
+
+    name = "provider"
+    SUPPORTED = ("openai", "anthropic")
+
+    def __init__(self):
+        self._clients = {}
+
+    def _client(self, provider: str):
+        if provider not in self._clients:
+            if provider == "openai":
+                import openai
+                self._clients[provider] = openai.OpenAI()
+            elif provider == "anthropic":
+                import anthropic
+                self._clients[provider] = anthropic.Anthropic()
+            else:
+                raise ValueError(f"No batch interface for provider '{provider}'")
+        return self._clients[provider]
+
+    def submit(self, provider: str, requests: List[Dict[str, Any]]) -> str:
+        client = self._client(provider)
+        if provider == "openai":
+            lines = [json.dumps({
+                "custom_id": r["custom_id"],
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": r["model"],
+                    "messages": [{"role": "system", "content": r["system"]}, {"role": "user", "content": r["user"]}],
+                    "temperature": r["temperature"],
+                    "max_tokens": r["max_tokens"],
+                    "response_format": {"type": "json_object"},
+                },
+            }) for r in requests]
+            upload = client.files.create(file=("requests.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))),
+                                         purpose="batch")
+            batch = client.batches.create(input_file_id=upload.id, endpoint="/v1/chat/completions",
+                                          completion_window="24h")
+            return batch.id
+
+        batch = client.messages.batches.create(requests=[{
+            "custom_id": r["custom_id"],
+            "params": {
+                "model": r["model"],
+                "max_tokens": r["max_tokens"],
+                "temperature": r["temperature"],
+                "system": r["system"],
+                # Same "{" prefill as the interactive path
+                "messages": [{"role": "user", "content": r["user"]}, {"role": "assistant", "content": "{"}],
+            },
+        } for r in requests])
+        return batch.id
+
+    def status(self, batch_id: str, provider: str) -> str:
+        """'completed', 'in_progress' or 'failed'."""
+        client = self._client(provider)
+        if provider == "openai":
+            status = client.batches.retrieve(batch_id).status
+            if status == "completed":
+                return "completed"
+            return "failed" if status in ("failed", "expired", "cancelled") else "in_progress"
+        status = client.messages.batches.retrieve(batch_id).processing_status
+        return "completed" if status == "ended" else "in_progress"
+
+    def results(self, batch_id: str, provider: str) -> Dict[str, str]:
+        client = self._client(provider)
+        out = {}
+        if provider == "openai":
+            batch = client.batches.retrieve(batch_id)
+            if not batch.output_file_id:
+                return out
+            for line in client.files.content(batch.output_file_id).text.splitlines():
+                row = json.loads(line)
+                response = row.get("response") or {}
+                if response.get("status_code") == 200:
+                    out[row["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+            return out
+
+        for entry in client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                out[entry.custom_id] = "{" + entry.result.message.content[0].text
+        return out
+
+
+# ============= PRECOMPUTE =============
+
+def upcoming_fixtures(days: int = DEFAULT_DAYS, as_of=None, leagues: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Cached fixtures kicking off in [as_of, as_of + days).
+
+    ``as_of`` defaults to today; with a past date, fixtures after it count
+    as upcoming (useful for dry runs on cached seasons).
+    """
+    start = pd.Timestamp(as_of).normalize() if as_of is not None else pd.Timestamp.today().normalize()
+    schedules = load_schedules()
+    mask = (schedules["date"] >= start) & (schedules["date"] < start + pd.Timedelta(days=days))
+    if as_of is None:
+        mask &= ~schedules["played"]
+    if leagues is not None:
+        mask &= schedules["league"].astype(str).isin(list(leagues))
+    return schedules.loc[mask, ["league", "season", "date", "home_team", "away_team"]].reset_index(drop=True)
+
+
+def _team_id(team: str, league_id: Optional[int]) -> Optional[int]:
+    """API team id for an FBref squad name, trying its common aliases too."""
+    from .team_id_database import find_team_id
+    for name in [team] + [alias for alias, fbref in TEAM_ALIASES.items() if fbref == team]:
+        team_id = find_team_id(name, league_id)
+        if team_id:
+            return team_id
+    return None
+
+
+def _optional(row: pd.Series, column: str):
+    value = row.get(column)
+    return None if value is None or pd.isna(value) else value
+
+
+def endpoint_request(row: pd.Series) -> Dict[str, Any]:
+    """
+    The loader arguments the analysis endpoint would use for a fixture row.
+
+    Optional columns from a frontend fixture feed (home_team_name,
+    away_team_name, event_id, league_id, home_team_id, away_team_id) are
+    used as given; otherwise the names are the cached ones, the league id
+    is the catalog's api_league_id and the team ids come from the team ID
+    database. Without an event_id the loader skips the match preview, so
+    only requests sent without one (or with the same one) share the keys.
+    """
+    home = str(_optional(row, "home_team_name") or row["home_team"])
+    away = str(_optional(row, "away_team_name") or row["away_team"])
+    league_id = _optional(row, "league_id")
+    if league_id is None:
+        record = league_catalog.resolve(str(row["league"])) if "league" in row else None
+        league_id = record.get("api_league_id") if record else None
+    home_id = _optional(row, "home_team_id") or _team_id(str(row["home_team"]), league_id)
+    away_id = _optional(row, "away_team_id") or _team_id(str(row["away_team"]), league_id)
+    event_id = _optional(row, "event_id")
+    as_int = lambda v: None if v is None else int(v)
+    return {
+        "home_team": home,
+        "away_team": away,
+        "event_id": as_int(event_id),
+        "league_id": as_int(league_id),
+        "home_team_id": as_int(home_id),
+        "away_team_id": as_int(away_id),
+        "match_date": pd.Timestamp(row["date"]).strftime("%Y-%m-%d"),
+    }
+
+
+class BatchPrecompute:
+    """
+    Builds, submits and collects batched agent requests.
+    """
+
+    def __init__(self, backend: str = "provider", agents: Optional[list] = None,
+                 cache: ResponseCache = response_cache, root: Path = BATCH_DIR, pack_size: int = 1,
+                 pack_budget: int = PACK_TOKEN_BUDGET):
+        """
+        Args:
+            backend: 'provider' or 'file'
+            agents: LLM agents to precompute (the consensus engine's by default)
+            cache: Response cache the results are loaded into
+            root: Directory holding the batch state (and file-backend batches)
+            pack_size: Fixtures per request (1 = one request per fixture)
+            pack_budget: Token budget per packed prompt
+        """
+        self.root = Path(root)
+        self.pack_size = max(1, pack_size)
+        self.pack_budget = pack_budget
+        self.backend = FileBatchBackend(self.root / "file") if backend == "file" else ProviderBatchBackend()
+        self.cache = cache
+        self.state_path = self.root / "batches.json"
+        from .debate import ConsensusEngine
+        self.engine = ConsensusEngine()
+        self.agents = [a for a in (agents or self.engine.agents) if a.provider != "deterministic"]
+
+    # ----- state -----
+
+    def _load_state(self) -> Dict[str, Any]:
+        if not self.state_path.exists():
+            return {"batches": []}
+        with open(self.state_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_state(self, state: Dict[str, Any]):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_name(f".{self.state_path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=1)
+        os.replace(tmp, self.state_path)
+
+    # ----- submit -----
+
+    def live_context(self, row: pd.Series) -> Dict[str, Any]:
+        """Agents' match data for a fixture, built like the analysis endpoint builds it."""
+        from src.data.loader import agent_data_packet, real_data_loader
+        request = endpoint_request(row)
+        match_context = real_data_loader.fetch_full_match_context(**request)
+        packet = agent_data_packet(request["home_team"], request["away_team"], match_context)
+        return self.engine.prepare_match_data(packet)
+
+    def build_requests(self, fixtures: pd.DataFrame,
+                       context: Optional[Callable[[pd.Series], Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        One request per (fixture, LLM agent), skipping prompts already cached;
+        with ``pack_size`` > 1 each agent's fixtures are packed into shared
+        requests that list their fixtures' cache keys under "members".
+
+        Args:
+            fixtures: Frame from ``upcoming_fixtures``
+            context: Builds the agents' match data for a fixture row (by default
+                ``live_context``: exactly what the analysis endpoint would send)
+        """
+        context = context or self.live_context
+
+        pending = {id(agent): [] for agent in self.agents}  # (key, system, user, kickoff, match data)
+        seen = set()
+        for _, row in fixtures.iterrows():
+            match_data = context(row)
+            for agent in self.agents:
+                key, system, user = agent.build_request(match_data)
+                if key in seen or self.cache.has(key):
+                    continue
+                seen.add(key)
+                pending[id(agent)].append((key, system, user, row["date"].strftime("%Y-%m-%d"), match_data))
+
+        requests = []
+        for agent in self.agents:
+            entries = pending[id(agent)]
+            if self.pack_size > 1:
+                groups = prompt_encoder.pack([e[4] for e in entries], agent.persona, self.pack_size,
+                                             self.pack_budget)
+            else:
+                groups = [([i], None) for i in range(len(entries))]
+            for group, packed_user in groups:
+                members = [entries[i] for i in group]
+                key, system, user, kickoff, _ = members[0]
+                request = {
+                    "custom_id": key,
+                    "provider": agent.provider,
+                    "model": agent.model,
+                    "temperature": agent.temperature,
+                    "max_tokens": agent.max_tokens * len(members),
+                    "system": system,
+                    "user": user,
+                    "kickoff": kickoff,
+                }
+                if len(members) > 1:
+                    # Packed: the reply is split per member when the batch is collected
+                    request.update({
+                        "custom_id": hashlib.sha256("".join(m[0] for m in members).encode()).hexdigest(),
+                        "user": packed_user,
+                        "kickoff": min(m[3] for m in members),
+                        "members": [m[0] for m in members],
+                        "kickoffs": [m[3] for m in members],
+                    })
+                requests.append(request)
+        return requests
+
+    def submit(self, days: int = DEFAULT_DAYS, as_of=None, leagues: Optional[Iterable[str]] = None,
+               context: Optional[Callable[[pd.Series], Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Submit one batch per provider for the upcoming fixtures.
+
+        Returns:
+            The new batch records
+        """
+        fixtures = upcoming_fixtures(days, as_of, leagues)
+        requests = self.build_requests(fixtures, context)
+        prompts = sum(len(r.get("members", [r["custom_id"]])) for r in requests)
+        print(f"📦 {len(fixtures)} fixtures -> {prompts} uncached agent prompts in {len(requests)} requests")
+
+        state = self._load_state()
+        records = []
+        for provider in sorted({r["provider"] for r in requests}):
+            batch = [r for r in requests if r["provider"] == provider]
+            if self.backend.name == "provider" and provider not in ProviderBatchBackend.SUPPORTED:
+                print(f"⚠️ No batch interface for {provider}; {len(batch)} prompts left to interactive calls")
+                continue
+            try:
+                batch_id = self.backend.submit(provider, batch)
+            except Exception as e:
+                print(f"❌ Batch submit failed for {provider}: {e}")
+                continue
+            record = {
+                "id": batch_id,
+                "backend": self.backend.name,
+                "provider": provider,
+                "submitted_at": time.time(),
+                "kickoffs": {r["custom_id"]: r["kickoff"] for r in batch if "members" not in r},
+                "packs": {r["custom_id"]: dict(zip(r["members"], r["kickoffs"])) for r in batch if "members" in r},
+            }
+            records.append(record)
+            print(f"   ✅ {provider}: batch {batch_id} ({len(batch)} requests)")
+        state["batches"].extend(records)
+        self._save_state(state)
+        return records
+
+    # ----- collect -----
+
+    def collect(self) -> Dict[str, int]:
+        """
+        Load every finished batch into the response cache.
+
+        Returns:
+            Counts of loaded and rejected responses and of pending batches
+        """
+        state = self._load_state()
+        summary = {"loaded": 0, "rejected": 0, "pending": 0, "failed": 0}
+        remaining = []
+        now = time.time()
+        for record in state["batches"]:
+            if record["backend"] != self.backend.name:
+                remaining.append(record)
+                continue
+            try:
+                status = self.backend.status(record["id"], record["provider"])
+                results = self.backend.results(record["id"], record["provider"]) if status == "completed" else {}
+            except Exception as e:
+                print(f"⚠️ Batch {record['id']} status check failed: {e}")
+                status, results = "in_progress", {}
+
+            if status == "in_progress":
+                summary["pending"] += 1
+                remaining.append(record)
+                continue
+            if status == "failed":
+                summary["failed"] += 1
+                continue
+
+            packs = record.get("packs", {})
+            for key, text in results.items():
+                if key in packs:
+                    # Packed reply: keep the valid entries, leave the rest to interactive calls
+                    members = list(packs[key].items())
+                    predictions = parse_predictions(text, len(members))
+                    entries = [(member, kickoff, json.dumps(prediction) if prediction else None)
+                               for (member, kickoff), prediction in zip(members, predictions)]
+                else:
+                    kickoff = record["kickoffs"].get(key)
+                    entries = [(key, kickoff, text if parse_prediction(text) is not None else None)]
+                for member, kickoff, response in entries:
+                    if kickoff is None or response is None:
+                        summary["rejected"] += 1
+                        continue
+                    until_kickoff = pd.Timestamp(kickoff).timestamp() - now + KICKOFF_GRACE
+                    self.cache.put(member, response, ttl=max(until_kickoff, MIN_RESULT_TTL))
+                    summary["loaded"] += 1
+
+        state["batches"] = remaining
+        self._save_state(state)
+        return summary
+
+    def run(self, days: int = DEFAULT_DAYS, as_of=None, leagues: Optional[Iterable[str]] = None,
+            wait: bool = False, poll_interval: float = POLL_INTERVAL) -> Dict[str, int]:
+        """Collect finished batches, submit new ones, and optionally poll until all are loaded."""
+        summary = self.collect()
+        self.submit(days, as_of, leagues)
+        while True:
+            step = self.collect()
+            for key in ("loaded", "rejected", "failed"):
+                summary[key] += step[key]
+            summary["pending"] = step["pending"]
+            if not wait or not step["pending"]:
+                return summary
+            time.sleep(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute agent responses for upcoming fixtures via batch APIs")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="Look-ahead window in days")
+    parser.add_argument("--as-of", default=None, help="Start of the window (default: today)")
+    parser.add_argument("--league", action="append", help="League code to include (repeatable)")
+    parser.add_argument("--backend", choices=["provider", "file"], default="provider")
+    parser.add_argument("--wait", action="store_true", help="Poll until every batch is loaded")
+    parser.add_argument("--collect-only", action="store_true", help="Only load finished batches")
+    parser.add_argument("--pack", type=int, default=1, help="Fixtures per request (packed prompts)")
+    args = parser.parse_args()
+
+    precompute = BatchPrecompute(backend=args.backend, pack_size=args.pack)
+    if args.collect_only:
+        summary = precompute.collect()
+    else:
+        summary = precompute.run(args.days, args.as_of, args.league, wait=args.wait)
+    print(f"✅ Batch precompute: {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,16 @@
-from typing import Dict, List, Any
+import asyncio
+from typing import Dict, List, Any, Optional, Tuple
 from .agents import LLMAgent
+from .prompt_encoder import prompt_encoder
+from .providers import provider_pool
 from .soccerdata_client import SoccerdataClient
+from src.data.h2h_index import h2h_index
 import numpy as np
 
+OUTCOMES = ('home_win', 'draw', 'away_win')
+CONVERGENCE_SPREAD = 0.10  # agents agree: every outcome within this range across agents
+SETTLED_SHIFT = 0.02       # positions settled: nobody moved more than this in the last round
+
 class ConsensusEngine:
     def __init__(self, debate_rounds: int = 2, min_agents: int = 3):
         self.debate_rounds = debate_rounds
@@ -20,28 +28,157 @@ class ConsensusEngine:
 
     def run_consensus(self, match_data: Dict[str, Any], baseline_prediction=None) -> Dict[str, Any]:
         print(f"🤖 Starting Debate for {match_data.get('home_team')}...")
-        
-        # Match data should already be enriched by the loader, but enrich further if needed
-        # by adding IDs if they're passed in
-        if 'home_team_id' in match_data and 'away_team_id' in match_data and 'league_id' in match_data:
-            enriched_data = self._enrich_with_api_stats(match_data)
-        else:
-            # Data is already enriched, just use it
-            enriched_data = match_data
+        enriched_data = self.prepare_match_data(match_data)
         
         results = []
         for agent in self.agents:
-            res = agent.analyze(enriched_data)
+            res = agent.analyze(enriched_data, cache_prefix=self.debate_rounds > 1)
             res['agent'] = agent.persona
             results.append(res)
-            
-            # SAFE PRINTING (Prevents 500 Error)
-            hw = res.get('home_win')
-            hw_str = f"{hw:.0%}" if hw is not None else "N/A"
-            print(f"   👤 {agent.persona}: Home {hw_str} | {res.get('reasoning')}")
+            self._log_result(res)
+
+        results, debate = provider_pool.run_sync(self._debate_async(enriched_data, results))
+        return self._build_consensus(results, enriched_data, baseline_prediction, debate)
+
+    async def run_consensus_async(self, match_data: Dict[str, Any], baseline_prediction=None) -> Dict[str, Any]:
+        """
+        Like ``run_consensus``, with every agent queried concurrently through
+        the shared async provider pool.
+        """
+        print(f"🤖 Starting Debate for {match_data.get('home_team')}...")
+
+        # API enrichment is blocking; keep it off the event loop
+        enriched_data = await asyncio.to_thread(self.prepare_match_data, match_data)
+
+        analyses = await asyncio.gather(*(agent.analyze_async(enriched_data, cache_prefix=self.debate_rounds > 1)
+                                          for agent in self.agents))
+        results = []
+        for agent, res in zip(self.agents, analyses):
+            res['agent'] = agent.persona
+            results.append(res)
+            self._log_result(res)
+
+        results, debate = await self._debate_async(enriched_data, results)
+        return self._build_consensus(results, enriched_data, baseline_prediction, debate)
+
+    async def run_consensus_round_async(self, match_datas: List[Dict[str, Any]],
+                                        baseline_predictions: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Consensus for several fixtures at once; each LLM agent answers the
+        whole round with packed prompts (see ``LLMAgent.analyze_many_async``).
+        """
+        print(f"🤖 Starting Debate round for {len(match_datas)} fixtures...")
+        enriched = await asyncio.gather(*(asyncio.to_thread(self.prepare_match_data, m) for m in match_datas))
+        analyses = await asyncio.gather(*(agent.analyze_many_async(enriched) for agent in self.agents))
+
+        openings = []
+        for index, enriched_data in enumerate(enriched):
+            print(f"   ⚽ {enriched_data.get('home_team')} vs {enriched_data.get('away_team')}")
+            results = []
+            for agent, agent_results in zip(self.agents, analyses):
+                res = agent_results[index]
+                res['agent'] = agent.persona
+                results.append(res)
+                self._log_result(res)
+            openings.append(results)
+
+        # Rebuttal rounds are per fixture; run them for every fixture at once
+        debates = await asyncio.gather(*(self._debate_async(e, r) for e, r in zip(enriched, openings)))
+        baselines = baseline_predictions or [None] * len(enriched)
+        return [self._build_consensus(results, enriched_data, baseline, debate)
+                for (results, debate), enriched_data, baseline in zip(debates, enriched, baselines)]
+
+    async def _debate_async(self, enriched_data: Dict[str, Any],
+                            results: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Rebuttal rounds after the opening analyses, up to ``debate_rounds`` in total.
+
+        Each round, every LLM agent gets the other agents' latest positions as one
+        new message on top of its unchanged conversation (a provider-cached prefix);
+        the agents of a round are queried concurrently. The debate stops early
+        once the agents agree or their positions stop moving.
+
+        Returns:
+            (final results in agent order, {"rounds", "stop_reason"})
+        """
+        debaters = [i for i, agent in enumerate(self.agents)
+                    if agent.provider != 'deterministic' and LLMAgent.is_llm_position(results[i])]
+        # Agreement is judged among the debaters and the data-driven statistician; LLM
+        # agents that fell back to the data-only path sit the debate out
+        members = sorted(debaters + [i for i, agent in enumerate(self.agents) if agent.provider == 'deterministic'])
+        turns = {i: [] for i in debaters}
+        rounds, previous = 1, None
+        while True:
+            if not debaters:
+                stop_reason = 'no_debaters'
+                break
+            stop_reason = self._stop_reason([results[i] for i in members],
+                                            None if previous is None else [previous[i] for i in members])
+            if stop_reason:
+                break
+            if rounds >= self.debate_rounds:
+                stop_reason = 'max_rounds'
+                break
+
+            rounds += 1
+            for i in debaters:
+                others = [res for j, res in enumerate(results) if j != i]
+                turns[i].append((LLMAgent.position_text(results[i]), prompt_encoder.rebuttal(others, rounds)))
+            revised = await asyncio.gather(*(self.agents[i].debate_async(enriched_data, turns[i]) for i in debaters))
+
+            print(f"   🔁 Debate round {rounds}")
+            previous, results = results, list(results)
+            for i, res in zip(debaters, revised):
+                if res is not None:  # no reply in time: the previous position stands
+                    res['agent'] = self.agents[i].persona
+                    results[i] = res
+                self._log_result(results[i])
+
+        return results, {"rounds": rounds, "stop_reason": stop_reason}
+
+    def _stop_reason(self, results: List[Dict[str, Any]], previous: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+        """'converged' if the given agents agree, 'settled' if none moved last round, else None."""
+        def prob(res, key):
+            value = res.get(key)
+            return 0.33 if value is None else value
+
+        spread = max(max(prob(r, k) for r in results) - min(prob(r, k) for r in results) for k in OUTCOMES)
+        if spread <= CONVERGENCE_SPREAD:
+            return 'converged'
+        if previous is not None and all(abs(prob(r, k) - prob(p, k)) <= SETTLED_SHIFT
+                                        for r, p in zip(results, previous) for k in OUTCOMES):
+            return 'settled'
+        return None
+
+    def prepare_match_data(self, match_data: Dict[str, Any]) -> Dict[str, Any]:
+        """The data the agents see (also used by batch precompute so prompts match)."""
+        # Match data should already be enriched by the loader, but enrich further if needed
+        # by adding IDs if they're passed in
+        if 'home_team_id' in match_data and 'away_team_id' in match_data and 'league_id' in match_data:
+            return self._enrich_with_api_stats(match_data)
+        # Data is already enriched, just use it
+        return match_data
+
+    def _log_result(self, res: Dict[str, Any]):
+        # SAFE PRINTING (Prevents 500 Error)
+        hw = res.get('home_win')
+        hw_str = f"{hw:.0%}" if hw is not None else "N/A"
+        print(f"   👤 {res.get('agent')}: Home {hw_str} | {res.get('reasoning')}")
+
+    def _build_consensus(self, results: List[Dict], enriched_data: Dict[str, Any],
+                         baseline_prediction=None, debate: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # Quantitative prior from the trained baseline models
+        if baseline_prediction:
+            results.append({
+                **baseline_prediction,
+                'agent': 'baseline_model',
+                'confidence': max(baseline_prediction.values()),
+                'reasoning': 'XGBoost + LightGBM ensemble on ELO, form, H2H, season and rest-day features',
+            })
+            print(f"   📈 baseline_model: Home {baseline_prediction['home_win']:.0%}")
 
         # Weighted Average
-        weights = {"statistician": 1.5, "tactician": 1.0, "sentiment_analyst": 0.8}
+        weights = {"statistician": 1.5, "tactician": 1.0, "sentiment_analyst": 0.8, "baseline_model": 1.2}
         final_pred = self._calculate_weighted_average(results, weights)
         
         # Generate comprehensive debate summary
@@ -53,6 +190,7 @@ class ConsensusEngine:
             "agreement_score": self._calculate_agreement_score(results),
             "debate_summary": debate_summary,
             "agent_analyses": self._format_agent_analyses(results, weights),
+            "debate": debate or {"rounds": 1, "stop_reason": "single_round"},
             "api_enrichment": enriched_data.get('api_stats', {})
         }
 
@@ -114,12 +252,15 @@ class ConsensusEngine:
                 api_stats['league_standing'] = standing
                 print(f"   📊 League standing fetched for league {league_id}")
             
-            # Fetch head-to-head stats
+            # Fetch head-to-head stats (local index first, then a single API call)
             if home_team_id and away_team_id:
-                h2h = self.soccerdata.get_head_to_head(home_team_id, away_team_id)
-                api_stats['head_to_head'] = h2h
-                if h2h:
+                # Point-in-time: only meetings before the fixture, as in the loader
+                h2h_summary = h2h_index.stats(match_data.get('home_team'), match_data.get('away_team'),
+                                              as_of=match_data.get('match_date'))
+                if not h2h_summary:
                     h2h_summary = self.soccerdata.extract_h2h_stats(home_team_id, away_team_id)
+                api_stats['head_to_head'] = h2h_summary
+                if h2h_summary:
                     print(f"   🔄 H2H: {h2h_summary['team1_name']} {h2h_summary['team1_wins']}W-{h2h_summary['draws']}D-{h2h_summary['team2_wins']}W vs {h2h_summary['team2_name']}")
             
             # Fetch team transfers
@@ -169,12 +310,9 @@ class ConsensusEngine:
         """Extract numerical features from API stats for agent analysis"""
         features = {}
         
-        # Extract from head-to-head
+        # Extract from head-to-head (already summarized during enrichment)
         if api_stats.get('head_to_head'):
-            h2h_summary = self.soccerdata.extract_h2h_stats(
-                api_stats['head_to_head'].get('team1', {}).get('id', 0),
-                api_stats['head_to_head'].get('team2', {}).get('id', 0)
-            )
+            h2h_summary = api_stats['head_to_head']
             if h2h_summary:
                 features['h2h_overall_games'] = h2h_summary['overall_games']
                 features['h2h_team1_wins'] = h2h_summary['team1_wins']
@@ -298,7 +436,8 @@ class ConsensusEngine:
             icon_map = {
                 'statistician': '📊',
                 'tactician': '🎯',
-                'sentiment_analyst': '😊'
+                'sentiment_analyst': '😊',
+                'baseline_model': '📈'
             }
             icon = icon_map.get(agent, '🤖')
             
@@ -318,7 +457,7 @@ class ConsensusEngine:
         summary_lines.append("├" + "─" * 78 + "┤")
         
         # Show calculation
-        total_weight = sum(weights.values())
+        total_weight = sum(weights.get(res.get('agent'), 1.0) for res in results)
         for res in results:
             agent = res.get('agent')
             weight = weights.get(agent, 1.0)
@@ -332,7 +471,8 @@ class ConsensusEngine:
             icon_map = {
                 'statistician': '📊',
                 'tactician': '🎯',
-                'sentiment_analyst': '😊'
+                'sentiment_analyst': '😊',
+                'baseline_model': '📈'
             }
             icon = icon_map.get(agent, '🤖')
             
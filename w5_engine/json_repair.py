@@ -0,0 +1,351 @@
+"""
+Tolerant parsing of the agents' JSON replies.
+
+A reply is only useful if it yields home_win / draw / away_win, but models
+often wrap the object in prose or code fences, get cut off by the output
+token limit, or write Python-style dicts. Instead of discarding the whole
+response, ``parse_prediction``:
+
+    1. finds the first JSON object in the text (balanced braces, strings respected)
+    2. repairs common defects: single quotes, unquoted keys, trailing commas,
+       True/False/None, bare percentages, smart quotes, and a truncated tail (open string,
+       dangling key, missing closing braces)
+    3. validates it against the prediction schema, accepting a few key
+       aliases and percentages, and normalizes the probabilities to sum to 1
+
+It returns None only when no usable probabilities can be recovered.
+
+``parse_predictions`` does the same for packed replies holding one object
+per fixture: each entry is repaired and validated on its own, so one bad or
+cut-off entry does not cost the others.
+"""
+
+import ast
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+PROBABILITY_KEYS = ('home_win', 'draw', 'away_win')
+KEY_ALIASES = {
+    'home': 'home_win',
+    'home_win_prob': 'home_win',
+    'home_win_probability': 'home_win',
+    'draw_prob': 'draw',
+    'draw_probability': 'draw',
+    'away': 'away_win',
+    'away_win_prob': 'away_win',
+    'away_win_probability': 'away_win',
+    'explanation': 'reasoning',
+    'rationale': 'reasoning',
+}
+DEFAULT_CONFIDENCE = 0.5
+MAX_TAIL_CUTS = 6  # how many trailing members a truncated object may lose
+
+SMART_QUOTES = str.maketrans({'“': '"', '”': '"', '‘': "'", '’': "'"})
+_TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+_UNQUOTED_KEY = re.compile(r'([{,]\s*)([A-Za-z_][A-Za-z0-9_]*)(\s*:)')
+_BARE_PERCENT = re.compile(r'(-?\d+(?:\.\d+)?)\s*%')
+_PY_LITERALS = re.compile(r'\b(True|False|None)\b')
+_PY_TO_JSON = {'True': 'true', 'False': 'false', 'None': 'null'}
+
+
+# ============= EXTRACTION =============
+
+def _segments(text: str) -> Tuple[List[Tuple[bool, str]], bool]:
+    """
+    Split text into (is_string, chunk) pieces; single-quoted strings are
+    re-emitted as JSON double-quoted strings.
+
+    Returns:
+        (segments, ended_inside_string)
+    """
+    segments, buf, i, n = [], [], 0, len(text)
+    while i < n:
+        ch = text[i]
+        if ch in '"\'':
+            if buf:
+                segments.append((False, ''.join(buf)))
+                buf = []
+            quote, j, chars = ch, i + 1, []
+            while j < n and text[j] != quote:
+                if text[j] == '\\' and j + 1 < n:
+                    chars.append(text[j:j + 2])
+                    j += 2
+                    continue
+                chars.append(text[j])
+                j += 1
+            body = ''.join(chars)
+            if quote == "'":
+                body = body.replace("\\'", "'").replace('"', '\\"')
+            segments.append((True, '"' + body + '"'))
+            if j >= n:
+                return segments, True
+            i = j + 1
+            continue
+        buf.append(ch)
+        i += 1
+    if buf:
+        segments.append((False, ''.join(buf)))
+    return segments, False
+
+
+def extract_object(text: str) -> Optional[str]:
+    """
+    The first JSON object in ``text`` (from its opening brace to the
+    matching closing brace, or to the end of the text if it was cut off).
+    """
+    start = text.find('{')
+    if start < 0:
+        return None
+    depth, in_string, quote, escape = 0, False, '', False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == quote:
+                in_string = False
+        elif ch in '"\'':
+            in_string, quote = True, ch
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return text[start:]
+
+
+def _objects(text: str) -> Tuple[List[str], Optional[str]]:
+    """
+    Every balanced object in ``text`` in closing order (inner objects before
+    the ones enclosing them), plus the innermost object left open at the end.
+    """
+    closed, stack = [], []
+    in_string, quote, escape = False, '', False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == quote:
+                in_string = False
+        elif ch in '"\'':
+            in_string, quote = True, ch
+        elif ch == '{':
+            stack.append(i)
+        elif ch == '}' and stack:
+            closed.append(text[stack.pop():i + 1])
+    return closed, (text[stack[-1]:] if stack else None)
+
+
+# ============= REPAIR =============
+
+def _normalize(fragment: str) -> Tuple[str, bool]:
+    """Fix quoting, keys, literals and trailing commas outside of strings."""
+    segments, open_string = _segments(fragment.translate(SMART_QUOTES))
+    out = []
+    for is_string, chunk in segments:
+        if not is_string:
+            chunk = _PY_LITERALS.sub(lambda m: _PY_TO_JSON[m.group(1)], chunk)
+            chunk = _UNQUOTED_KEY.sub(r'\1"\2"\3', chunk)
+            chunk = _BARE_PERCENT.sub(r'"\1%"', chunk)
+        out.append(chunk)
+    text = ''.join(out)
+    if open_string:
+        text = text[:-1]  # _segments closed it; let _close decide
+    return _TRAILING_COMMA.sub(r'\1', text), open_string
+
+
+def _close(text: str, open_string: bool) -> str:
+    """Close an open string and any unclosed brackets."""
+    if open_string:
+        text += '"'
+    stack = []
+    for is_string, chunk in _segments(text)[0]:
+        if is_string:
+            continue
+        for ch in chunk:
+            if ch in '{[':
+                stack.append('}' if ch == '{' else ']')
+            elif ch in '}]' and stack:
+                stack.pop()
+    text = re.sub(r'[,:\s]+$', '', text)
+    return _TRAILING_COMMA.sub(r'\1', text + ''.join(reversed(stack)))
+
+
+def _loads(text: str) -> Optional[Any]:
+    try:
+        return json.loads(text)
+    except (ValueError, TypeError):
+        pass
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+def repair(fragment: str) -> Optional[Any]:
+    """
+    Parse a (possibly malformed or truncated) JSON object.
+
+    Returns:
+        The decoded value, or None if no repair produced valid JSON
+    """
+    value = _loads(fragment)
+    if value is not None:
+        return value
+
+    text, open_string = _normalize(fragment)
+    value = _loads(_close(text, open_string))
+    if value is not None:
+        return value
+
+    # Truncated mid-member: drop trailing members one at a time
+    for _ in range(MAX_TAIL_CUTS):
+        cut = text.rfind(',')
+        if cut <= 0:
+            break
+        text = text[:cut]
+        text, open_string = _normalize(text)
+        value = _loads(_close(text, open_string))
+        if value is not None:
+            return value
+    return None
+
+
+# ============= SCHEMA =============
+
+def _probability(value: Any) -> Optional[float]:
+    if isinstance(value, str):
+        value = value.strip()
+        scale = 100.0 if value.endswith('%') else 1.0
+        try:
+            return float(value.rstrip('%')) / scale
+        except ValueError:
+            return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _find_prediction(value: Any) -> Optional[Dict[str, Any]]:
+    """
+    The dict holding the probability keys, searched through nested dicts;
+    confidence / reasoning from enclosing levels fill in missing ones.
+    """
+    if not isinstance(value, dict):
+        return None
+    fields = {KEY_ALIASES.get(str(k).lower(), str(k).lower()): v for k, v in value.items()}
+    if all(k in fields for k in PROBABILITY_KEYS):
+        return fields
+    for nested in value.values():
+        found = _find_prediction(nested)
+        if found:
+            return {**{k: v for k, v in fields.items() if not isinstance(v, dict)}, **found}
+    return None
+
+
+def validate(value: Any) -> Optional[Dict[str, Any]]:
+    """
+    Check a decoded reply against the prediction schema.
+
+    Returns:
+        Dict with home_win, draw, away_win (summing to 1), confidence in
+        [0, 1] and a reasoning string, or None if the probabilities are unusable
+    """
+    fields = _find_prediction(value)
+    if fields is None:
+        return None
+
+    probs = [_probability(fields[k]) for k in PROBABILITY_KEYS]
+    if any(p is None or p != p or p < 0 for p in probs):
+        return None
+    if any(p > 1 for p in probs):  # percentages
+        probs = [p / 100.0 for p in probs]
+    total = sum(probs)
+    if total <= 0:
+        return None
+
+    confidence = _probability(fields.get('confidence'))
+    if confidence is None or confidence != confidence:
+        confidence = DEFAULT_CONFIDENCE
+    elif confidence > 1:
+        confidence /= 100.0
+
+    result = {k: round(p / total, 4) for k, p in zip(PROBABILITY_KEYS, probs)}
+    result['confidence'] = min(max(confidence, 0.0), 1.0)
+    reasoning = fields.get('reasoning')
+    result['reasoning'] = reasoning.strip() if isinstance(reasoning, str) else ''
+    return result
+
+
+def parse_prediction(text: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Extract, repair and validate a prediction from an LLM reply.
+
+    The first object in the reply is tried first; if it does not validate
+    (e.g. prose like "{maybe}" ahead of the JSON), every other object in the
+    reply is tried, innermost first.
+
+    Returns:
+        The validated prediction dict, or None if nothing usable was found
+    """
+    if not text:
+        return None
+    fragment = extract_object(text)
+    if fragment is None:
+        return None
+    result = validate(repair(fragment))
+    if result is not None:
+        return result
+    closed, tail = _objects(text)
+    for other in closed + ([tail] if tail else []):
+        if other != fragment:
+            result = validate(repair(other))
+            if result is not None:
+                return result
+    return None
+
+
+def _entry_index(value: Any, position: int, count: int) -> Optional[int]:
+    """Zero-based slot for a packed entry: its 1-based id, else its position."""
+    try:
+        index = int(value) - 1
+    except (TypeError, ValueError):
+        index = position
+    return index if 0 <= index < count else None
+
+
+def parse_predictions(text: Optional[str], count: int) -> List[Optional[Dict[str, Any]]]:
+    """
+    Extract, repair and validate the per-fixture predictions of a packed reply.
+
+    Args:
+        text: Reply to a packed prompt ({"results": [{"id": 1, ...}, ...]})
+        count: Number of fixtures in the pack
+
+    Returns:
+        One validated prediction dict per fixture, None where the entry is
+        missing or unusable
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * count
+    if not text:
+        return results
+    closed, tail = _objects(text)
+    position = 0
+    for fragment in closed + ([tail] if tail else []):
+        value = repair(fragment)
+        if not isinstance(value, dict):
+            continue
+        fields = {KEY_ALIASES.get(str(k).lower(), str(k).lower()): v for k, v in value.items()}
+        if not any(k in fields for k in PROBABILITY_KEYS):
+            continue  # a nested detail or the enclosing {"results": ...}
+        index = _entry_index(fields.get('id'), position, count)
+        position += 1
+        if index is not None and results[index] is None:
+            results[index] = validate(value)
+    return results
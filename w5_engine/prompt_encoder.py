@@ -0,0 +1,390 @@
+"""
+Compact, token-budgeted prompt serialization for the LLM agents.
+
+The agents used to interpolate Python reprs of the whole feature dicts into
+the prompt. This encoder writes the same facts as minified JSON instead:
+
+    - keys in a fixed order with short names ("h_" = home, "a_" = away)
+    - None, empty values and loader placeholder strings dropped
+    - floats rounded, lists of rows flattened to a header of short keys
+      and comma-separated cells: "rank,team,pts|1,Arsenal,50;2,Man City,48"
+
+Each persona has a token budget; when the prompt is over it, the fields
+least useful to that persona are dropped first. The output is stable for
+unchanged inputs, so the response cache keys stay stable too.
+
+Debate rounds send only ``rebuttal``: the other agents' latest positions,
+appended to the unchanged conversation so far.
+
+For batch workloads ``pack`` puts several fixtures into one prompt that
+shares a single output instruction; each pack stays within its own budget.
+
+Token counts use tiktoken when it is installed and a chars/4 estimate
+otherwise.
+"""
+
+import json
+import math
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency, fall back to a character estimate
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+FLOAT_DIGITS = 2
+DEFAULT_PRIORITY = 3  # 1 = keep longest, 5 = drop first
+
+# Field names without the home_/away_ side prefix
+ABBREVIATIONS = {
+    # head to head
+    'h2h_overall_games': 'h2h_n',
+    'h2h_team1_wins': 'h2h_hw',
+    'h2h_team2_wins': 'h2h_aw',
+    'h2h_draws': 'h2h_d',
+    'h2h_team1_win_pct': 'h2h_hw_pct',
+    'h2h_team1_home_wins': 'h2h_hw_at_home',
+    # league table
+    'league_teams_count': 'lg_teams',
+    'league_leader_points': 'lg_leader_pts',
+    'standings_summary': 'top6',
+    'standings_context': 'table',
+    'season_projection': 'season_odds',
+    'scoring_stats': 'season',
+    # transfers and rest
+    'recent_signings': 'signings',
+    'recent_departures': 'departures',
+    'days_since_last_match': 'rest_days',
+    'matches_last_14d': 'games_14d',
+    'matches_last_30d': 'games_30d',
+    'days_to_next_match': 'days_to_next',
+    # form and season stats
+    'form_stats': 'form5',
+    'matches': 'n',
+    'points': 'pts',
+    'goals_for': 'gf',
+    'goals_against': 'ga',
+    'shots': 'sh',
+    'shots_on_target': 'sot',
+    'last_match': 'last',
+    'goals_for_per90': 'gf90',
+    'goals_against_per90': 'ga90',
+    'xg_per90': 'xg90',
+    'xga_per90': 'xga90',
+    'title_prob': 'title',
+    'top4_prob': 'top4',
+    'relegation_prob': 'releg',
+    'expected_points': 'xpts',
+    'expected_position': 'xpos',
+    'home': 'h',
+    'away': 'a',
+    # context
+    'excitement_rating': 'excitement',
+    'ai_prediction': 'tipster_pick',
+}
+SIDE_PREFIXES = (('home_', 'h_'), ('away_', 'a_'))
+
+# Drop order under a tight budget (by field name without side prefix)
+FIELD_PRIORITY = {
+    'form': 1,
+    'standings_context': 1,
+    'h2h_overall_games': 2,
+    'h2h_team1_wins': 2,
+    'h2h_team2_wins': 2,
+    'h2h_draws': 2,
+    'season_projection': 2,
+    'ai_prediction': 2,
+    'form_stats': 2,
+    'days_since_last_match': 3,
+    'matches_last_14d': 3,
+    'venue': 3,
+    'weather': 3,
+    'h2h_team1_win_pct': 3,
+    'h2h_team1_home_wins': 4,
+    'scoring_stats': 4,
+    'matches_last_30d': 4,
+    'days_to_next_match': 4,
+    'recent_signings': 4,
+    'recent_departures': 4,
+    'excitement_rating': 4,
+    'league_leader_points': 4,
+    'standings_summary': 5,
+    'league_teams_count': 5,
+    'capacity': 5,
+}
+PERSONA_PRIORITY = {
+    'tactician': {'venue': 2, 'capacity': 3, 'days_since_last_match': 2, 'matches_last_14d': 2, 'scoring_stats': 3},
+    'sentiment_analyst': {'recent_signings': 2, 'recent_departures': 2, 'excitement_rating': 2, 'weather': 4},
+}
+
+# Whole user prompt, in tokens
+DEFAULT_TOKEN_BUDGET = 400
+PERSONA_TOKEN_BUDGETS = {
+    'tactician': 350,
+    'sentiment_analyst': 250,
+}
+
+# Loader defaults that carry no information
+PLACEHOLDERS = {
+    'Unknown', 'N/A', 'No H2H data found.', 'Form Data Unavailable', 'Live news requires paid tier',
+    'Venue info available in fixture details', 'Referee info available in fixture details',
+}
+
+REASONING_MAX_WORDS = 40
+RESPONSE_INSTRUCTION = ("Reply with only a JSON object: home_win, draw, away_win (probabilities 0-1), "
+                        f"confidence (0-1), reasoning (string, at most {REASONING_MAX_WORDS} words).")
+PACK_INSTRUCTION = ("Analyse each fixture independently. Reply with only a JSON object "
+                    '{"results": [...]} holding one object per fixture, in order: id (fixture number), '
+                    "home_win, draw, away_win (probabilities 0-1), confidence (0-1), "
+                    f"reasoning (string, at most {REASONING_MAX_WORDS} words).")
+REBUTTAL_INSTRUCTION = ("Reconsider your estimate in light of these positions; keep it if their arguments "
+                        "do not change your view. " + RESPONSE_INSTRUCTION)
+
+# Fixtures packed into one prompt
+DEFAULT_PACK_SIZE = 8
+PACK_TOKEN_BUDGET = 2400
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = 'gpt-4o-mini') -> int:
+    """Prompt size in tokens (exact with tiktoken, estimated otherwise)."""
+    if tiktoken is not None:
+        try:
+            return len(_encoding(model).encode(text))
+        except Exception:
+            pass
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _split_side(key: str) -> Tuple[str, str]:
+    """'home_form' -> ('h_', 'form')."""
+    for prefix, short in SIDE_PREFIXES:
+        if key.startswith(prefix):
+            return short, key[len(prefix):]
+    return '', key
+
+
+# Table separators inside a cell become spaces
+CELL_ESCAPES = str.maketrans({',': ' ', ';': ' ', '|': ' '})
+
+
+def _short_key(key: str) -> str:
+    side, base = _split_side(key)
+    return side + ABBREVIATIONS.get(base, base)
+
+
+def _is_empty(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    if isinstance(value, str):
+        return not value.strip() or value in PLACEHOLDERS
+    if isinstance(value, (list, tuple, dict)):
+        return len(value) == 0
+    return False
+
+
+class PromptEncoder:
+    """
+    Builds the agents' data prompt within a per-persona token budget.
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, int]] = None, default_budget: int = DEFAULT_TOKEN_BUDGET,
+                 digits: int = FLOAT_DIGITS, model: str = 'gpt-4o-mini'):
+        """
+        Args:
+            budgets: Token budget per persona
+            default_budget: Budget for personas without an entry
+            digits: Decimal places kept on floats
+            model: Model whose tokenizer is used for counting
+        """
+        self.budgets = dict(PERSONA_TOKEN_BUDGETS if budgets is None else budgets)
+        self.default_budget = default_budget
+        self.digits = digits
+        self.model = model
+
+    # ============= VALUES =============
+
+    def compact(self, value: Any) -> Any:
+        """Drop empties, round floats, shorten keys and flatten uniform row lists."""
+        if isinstance(value, dict):
+            out = {}
+            for key in sorted(value, key=str):
+                item = self.compact(value[key])
+                if not _is_empty(item):
+                    out[_short_key(str(key))] = item
+            return out
+        if isinstance(value, (list, tuple)):
+            items = [v for v in value if not _is_empty(v)]
+            if items and all(isinstance(v, dict) for v in items):
+                return self._table(items)
+            return [self.compact(v) for v in items]
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, float):
+            rounded = round(value, self.digits)
+            return int(rounded) if rounded.is_integer() else rounded
+        if hasattr(value, 'item'):  # numpy scalars
+            return self.compact(value.item())
+        if isinstance(value, str):
+            return value.strip()
+        return value
+
+    def _table(self, rows: List[Dict[str, Any]]) -> str:
+        """
+        Rows like {"rank": 1, "team": "Arsenal", "points": 50} as one string.
+
+        The header lists the short keys once, in first-seen order across
+        rows; every row then has one cell per column (empty if missing):
+        "rank,team,pts|1,Arsenal,50;2,Man City,48".
+        """
+        rows = [{key: self.compact(value) for key, value in row.items()} for row in rows]
+        columns = []
+        for row in rows:
+            columns += [key for key, value in row.items() if key not in columns and not _is_empty(value)]
+        cell = lambda v: '' if _is_empty(v) else (v if isinstance(v, str) else self.dumps(v)).translate(CELL_ESCAPES)
+        body = ";".join(",".join(cell(row.get(key)) for key in columns) for row in rows)
+        return ",".join(_short_key(str(key)) for key in columns) + "|" + body
+
+    @staticmethod
+    def dumps(value: Any) -> str:
+        return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+
+    # ============= PROMPT =============
+
+    def fields(self, data: Dict[str, Any], persona: Optional[str] = None) -> List[Tuple[int, str, str, Any]]:
+        """
+        Flatten the feature dicts into (priority, section, short key, value) entries.
+
+        Entries are in canonical order (section, then key); empty values are dropped.
+        """
+        overrides = PERSONA_PRIORITY.get(persona, {})
+        entries = []
+        for section, source in (('stats', data.get('quantitative_features') or {}),
+                                ('context', data.get('qualitative_context') or {})):
+            for key in sorted(source, key=str):
+                value = self.compact(source[key])
+                if _is_empty(value):
+                    continue
+                base = _split_side(str(key))[1]
+                priority = overrides.get(base, FIELD_PRIORITY.get(base, DEFAULT_PRIORITY))
+                entries.append((priority, section, _short_key(str(key)), value))
+        return entries
+
+    def render(self, data: Dict[str, Any], entries: List[Tuple[int, str, str, Any]],
+               instruction: bool = True) -> str:
+        """Prompt text for the given field entries."""
+        stats = {key: value for _, section, key, value in entries if section == 'stats'}
+        context = {key: value for _, section, key, value in entries if section == 'context'}
+        lines = [f"Match: {data.get('home_team')} (h) vs {data.get('away_team')} (a)."]
+        if stats:
+            lines.append(f"Stats: {self.dumps(stats)}")
+        if context:
+            lines.append(f"Context: {self.dumps(context)}")
+        if instruction:
+            lines.append(RESPONSE_INSTRUCTION)
+        return "\n".join(lines)
+
+    def budget(self, persona: Optional[str]) -> int:
+        return self.budgets.get(persona, self.default_budget)
+
+    def build(self, data: Dict[str, Any], persona: Optional[str] = None, budget: Optional[int] = None,
+              instruction: bool = True) -> str:
+        """
+        Compact data prompt for one agent.
+
+        Args:
+            data: Match context with quantitative_features and qualitative_context
+            persona: Agent persona (selects the budget and field priorities)
+            budget: Token budget override
+            instruction: Append the output instruction (off for packed fixtures)
+
+        Returns:
+            Prompt text within the budget (the header and instruction are always kept)
+        """
+        if budget is None:
+            budget = self.budget(persona)
+            if not instruction:  # the instruction is paid once per pack instead
+                budget -= count_tokens(RESPONSE_INSTRUCTION, self.model)
+        entries = self.fields(data, persona)
+        prompt = self.render(data, entries, instruction)
+
+        # Drop the least useful fields first; later fields go first within a priority
+        drop_order = sorted(range(len(entries)), key=lambda i: (-entries[i][0], -i))
+        dropped = set()
+        for index in drop_order:
+            if count_tokens(prompt, self.model) <= budget:
+                break
+            dropped.add(index)
+            prompt = self.render(data, [e for i, e in enumerate(entries) if i not in dropped], instruction)
+        return prompt
+
+    def rebuttal(self, positions: List[Dict[str, Any]], round_number: int) -> str:
+        """
+        Delta message for a debate round: the other agents' latest positions.
+
+        Args:
+            positions: Agent results (agent, home_win, draw, away_win, confidence, reasoning)
+            round_number: Debate round being requested (2 for the first rebuttal)
+        """
+        lines = [f"Round {round_number}. Other agents:"]
+        for position in positions:
+            summary = {'h': position.get('home_win'), 'd': position.get('draw'), 'a': position.get('away_win'),
+                       'conf': position.get('confidence'), 'why': position.get('reasoning')}
+            summary = {key: self.compact(value) for key, value in summary.items() if not _is_empty(value)}
+            lines.append(f"{position.get('agent')}: {self.dumps(summary)}")
+        lines.append(REBUTTAL_INSTRUCTION)
+        return "\n".join(lines)
+
+    def pack(self, datas: List[Dict[str, Any]], persona: Optional[str] = None, size: int = DEFAULT_PACK_SIZE,
+             budget: int = PACK_TOKEN_BUDGET) -> List[Tuple[List[int], str]]:
+        """
+        Group fixtures into multi-fixture prompts.
+
+        Fixtures are added in order while the pack holds fewer than ``size``
+        fixtures and stays within ``budget`` tokens; a fixture too large for
+        any pack gets one of its own.
+
+        Args:
+            datas: Match contexts, as for ``build``
+            persona: Agent persona
+            size: Maximum fixtures per pack
+            budget: Token budget per packed prompt
+
+        Returns:
+            List of (indices into ``datas``, prompt text) per pack; fixtures are
+            numbered from 1 within each pack
+        """
+        overhead = count_tokens(PACK_INSTRUCTION, self.model)
+        bodies = [self.build(data, persona, instruction=False) for data in datas]
+        costs = [count_tokens(body, self.model) + 2 for body in bodies]  # + "#n " label
+
+        groups, current, used = [], [], overhead
+        for index, cost in enumerate(costs):
+            if current and (len(current) >= size or used + cost > budget):
+                groups.append(current)
+                current, used = [], overhead
+            current.append(index)
+            used += cost
+        if current:
+            groups.append(current)
+
+        packs = []
+        for group in groups:
+            parts = [f"#{n} {bodies[index]}" for n, index in enumerate(group, 1)]
+            packs.append((group, "\n\n".join(parts + [PACK_INSTRUCTION])))
+        return packs
+
+
+# --- INSTANTIATE ---
+prompt_encoder = PromptEncoder()
@@ -0,0 +1,469 @@
+"""
+Async LLM provider layer.
+
+One ``ProviderPool`` per process holds one async client per provider and
+event loop (``AsyncOpenAI``, ``AsyncAnthropic``, Gemini via
+``google.generativeai``), so every agent call on a loop shares that
+provider's HTTP connection pool instead of opening its own. Calls are coroutines: one worker thread can keep dozens of
+generations in flight while it waits on the network.
+
+Connection limits and timeouts come from the environment:
+
+    LLM_MAX_CONNECTIONS     open connections per provider (default 64)
+    LLM_MAX_KEEPALIVE       idle connections kept per provider (default 16)
+    LLM_TIMEOUT             seconds per request (default 60)
+    LLM_SOFT_DEADLINE       seconds before a hedge request is sent (default 4)
+    LLM_HARD_DEADLINE       seconds before the agent gives up on the LLM (default 15)
+    LLM_STREAM              stream generations, stopping at the end of the JSON (default 1)
+
+Agents call through a ``RequestPolicy``: if the primary model has not
+answered by the soft deadline, the same prompt is sent to the next
+provider in the failover chain (OpenAI -> Anthropic -> Gemini, cyclic), the
+first valid response wins and the other request is cancelled. A failed
+request fails over immediately. Nothing valid by the hard deadline means
+the caller falls back to its deterministic path.
+
+Multi-turn calls (debate rounds) pass the earlier exchange as ``turns`` and
+a ``prefix_key``; the shared prefix is then marked for provider-side prompt
+caching (OpenAI ``prompt_cache_key``, Anthropic ``cache_control``
+breakpoints). Providers only cache prefixes of at least
+``PROMPT_CACHE_MIN_TOKENS`` (1024, 2048 for Claude Haiku). A persona prompt
+is 250-400 tokens, so opening calls and early rounds are below that and are
+sent unmarked; the markers start once the conversation has grown past the
+minimum. Gemini only caches explicitly created contexts far larger than
+these prompts, so it gets the plain conversation.
+"""
+
+import asyncio
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .prompt_encoder import count_tokens
+
+try:
+    import httpx
+except ImportError:  # shipped with the provider SDKs; fall back to their default pools
+    httpx = None
+
+MAX_CONNECTIONS = int(os.getenv('LLM_MAX_CONNECTIONS', 64))
+MAX_KEEPALIVE = int(os.getenv('LLM_MAX_KEEPALIVE', 16))
+REQUEST_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 60))
+CONNECT_TIMEOUT = 5.0
+SOFT_DEADLINE = float(os.getenv('LLM_SOFT_DEADLINE', 4))
+HARD_DEADLINE = float(os.getenv('LLM_HARD_DEADLINE', 15))
+STREAM = os.getenv('LLM_STREAM', '1') != '0'
+
+DEFAULT_TEMPERATURE = 0.2
+DEFAULT_MAX_TOKENS = 1000
+PROMPT_CACHE_BREAKPOINT = {"type": "ephemeral"}
+# Shortest prefix each provider will cache; shorter ones are processed uncached
+PROMPT_CACHE_MIN_TOKENS = {
+    'openai': 1024,
+    'anthropic': 1024,
+}
+HAIKU_PROMPT_CACHE_MIN_TOKENS = 2048
+
+API_KEY_ENV = {
+    'openai': 'OPENAI_API_KEY',
+    'anthropic': 'ANTHROPIC_API_KEY',
+    'google': 'GOOGLE_API_KEY',
+}
+
+# Model used when a provider is reached as a hedge / failover target
+DEFAULT_MODELS = {
+    'openai': 'gpt-4o-mini',
+    'anthropic': 'claude-3-haiku-20240307',
+    'google': 'gemini-1.5-flash',
+}
+FAILOVER_ORDER = ['openai', 'anthropic', 'google']
+
+
+def has_credentials(provider: str) -> bool:
+    return bool(os.getenv(API_KEY_ENV.get(provider, '')))
+
+
+class JsonStreamScanner:
+    """
+    Tracks brace depth over streamed text to find where the first
+    top-level JSON object ends (braces inside strings are ignored).
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escape = False
+
+    def feed(self, chunk: str) -> Optional[int]:
+        """Consume a chunk; returns the offset just past the closing brace once the object is complete."""
+        for i, ch in enumerate(chunk):
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = self.started
+            elif ch == '{':
+                self.depth += 1
+                self.started = True
+            elif ch == '}' and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return None
+
+
+class RequestPolicy:
+    """
+    Deadlines and failover chain for one agent's LLM calls.
+    """
+
+    def __init__(self, provider: str, model: str, soft_deadline: float = SOFT_DEADLINE,
+                 hard_deadline: float = HARD_DEADLINE, alternates: Optional[List[Tuple[str, str]]] = None):
+        """
+        Args:
+            provider: Primary provider
+            model: Primary model
+            soft_deadline: Seconds before the next route is hedged in
+            hard_deadline: Seconds before giving up on every route
+            alternates: (provider, model) routes to hedge to, in order; defaults
+                to the other providers of FAILOVER_ORDER that have an API key
+        """
+        self.provider = provider
+        self.model = model
+        self.soft_deadline = soft_deadline
+        self.hard_deadline = hard_deadline
+        if alternates is None:
+            start = FAILOVER_ORDER.index(provider) + 1 if provider in FAILOVER_ORDER else 0
+            cycle = FAILOVER_ORDER[start:] + FAILOVER_ORDER[:start]
+            alternates = [(p, DEFAULT_MODELS[p]) for p in cycle if p != provider and has_credentials(p)]
+        self.alternates = alternates
+
+    def routes(self) -> List[Tuple[str, str]]:
+        """Primary route first, then the hedge / failover routes."""
+        return [(self.provider, self.model)] + [r for r in self.alternates if r != (self.provider, self.model)]
+
+    def scaled(self, factor: float) -> 'RequestPolicy':
+        """Same routes with both deadlines stretched (e.g. for longer, packed replies)."""
+        return RequestPolicy(self.provider, self.model, self.soft_deadline * factor, self.hard_deadline * factor,
+                             alternates=list(self.alternates))
+
+
+class ProviderPool:
+    """
+    Shared async clients, one per provider and event loop.
+    """
+
+    def __init__(self, max_connections: int = MAX_CONNECTIONS, max_keepalive: int = MAX_KEEPALIVE,
+                 timeout: float = REQUEST_TIMEOUT):
+        """
+        Args:
+            max_connections: Most open connections per provider
+            max_keepalive: Idle connections kept alive per provider
+            timeout: Seconds allowed per request
+        """
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.timeout = timeout
+        self._clients: Dict[Tuple[str, asyncio.AbstractEventLoop], Any] = {}
+        self._lock = threading.Lock()  # clients and stats are shared by the server loop and run_sync's loop
+        self._stats = {'calls': 0, 'errors': 0, 'in_flight': 0, 'max_in_flight': 0,
+                       'hedges': 0, 'failovers': 0, 'alternate_wins': 0, 'deadline_misses': 0, 'exhausted': 0,
+                       'early_stops': 0}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    def _http_client(self, sdk):
+        """Pooled httpx client with our limits, or None to keep the SDK default."""
+        if httpx is None:
+            return None
+        return sdk.DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_connections=self.max_connections,
+                                max_keepalive_connections=self.max_keepalive),
+            timeout=httpx.Timeout(self.timeout, connect=CONNECT_TIMEOUT),
+        )
+
+    def _create(self, provider: str):
+        api_key = os.getenv(API_KEY_ENV.get(provider, ''))
+        if not api_key:
+            print(f"⚠️ {API_KEY_ENV.get(provider, provider)} missing")
+
+        if provider == 'openai':
+            import openai
+            return openai.AsyncOpenAI(api_key=api_key, timeout=self.timeout, http_client=self._http_client(openai))
+
+        elif provider == 'anthropic':
+            import anthropic
+            return anthropic.AsyncAnthropic(api_key=api_key, timeout=self.timeout,
+                                            http_client=self._http_client(anthropic))
+
+        elif provider == 'google':
+            # The Gemini SDK keeps one gRPC channel per process once configured
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            return genai
+
+        raise ValueError(f"Unknown LLM provider '{provider}'")
+
+    def client(self, provider: str):
+        """
+        The shared async client for a provider on the running event loop.
+
+        Clients are bound to the loop they were created on, so each loop
+        (the server's and ``run_sync``'s) gets its own; clients of loops
+        that have since closed are dropped.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get((provider, loop))
+            if client is None:
+                for key in [k for k in self._clients if k[1].is_closed()]:
+                    # Their loop is gone, so the connections can no longer be closed gracefully
+                    del self._clients[key]
+                client = self._clients[(provider, loop)] = self._create(provider)
+        return client
+
+    @staticmethod
+    def cacheable(provider: str, model: str, system: str, user: str,
+                  turns: Sequence[Tuple[str, str]] = ()) -> bool:
+        """True if the conversation prefix is long enough for the provider to cache it."""
+        minimum = PROMPT_CACHE_MIN_TOKENS.get(provider)
+        if minimum is None:
+            return False
+        if provider == 'anthropic' and 'haiku' in model:
+            minimum = HAIKU_PROMPT_CACHE_MIN_TOKENS
+        # The cached prefix ends before the newest user message
+        prefix = [system, user] + [text for turn in turns for text in turn][:-1]
+        return count_tokens("".join(prefix)) >= minimum
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._stats[name] += n
+
+    async def complete(self, provider: str, model: str, system: str, user: str, json_mode: bool = True,
+                       max_tokens: int = DEFAULT_MAX_TOKENS, temperature: float = DEFAULT_TEMPERATURE,
+                       stream: bool = STREAM, turns: Sequence[Tuple[str, str]] = (),
+                       prefix_key: Optional[str] = None) -> str:
+        """
+        One chat completion.
+
+        Args:
+            provider: 'openai', 'anthropic' or 'google'
+            model: Provider model name
+            system: System prompt
+            user: User prompt
+            json_mode: Ask the provider for a JSON object
+            max_tokens: Output token limit
+            temperature: Sampling temperature
+            stream: Stream the generation; in JSON mode the stream is closed as
+                soon as the first complete JSON object has arrived
+            turns: Later (assistant reply, user message) exchanges, oldest first
+            prefix_key: Stable id of the conversation prefix; enables provider
+                prompt caching for it once it is long enough to be cached
+
+        Returns:
+            The response text
+        """
+        client = self.client(provider)
+        if prefix_key and not self.cacheable(provider, model, system, user, turns):
+            prefix_key = None  # below the provider minimum, a marker would cache nothing
+        with self._lock:
+            self._stats['calls'] += 1
+            self._stats['in_flight'] += 1
+            self._stats['max_in_flight'] = max(self._stats['max_in_flight'], self._stats['in_flight'])
+        try:
+            if provider == 'openai':
+                messages = [{"role": "system", "content": system}, {"role": "user", "content": user}]
+                for reply, message in turns:
+                    messages += [{"role": "assistant", "content": reply}, {"role": "user", "content": message}]
+                params = dict(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    **({"response_format": {"type": "json_object"}} if json_mode else {}),
+                    # Prefixes are cached automatically; the key routes repeats to the same cache
+                    **({"prompt_cache_key": prefix_key} if prefix_key else {})
+                )
+                if not stream:
+                    resp = await client.chat.completions.create(**params)
+                    return resp.choices[0].message.content
+                chunks = await client.chat.completions.create(**params, stream=True)
+                pieces = (c.choices[0].delta.content async for c in chunks if c.choices)
+                return await self._read_stream(pieces, json_mode=json_mode, close=chunks.close)
+
+            elif provider == 'anthropic':
+                # Prefilling "{" keeps the reply a bare JSON object
+                prefill = "{" if json_mode else ""
+                messages = [{"role": "user", "content": user}]
+                for reply, message in turns:
+                    messages += [{"role": "assistant", "content": reply}, {"role": "user", "content": message}]
+                if prefix_key:
+                    # Breakpoints after the data prompt (when it is cacheable on its own) and
+                    # after the latest reply: the next round re-reads everything up to there
+                    marked = [0] if self.cacheable(provider, model, system, user) else []
+                    marked += [len(messages) - 2] if turns else []
+                    for index in marked:
+                        messages[index] = {"role": messages[index]["role"], "content": [
+                            {"type": "text", "text": messages[index]["content"],
+                             "cache_control": PROMPT_CACHE_BREAKPOINT}]}
+                if prefill:
+                    messages.append({"role": "assistant", "content": prefill})
+                params = dict(model=model, max_tokens=max_tokens, temperature=temperature, system=system,
+                              messages=messages)
+                if not stream:
+                    message = await client.messages.create(**params)
+                    return prefill + message.content[0].text
+                events = await client.messages.create(**params, stream=True)
+                pieces = (e.delta.text async for e in events
+                          if e.type == 'content_block_delta' and getattr(e.delta, 'text', None))
+                return await self._read_stream(pieces, prefix=prefill, json_mode=json_mode, close=events.close)
+
+            elif provider == 'google':
+                generation_config = {"temperature": temperature, "max_output_tokens": max_tokens}
+                if json_mode:
+                    generation_config["response_mime_type"] = "application/json"
+                gemini = client.GenerativeModel(model, system_instruction=system)
+                contents = user
+                if turns:
+                    contents = [{"role": "user", "parts": [user]}]
+                    for reply, message in turns:
+                        contents += [{"role": "model", "parts": [reply]}, {"role": "user", "parts": [message]}]
+                resp = await gemini.generate_content_async(contents, generation_config=generation_config,
+                                                           stream=stream)
+                if not stream:
+                    return resp.text
+                return await self._read_stream((chunk.text async for chunk in resp), json_mode=json_mode)
+
+            raise ValueError(f"Unknown LLM provider '{provider}'")
+        except Exception:
+            self._count('errors')
+            raise
+        finally:
+            self._count('in_flight', -1)
+
+    async def _read_stream(self, pieces, prefix: str = "", json_mode: bool = True, close=None) -> str:
+        """Concatenate streamed text, stopping early once a JSON object is complete."""
+        scanner = JsonStreamScanner()
+        parts = [prefix]
+        scanner.feed(prefix)
+        try:
+            async for piece in pieces:
+                if not piece:
+                    continue
+                end = scanner.feed(piece) if json_mode else None
+                if end is not None:
+                    parts.append(piece[:end])
+                    self._count('early_stops')
+                    break
+                parts.append(piece)
+        finally:
+            if close is not None:
+                await close()
+        return "".join(parts)
+
+    async def hedged(self, system: str, user: str, policy: RequestPolicy,
+                     validate: Optional[Callable[[str], bool]] = None, **kwargs) -> Optional[str]:
+        """
+        Completion under a ``RequestPolicy``: hedge past the soft deadline,
+        fail over on errors, give up at the hard deadline.
+
+        Args:
+            system: System prompt
+            user: User prompt
+            policy: Deadlines and routes
+            validate: Accepts a response text (e.g. parses as the expected JSON);
+                rejected responses count as failures
+            **kwargs: Passed to ``complete``
+
+        Returns:
+            The first valid response text, or None if no route produced one in time
+        """
+        loop = asyncio.get_running_loop()
+        routes = policy.routes()
+        primary = routes[0]
+        deadline = loop.time() + policy.hard_deadline
+        pending = {}
+
+        def launch():
+            provider, model = route = routes.pop(0)
+            task = asyncio.ensure_future(self.complete(provider, model, system, user, **kwargs))
+            pending[task] = route
+            return loop.time() + policy.soft_deadline
+
+        next_hedge = launch()
+        try:
+            while pending:
+                now = loop.time()
+                if now >= deadline:
+                    break
+                wake = min(deadline, next_hedge) if routes else deadline
+                done, _ = await asyncio.wait(list(pending), timeout=max(wake - now, 0),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    route = pending.pop(task)
+                    error = task.exception()
+                    if error is None and (validate is None or validate(task.result())):
+                        if route != primary:
+                            self._count('alternate_wins')
+                        return task.result()
+                    print(f"❌ {route[0]}/{route[1]} failed: {error or 'invalid response'}")
+                    if routes:
+                        self._count('failovers')
+                        next_hedge = launch()
+
+                if not done and routes and loop.time() >= next_hedge:
+                    self._count('hedges')
+                    next_hedge = launch()
+
+            # Out of time, or every route failed
+            self._count('deadline_misses' if pending else 'exhausted')
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def run_sync(self, coro):
+        """
+        Run a coroutine on the pool's background event loop and wait for it.
+
+        Lets synchronous callers share the async clients (and their
+        connection pools) instead of holding blocking clients of their own.
+        """
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='llm-provider-loop', daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def aclose(self):
+        """Close the pooled HTTP connections of every loop (e.g. on server shutdown)."""
+        current = asyncio.get_running_loop()
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for (provider, loop), client in clients.items():
+            close = getattr(client, 'close', None)
+            if close is None or loop.is_closed():
+                continue
+            try:
+                if loop is current:
+                    await close()
+                else:
+                    # Clients must be closed on their own loop (e.g. run_sync's)
+                    await asyncio.wait_for(asyncio.wrap_future(
+                        asyncio.run_coroutine_threadsafe(close(), loop)), CONNECT_TIMEOUT)
+            except Exception as e:
+                print(f"⚠️ Closing {provider} client failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Calls, errors, in-flight requests, hedges and failovers."""
+        with self._lock:
+            return dict(self._stats)
+
+
+# --- INSTANTIATE ---
+provider_pool = ProviderPool()
@@ -0,0 +1,196 @@
+"""
+Persistent cache for LLM responses.
+
+An agent call is fully determined by (provider, model, temperature, system
+prompt, user prompt), so repeating the analysis of an unchanged fixture can
+reuse the previous response instead of paying for a new generation. Entries
+live in a small SQLite file shared by all workers on the host:
+
+    key          sha256 of provider / model / temperature / prompt hashes
+    response     raw response text
+    created_at   entries older than the TTL are treated as misses
+    expires_at   optional per-entry expiry (e.g. batch results valid until kickoff)
+    accessed_at  least recently used entries are evicted past the size cap
+
+Configuration comes from the environment:
+
+    LLM_CACHE_PATH          SQLite file (default soccer_data_cache/.llm_cache.sqlite3)
+    LLM_CACHE_TTL           seconds an entry stays valid (default 6 h, 0 disables the cache)
+    LLM_CACHE_MAX_MB        size cap on stored responses (default 64 MB)
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.data.cache_store import CACHE_DIR
+
+CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", CACHE_DIR / ".llm_cache.sqlite3"))
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", 6 * 3600))
+CACHE_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", 64)) * 1024 * 1024)
+EVICT_FRACTION = 0.1  # share of the cap freed per eviction pass
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Disk-backed LLM response cache with TTL expiry and an LRU size cap.
+    """
+
+    def __init__(self, path: Path = CACHE_PATH, ttl: float = CACHE_TTL, max_bytes: int = CACHE_MAX_BYTES):
+        """
+        Args:
+            path: SQLite file holding the cache
+            ttl: Seconds an entry stays valid (0 disables caching)
+            max_bytes: Size cap on stored response text
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL, expires_at REAL)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(responses)")}
+            if "expires_at" not in columns:  # files written before per-entry expiry
+                conn.execute("ALTER TABLE responses ADD COLUMN expires_at REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def key(provider: str, model: str, temperature: float, system: str, user: str) -> str:
+        """Cache key for one request; prompts are hashed so the key stays short."""
+        return _digest(f"{provider}\x1f{model}\x1f{temperature!r}\x1f{_digest(system)}\x1f{_digest(user)}")
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response text, or None on a miss or an expired entry."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            with self._lock:
+                db = self._db()
+                row = db.execute("SELECT response, COALESCE(expires_at, created_at + ?) FROM responses "
+                                 "WHERE key = ?", (self.ttl, key)).fetchone()
+                if row is None:
+                    self._stats["misses"] += 1
+                    return None
+                if now > row[1]:
+                    db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._stats["expired"] += 1
+                    self._stats["misses"] += 1
+                    return None
+                db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                self._stats["hits"] += 1
+                return row[0]
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM cache read failed: {e}")
+            self._stats["misses"] += 1
+            return None
+
+    def has(self, key: str) -> bool:
+        """True if a valid entry exists (does not count as a lookup)."""
+        if not self.enabled:
+            return False
+        try:
+            with self._lock:
+                row = self._db().execute("SELECT 1 FROM responses WHERE key = ? AND COALESCE(expires_at, "
+                                         "created_at + ?) >= ?", (key, self.ttl, time.time())).fetchone()
+            return row is not None
+        except sqlite3.Error:
+            return False
+
+    def put(self, key: str, response: str, ttl: Optional[float] = None):
+        """
+        Store a response, evicting least recently used entries past the size cap.
+
+        Args:
+            key: Cache key from ``key``
+            response: Raw response text
+            ttl: Seconds this entry stays valid (the cache TTL if None)
+        """
+        if not self.enabled:
+            return
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        size = len(response.encode("utf-8"))
+        try:
+            with self._lock:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, size, created_at, accessed_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", (key, response, size, now, now, expires_at)
+                )
+                self._stats["stores"] += 1
+                total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total > self.max_bytes:
+                    self._evict(db, total - int(self.max_bytes * (1 - EVICT_FRACTION)))
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM cache write failed: {e}")
+
+    def _evict(self, db: sqlite3.Connection, excess: int):
+        """Drop expired entries, then the least recently used ones, until ``excess`` bytes are freed."""
+        expired = "COALESCE(expires_at, created_at + ?) < ?"
+        args = (self.ttl, time.time())
+        freed, stale = db.execute(f"SELECT COALESCE(SUM(size), 0), COUNT(*) FROM responses WHERE {expired}",
+                                  args).fetchone()
+        if stale:
+            db.execute(f"DELETE FROM responses WHERE {expired}", args)
+            self._stats["evictions"] += stale
+
+        victims = []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if freed >= excess:
+                break
+            victims.append((key,))
+            freed += size
+        if victims:
+            db.executemany("DELETE FROM responses WHERE key = ?", victims)
+            self._stats["evictions"] += len(victims)
+
+    def clear(self):
+        """Remove every cached response."""
+        with self._lock:
+            self._db().execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus entry count and size on disk."""
+        result = dict(self._stats)
+        lookups = result["hits"] + result["misses"]
+        result["hit_rate"] = round(result["hits"] / lookups, 3) if lookups else 0.0
+        if self.enabled:
+            try:
+                with self._lock:
+                    entries, size = self._db().execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+                result.update(entries=entries, bytes=size)
+            except sqlite3.Error:
+                pass
+        return result
+
+
+# --- INSTANTIATE ---
+response_cache = ResponseCache()
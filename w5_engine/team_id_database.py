@@ -3,6 +3,8 @@ Team ID Database and Mapping
 Maps team names to their correct Soccerdata IDs
 """
 
+from src.data.league_catalog import league_catalog
+
 # Premier League (League ID: 39)
 TEAM_ID_DATABASE = {
     "Premier League": {
@@ -99,13 +101,14 @@ TEAM_ID_DATABASE = {
     },
 }
 
-def find_team_id(team_name: str, league_name: str = None) -> int:
+def find_team_id(team_name: str, league_name=None) -> int:
     """
     Find team ID by name and optional league
     
     Args:
         team_name: Name of the team
-        league_name: Optional league name (e.g., "Premier League", "La Liga")
+        league_name: Optional league name (e.g., "Premier League", "La Liga"),
+            FBref code ("ENG-Premier League") or API league ID (39)
     
     Returns:
         Team ID if found, None otherwise
@@ -114,6 +117,8 @@ def find_team_id(team_name: str, league_name: str = None) -> int:
         return None
     
     team_lower = team_name.lower().strip()
+    if league_name is not None and league_name not in TEAM_ID_DATABASE:
+        league_name = league_catalog.display_name(league_name)
     
     # If league specified, search within that league first
     if league_name and league_name in TEAM_ID_DATABASE:
@@ -130,8 +135,10 @@ def find_team_id(team_name: str, league_name: str = None) -> int:
     
     return None
 
-def get_all_team_ids(league_name: str) -> dict:
+def get_all_team_ids(league_name) -> dict:
     """Get all team IDs for a specific league"""
+    if league_name not in TEAM_ID_DATABASE:
+        league_name = league_catalog.display_name(league_name)
     if league_name in TEAM_ID_DATABASE:
         return TEAM_ID_DATABASE[league_name]
     return {}